@@ -0,0 +1,103 @@
+"""
+Compares building the kubernetes models against the raw JSON
+fast path for large deployment lists.
+
+Run from the repository root:
+
+    python -m benchmarks.decode_benchmark --objects 10000
+"""
+import argparse
+import json
+import time
+
+from kubernetes import client
+
+from k8s import records
+
+
+class _Response():
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+
+def make_deployment_list(count: int, containers: int) -> bytes:
+    """
+    Builds the JSON of a V1DeploymentList with synthetic deployments
+
+    Args:
+        count (int): Number of deployments
+        containers (int): Number of containers per deployment
+
+    Returns:
+        bytes: Returns the encoded list
+    """
+    items: list = []
+    for i in range(count):
+        items.append({
+            "metadata": {"name": f"deployment-{i}", "namespace": f"ns-{i % 100}",
+                         "labels": {"app": f"deployment-{i}", "team": "bench"},
+                         "annotations": {"deployment.kubernetes.io/revision": "3"},
+                         "resourceVersion": str(100000 + i),
+                         "creationTimestamp": "2024-01-01T00:00:00Z"},
+            "spec": {
+                "replicas": 3,
+                "selector": {"matchLabels": {"app": f"deployment-{i}"}},
+                "template": {
+                    "metadata": {"labels": {"app": f"deployment-{i}"}},
+                    "spec": {"containers": [{
+                        "name": f"container-{c}",
+                        "image": f"registry.example.com/team/app-{c}:1.{i % 20}.0",
+                        "ports": [{"containerPort": 8080, "protocol": "TCP"}],
+                        "env": [{"name": f"ENV_{e}", "value": "x" * 16} for e in range(5)],
+                        "resources": {"requests": {"cpu": "100m", "memory": "128Mi"},
+                                      "limits": {"cpu": "500m", "memory": "512Mi"}},
+                    } for c in range(containers)]},
+                },
+            },
+            "status": {
+                "replicas": 3, "readyReplicas": 3,
+                "conditions": [{"type": "Progressing", "status": "True",
+                                "lastUpdateTime": "2024-01-02T00:00:00Z",
+                                "lastTransitionTime": "2024-01-01T00:00:00Z",
+                                "reason": "NewReplicaSetAvailable"}],
+            },
+        })
+    return json.dumps({"apiVersion": "apps/v1", "kind": "DeploymentList",
+                       "metadata": {"resourceVersion": "1"}, "items": items}).encode()
+
+
+def bench_models(data: bytes) -> list:
+    deployments = client.ApiClient().deserialize(_Response(data), 'V1DeploymentList')
+    return [records.workload_from_model(kind='Deployment', obj=obj) for obj in deployments.items]
+
+
+def bench_raw(data: bytes) -> list:
+    return [records.workload_from_dict(kind='Deployment', obj=obj) for obj in records.loads(data)['items']]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--containers', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    data: bytes = make_deployment_list(count=args.objects, containers=args.containers)
+    print(f'{args.objects} deployments, {len(data) / 1024 ** 2:.1f} MiB of JSON, '
+          f'decoder: {records.loads.__module__}')
+
+    results: dict = {}
+    for name, func in (('models', bench_models), ('raw', bench_raw)):
+        timings: list = []
+        for _ in range(args.repeat):
+            start: float = time.perf_counter()
+            func(data)
+            timings.append(time.perf_counter() - start)
+        results[name] = min(timings)
+        print(f'{name:>8}: {results[name]:.3f}s (best of {args.repeat})')
+
+    print(f' speedup: {results["models"] / results["raw"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""
+Local stand-in for the Kubernetes API server. Serves synthetic
+namespaces, deployments, statefulsets, daemonsets, jobs, replicasets,
+pods, logs and pod metrics at a configurable scale and latency, with limit/continue
+paging and Table responses, and counts the calls and bytes served.
+
+Run from the repository root:
+
+    python -m benchmarks.fake_apiserver --namespaces 100 --deployments 20 --pods 5
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class Scale():
+    """
+    Size of the synthetic cluster. Objects are generated from their
+    index on every request, so the server itself stays small
+    """
+    def __init__(self, namespaces: int = 10, deployments: int = 10, statefulsets: int = 2,
+                 daemonsets: int = 1, jobs: int = 1, pods: int = 3, containers: int = 2,
+                 log_lines: int = 1000, latency_ms: float = 0) -> None:
+        self.namespaces = namespaces
+        self.deployments = deployments
+        self.statefulsets = statefulsets
+        self.daemonsets = daemonsets
+        self.jobs = jobs
+        self.pods = pods
+        self.containers = containers
+        self.log_lines = log_lines
+        self.latency_ms = latency_ms
+
+    def describe(self) -> str:
+        total_pods: int = self.namespaces * (self.deployments + self.statefulsets) * self.pods
+        return (f'{self.namespaces} namespaces, {self.namespaces * self.deployments} deployments, '
+                f'{self.namespaces * self.statefulsets} statefulsets, {self.namespaces * self.daemonsets} daemonsets, '
+                f'{self.namespaces * self.jobs} jobs, {total_pods} pods, '
+                f'{self.latency_ms:g}ms latency')
+
+
+# Kind -> prefix of the synthetic names
+NAME_PREFIXES: dict = {'Deployment': 'deploy', 'StatefulSet': 'sts', 'DaemonSet': 'ds', 'Job': 'job'}
+# Collection of a single object path -> kind
+KINDS: dict = {'deployments': 'Deployment', 'statefulsets': 'StatefulSet', 'daemonsets': 'DaemonSet', 'jobs': 'Job'}
+
+
+def _labels(workload: str) -> dict:
+    return {'app': workload}
+
+
+def _uid(kind: str, ns: int, name: str) -> str:
+    # Stable across requests, so owner references always point at the same object
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f'{kind}/ns-{ns}/{name}'))
+
+
+def _owner_reference(kind: str, ns: int, name: str) -> dict:
+    return {'apiVersion': 'apps/v1', 'kind': kind, 'name': name, 'uid': _uid(kind, ns, name),
+            'controller': True, 'blockOwnerDeletion': True}
+
+
+def _containers(scale: Scale, workload: str, index: int) -> list:
+    return [{
+        'name': f'container-{c}',
+        'image': f'registry.example.com/team/{workload}-{c}:1.{index % 20}.0',
+        'resources': {'requests': {'cpu': '100m', 'memory': '128Mi'},
+                      'limits': {'cpu': '500m', 'memory': '512Mi'}},
+    } for c in range(scale.containers)]
+
+
+def namespace(scale: Scale, index: int) -> dict:
+    return {'metadata': {'name': f'ns-{index}', 'resourceVersion': '1'}, 'status': {'phase': 'Active'}}
+
+
+def workload(scale: Scale, kind: str, ns: int, index: int) -> dict:
+    name: str = f'{NAME_PREFIXES[kind]}-{index}'
+    obj: dict = {
+        'kind': kind,
+        'metadata': {'name': name, 'namespace': f'ns-{ns}', 'uid': _uid(kind, ns, name), 'labels': _labels(name),
+                     'resourceVersion': '1'},
+        'spec': {'replicas': scale.pods,
+                 'selector': {'matchLabels': _labels(name)},
+                 'template': {'metadata': {'labels': _labels(name)},
+                              'spec': {'containers': _containers(scale, name, index)}}},
+        'status': {'replicas': scale.pods, 'readyReplicas': scale.pods},
+    }
+    if kind == 'Deployment':
+        obj['status']['conditions'] = [{'type': 'Progressing', 'status': 'True',
+                                        'lastUpdateTime': '2024-01-01T00:00:00Z'}]
+    elif kind == 'StatefulSet':
+        # Required by the V1StatefulSetSpec model
+        obj['spec']['serviceName'] = name
+    return obj
+
+
+def replica_set(scale: Scale, ns: int, index: int) -> dict:
+    name: str = f'deploy-{index}-rs'
+    return {'metadata': {'name': name, 'namespace': f'ns-{ns}', 'uid': _uid('ReplicaSet', ns, name),
+                         'resourceVersion': '1',
+                         'ownerReferences': [_owner_reference('Deployment', ns, f'deploy-{index}')]},
+            'spec': {'replicas': scale.pods}}
+
+
+def pod(scale: Scale, ns: int, index: int) -> dict:
+    workload_index, replica = divmod(index, scale.pods)
+    if workload_index < scale.deployments:
+        owner: str = f'deploy-{workload_index}'
+        name: str = f'{owner}-rs-{replica}'
+        reference: dict = _owner_reference('ReplicaSet', ns, f'{owner}-rs')
+    else:
+        owner: str = f'sts-{workload_index - scale.deployments}'
+        name: str = f'{owner}-{replica}'
+        reference: dict = _owner_reference('StatefulSet', ns, owner)
+    containers: list = _containers(scale, owner, workload_index)
+    return {'metadata': {'name': name, 'namespace': f'ns-{ns}', 'uid': _uid('Pod', ns, name),
+                         'labels': _labels(owner), 'resourceVersion': '1', 'ownerReferences': [reference]},
+            'spec': {'containers': containers},
+            'status': {'phase': 'Running',
+                       'containerStatuses': [{'name': container['name'],
+                                              'image': container['image'],
+                                              'imageID': f'{container["image"].rsplit(":", 1)[0]}@sha256:'
+                                                         f'{hashlib.sha256(container["image"].encode()).hexdigest()}',
+                                              'ready': True,
+                                              'restartCount': 0}
+                                             for container in containers]}}
+
+
+def pod_metrics(scale: Scale, ns: int, index: int) -> dict:
+    metadata: dict = pod(scale, ns, index)['metadata']
+    return {'metadata': {'name': metadata['name'], 'namespace': metadata['namespace']},
+            'containers': [{'name': f'container-{c}',
+                            'usage': {'cpu': f'{(index * 7 + c) % 400 + 1}m', 'memory': f'{(index % 200) + 32}Mi'}}
+                           for c in range(scale.containers)]}
+
+
+# Collection -> (objects per namespace, generator)
+COLLECTIONS: dict = {
+    'namespaces': (None, namespace),
+    'deployments': (lambda s: s.deployments, lambda s, ns, i: workload(s, 'Deployment', ns, i)),
+    'statefulsets': (lambda s: s.statefulsets, lambda s, ns, i: workload(s, 'StatefulSet', ns, i)),
+    'daemonsets': (lambda s: s.daemonsets, lambda s, ns, i: workload(s, 'DaemonSet', ns, i)),
+    'jobs': (lambda s: s.jobs, lambda s, ns, i: workload(s, 'Job', ns, i)),
+    'replicasets': (lambda s: s.deployments, replica_set),
+    'pods': (lambda s: (s.deployments + s.statefulsets) * s.pods, pod),
+    'metrics': (lambda s: (s.deployments + s.statefulsets) * s.pods, pod_metrics),
+}
+
+ROUTES: list = [
+    (re.compile(r'^/api/v1/namespaces$'), 'namespaces'),
+    (re.compile(r'^/api/v1/namespaces/(?P<ns>[^/]+)/pods/(?P<name>[^/]+)/log$'), 'log'),
+    (re.compile(r'^/api/v1/(?:namespaces/(?P<ns>[^/]+)/)?pods$'), 'pods'),
+    (re.compile(r'^/apis/apps/v1/(?:namespaces/(?P<ns>[^/]+)/)?(?P<kind>deployments|statefulsets|daemonsets|replicasets)(?:/(?P<name>[^/]+))?$'), 'apps'),
+    (re.compile(r'^/apis/batch/v1/(?:namespaces/(?P<ns>[^/]+)/)?(?P<kind>jobs)(?:/(?P<name>[^/]+))?$'), 'apps'),
+    (re.compile(r'^/apis/metrics\.k8s\.io/v1beta1/(?:namespaces/(?P<ns>[^/]+)/)?pods$'), 'metrics'),
+]
+
+
+class FakeApiServer():
+    """
+    Threaded HTTP server answering the API paths Kuber uses
+    """
+    def __init__(self, scale: Scale, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.scale = scale
+        self.calls: int = 0
+        self.bytes_sent: int = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> None:
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+
+    def stats(self, reset: bool = False) -> dict:
+        with self._lock:
+            stats: dict = {'calls': self.calls, 'bytes': self.bytes_sent}
+            if reset:
+                self.calls = self.bytes_sent = 0
+        return stats
+
+    def _record(self, size: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.bytes_sent += size
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def handle(self) -> None:
+                # Clients exiting with keep-alive or watch connections still open reset them
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    pass
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query: dict = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                if url.path.startswith('/_stats'):
+                    self._send(200, json.dumps(server.stats(reset=url.path.endswith('/reset'))).encode(),
+                               record=False)
+                    return
+
+                time.sleep(server.scale.latency_ms / 1000)
+                if query.get('watch') in ('true', '1'):
+                    # Nothing ever changes in the synthetic cluster, end the watch right away
+                    self._send(200, b'')
+                    return
+
+                for pattern, route in ROUTES:
+                    match = pattern.match(url.path)
+                    if match:
+                        self._route(route, match.groupdict(), query)
+                        return
+                self._send(404, json.dumps({'kind': 'Status', 'code': 404, 'reason': 'NotFound'}).encode())
+
+            def _route(self, route: str, params: dict, query: dict) -> None:
+                scale: Scale = server.scale
+                if route == 'log':
+                    lines: int = int(query.get('tailLines') or scale.log_lines)
+                    body: bytes = ''.join(f'2024-01-01T00:00:{i % 60:02d}Z {params["name"]} request {i} served in {i % 97}ms\n'
+                                          for i in range(lines)).encode()
+                    if query.get('limitBytes'):
+                        body = body[:int(query['limitBytes'])]
+                    self._send(200, body, content_type='text/plain')
+                    return
+                if route == 'apps' and params.get('name'):
+                    index: int = int(params['name'].rsplit('-', 1)[1])
+                    self._send(200, json.dumps(workload(scale, KINDS[params['kind']], int(params['ns'].split('-')[1]),
+                                                        index)).encode())
+                    return
+
+                collection: str = params.get('kind') or route
+                self._send_list(collection, params.get('ns'), query)
+
+            def _send_list(self, collection: str, ns: str, query: dict) -> None:
+                scale: Scale = server.scale
+                per_namespace, generate = COLLECTIONS[collection]
+                if per_namespace is None:
+                    total: int = scale.namespaces
+                    item = lambda i: generate(scale, i)
+                else:
+                    size: int = per_namespace(scale)
+                    namespaces: list = [int(ns.split('-')[1])] if ns else list(range(scale.namespaces))
+                    total: int = size * len(namespaces)
+                    item = lambda i: generate(scale, namespaces[i // size], i % size)
+
+                start: int = int(query.get('continue') or 0)
+                limit: int = int(query.get('limit') or 0) or total
+                selector: dict = dict(requirement.split('=', 1)
+                                      for requirement in filter(None, (query.get('labelSelector') or '').split(',')))
+                items: list = []
+                index: int = start
+                while index < total and len(items) < limit:
+                    obj: dict = item(index)
+                    index += 1
+                    labels: dict = obj['metadata'].get('labels') or {}
+                    if all(labels.get(key) == value for key, value in selector.items()):
+                        items.append(obj)
+                metadata: dict = {'resourceVersion': '1'}
+                if index < total:
+                    metadata['continue'] = str(index)
+
+                if 'as=Table' in (self.headers.get('Accept') or ''):
+                    body: dict = {'kind': 'Table', 'apiVersion': 'meta.k8s.io/v1', 'metadata': metadata,
+                                  'columnDefinitions': [{'name': 'Name', 'type': 'string'}],
+                                  'rows': [{'cells': [obj['metadata']['name']]} for obj in items]}
+                else:
+                    body: dict = {'kind': 'List', 'apiVersion': 'v1', 'metadata': metadata, 'items': items}
+                self._send(200, json.dumps(body).encode())
+
+            def _send(self, status: int, body: bytes, content_type: str = 'application/json',
+                      record: bool = True) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                if record:
+                    server._record(len(body))
+
+        return Handler
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--namespaces', type=int, default=10)
+    parser.add_argument('--deployments', type=int, default=10, help='Deployments per namespace')
+    parser.add_argument('--statefulsets', type=int, default=2, help='StatefulSets per namespace')
+    parser.add_argument('--daemonsets', type=int, default=1, help='DaemonSets per namespace')
+    parser.add_argument('--jobs', type=int, default=1, help='Jobs per namespace')
+    parser.add_argument('--pods', type=int, default=3, help='Pods per workload')
+    parser.add_argument('--containers', type=int, default=2, help='Containers per pod')
+    parser.add_argument('--log-lines', type=int, default=1000, help='Log lines per container')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latency added to every request')
+
+
+def scale_from_arguments(args: argparse.Namespace) -> Scale:
+    return Scale(namespaces=args.namespaces, deployments=args.deployments, statefulsets=args.statefulsets,
+                 daemonsets=args.daemonsets, jobs=args.jobs, pods=args.pods, containers=args.containers, log_lines=args.log_lines,
+                 latency_ms=args.latency_ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+
+    server = FakeApiServer(scale=scale_from_arguments(args), port=args.port)
+    print(f'Serving {server.scale.describe()} on {server.url}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
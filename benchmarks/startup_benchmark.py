@@ -0,0 +1,66 @@
+"""
+Measures how long k8snitch takes to get to its first prompt and
+how long the deferred imports take, each in a fresh interpreter.
+
+Run from the repository root:
+
+    python -m benchmarks.startup_benchmark --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Each snippet prints the seconds it took, measured inside a new interpreter
+SNIPPETS: dict = {
+    'first prompt (cli + context)': (
+        'import time; start = time.perf_counter(); '
+        'from cli import cli; from helpers import helpers; helpers.read_current_context(); '
+        'print(time.perf_counter() - start)'
+    ),
+    'import k8s.functions': (
+        'import time; start = time.perf_counter(); '
+        'import k8s.functions; '
+        'print(time.perf_counter() - start)'
+    ),
+    'import kubernetes': (
+        'import time; start = time.perf_counter(); '
+        'import kubernetes; '
+        'print(time.perf_counter() - start)'
+    ),
+}
+
+
+def run_snippet(code: str) -> float:
+    """
+    Runs a snippet in a fresh interpreter from the repository root
+
+    Args:
+        code (str): Python code printing the elapsed seconds
+
+    Returns:
+        float: Returns the seconds reported by the snippet
+    """
+    root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output: str = subprocess.check_output([sys.executable, '-c', code], cwd=root, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for name, code in SNIPPETS.items():
+        try:
+            timings: list = [run_snippet(code) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError:
+            print(f'{name:>30}: failed')
+            continue
+        print(f'{name:>30}: median {statistics.median(timings) * 1000:.0f}ms, '
+              f'best {min(timings) * 1000:.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
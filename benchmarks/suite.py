@@ -0,0 +1,224 @@
+"""
+Runs every Kuber report and the non-interactive commands against
+the local fake API server and reports wall time, API calls, bytes
+transferred and peak RSS for each. Every case runs in a fresh
+interpreter so the peak RSS belongs to that case alone.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --namespaces 100 --deployments 20 --pods 5 --latency-ms 5
+    python -m benchmarks.suite --json results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+from benchmarks.fake_apiserver import FakeApiServer, add_scale_arguments, scale_from_arguments
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_PATTERN: str = r'served in 9[0-6]ms'
+
+
+def _export_logs(kuber) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        kuber.export_logs(namespace='ns-0', directory=directory, label_selector='app=deploy-0')
+
+
+def _with_informers(kuber) -> None:
+    kuber.start_informers()
+    if not kuber._informers.wait_for_sync(timeout=30):
+        raise RuntimeError('The informer cache did not sync')
+    kuber.get_statefulset_labels(sts_name='sts-0', namespace='ns-0')
+    kuber.get_replicas_count(namespace=None)
+    kuber.get_resources_requests(namespace=None)
+
+
+# Kuber method cases, run in a child interpreter with the fake server as the current context
+KUBER_CASES: dict = {
+    'list_namespaces': lambda kuber: kuber.list_namespaces(),
+    'list_deployments': lambda kuber: kuber.list_deployments(namespace='ns-0'),
+    'list_statefulsets': lambda kuber: kuber.list_statefulsets(namespace='ns-0'),
+    'get_deployment_labels': lambda kuber: kuber.get_deployment_labels(deployment_name='deploy-0', namespace='ns-0'),
+    'read_logs': lambda kuber: kuber.read_logs(namespace='ns-0', label_selector='app=deploy-0'),
+    'read_logs statefulset': lambda kuber: kuber.read_logs(
+        namespace='ns-0', label_selector=kuber.get_statefulset_labels(sts_name='sts-0', namespace='ns-0')),
+    'stream_logs': lambda kuber: kuber.stream_logs(namespace='ns-0', label_selector='app=deploy-0'),
+    'search_logs': lambda kuber: kuber.search_logs(namespace='ns-0', label_selector='app=deploy-0',
+                                                   pattern=LOG_PATTERN, context_lines=1),
+    'export_logs': _export_logs,
+    'get_pod_metrics': lambda kuber: kuber.get_pod_metrics(namespace=None),
+    'get_images_info': lambda kuber: kuber.get_images_info(namespace=None),
+    'get_resources_requests': lambda kuber: kuber.get_resources_requests(namespace=None),
+    'get_replicas_count': lambda kuber: kuber.get_replicas_count(namespace=None),
+    'get_efficiency_report': lambda kuber: kuber.get_efficiency_report(namespace=None),
+    'get_namespace_overview': lambda kuber: kuber.get_namespace_overview(namespace='ns-0'),
+    'get_image_inventory': lambda kuber: kuber.get_image_inventory(namespace=None, group_by='repository'),
+    'get_replicas_count models': lambda kuber: kuber.get_replicas_count(namespace=None),
+    'get_resources_requests models': lambda kuber: kuber.get_resources_requests(namespace=None),
+    'informers': _with_informers,
+}
+
+# Kuber constructor arguments of the cases that don't run with the defaults
+KUBER_OPTIONS: dict = {
+    'get_replicas_count models': {'raw_decode': False},
+    'get_resources_requests models': {'raw_decode': False},
+}
+
+# Non-interactive command cases, the arguments passed to main.py. {tmp} is a scratch directory
+# shared by the run, so the snapshot cases read what snapshot save wrote before them
+CLI_CASES: dict = {
+    'cli images -A -o ndjson': ['images', '-A', '-o', 'ndjson'],
+    'cli requests -A -o csv': ['requests', '-A', '-o', 'csv'],
+    'cli replicas -A -o json': ['replicas', '-A', '-o', 'json'],
+    'cli metrics -A -o ndjson': ['metrics', '-A', '-o', 'ndjson'],
+    'cli efficiency -A -o ndjson': ['efficiency', '-A', '-o', 'ndjson'],
+    'cli inventory -A -o ndjson': ['inventory', '-A', '-o', 'ndjson'],
+    'cli overview -n ns-0': ['overview', '-n', 'ns-0'],
+    'cli clusters images -A': ['clusters', 'images', '--cluster', 'bench', '-A', '-o', 'ndjson'],
+    'cli logs --tail 100': ['logs', '-n', 'ns-0', '--deployment', 'deploy-0', '--tail', '100'],
+    'cli logs --statefulset': ['logs', '-n', 'ns-0', '--statefulset', 'sts-0', '--tail', '100'],
+    'cli search': ['search', LOG_PATTERN, '-n', 'ns-0', '--deployment', 'deploy-0'],
+    'cli export': ['export', '-n', 'ns-0', '--deployment', 'deploy-0', '-d', '{tmp}/logs'],
+    'cli top -A': ['top', '-A', '--interval', '1'],
+    'cli snapshot save -A': ['snapshot', 'save', '{tmp}/snapshot', '-A'],
+    'cli --snapshot metrics -A': ['--snapshot', '{tmp}/snapshot', 'metrics', '-A', '-o', 'ndjson'],
+    'cli --snapshot images -A': ['--snapshot', '{tmp}/snapshot', 'images', '-A', '-o', 'ndjson'],
+    'cli --snapshot requests -A': ['--snapshot', '{tmp}/snapshot', 'requests', '-A', '-o', 'csv'],
+    'cli --snapshot replicas -A': ['--snapshot', '{tmp}/snapshot', 'replicas', '-A', '-o', 'json'],
+    'cli --snapshot overview -A': ['--snapshot', '{tmp}/snapshot', 'overview', '-A'],
+    'cli snapshot diff': ['snapshot', 'diff', '{tmp}/snapshot', '{tmp}/snapshot'],
+}
+
+# Commands that run until Ctrl+C, interrupted after this many seconds
+INTERRUPT_AFTER: dict = {
+    'cli top -A': 3,
+}
+
+
+def write_kubeconfig(url: str, directory: str) -> str:
+    """
+    Writes a kubeconfig whose current context points at the fake server
+
+    Args:
+        url (str): URL of the fake server
+        directory (str): Directory to write the kubeconfig to
+
+    Returns:
+        str: Returns the path of the kubeconfig
+    """
+    path: str = os.path.join(directory, 'kubeconfig')
+    kubeconfig: dict = {
+        'apiVersion': 'v1', 'kind': 'Config', 'current-context': 'bench',
+        'clusters': [{'name': 'bench', 'cluster': {'server': url}}],
+        'users': [{'name': 'bench', 'user': {'token': 'bench'}}],
+        'contexts': [{'name': 'bench', 'context': {'cluster': 'bench', 'user': 'bench'}}],
+    }
+    # JSON is valid YAML
+    with open(path, 'w') as f:
+        json.dump(kubeconfig, f)
+    return path
+
+
+def run_case(name: str, kubeconfig: str, server: FakeApiServer) -> dict:
+    """
+    Runs one case in a child interpreter and measures it
+
+    Args:
+        name (str): Name of a KUBER_CASES or CLI_CASES case
+        kubeconfig (str): Path of the kubeconfig pointing at the fake server
+        server (FakeApiServer): Server whose counters are read
+
+    Returns:
+        dict: Returns the measurements of the case
+    """
+    env: dict = dict(os.environ, KUBECONFIG=kubeconfig)
+    if name in KUBER_CASES:
+        command: list = [sys.executable, '-m', 'benchmarks.suite', '--run-case', name]
+    else:
+        command: list = [sys.executable, 'main.py'] + [argument.replace('{tmp}', os.path.dirname(kubeconfig))
+                                                       for argument in CLI_CASES[name]]
+
+    server.stats(reset=True)
+    start: float = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.PIPE if name in KUBER_CASES else subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    if name in INTERRUPT_AFTER:
+        time.sleep(INTERRUPT_AFTER[name])
+        process.send_signal(signal.SIGINT)
+    output: bytes = process.stdout.read() if process.stdout else b''
+    # wait4 hands back the resource usage of this child alone
+    _, status, usage = os.wait4(process.pid, 0)
+    wall: float = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    stats: dict = server.stats()
+
+    inner: float = None
+    if output.strip():
+        inner = json.loads(output.decode().strip().splitlines()[-1]).get('seconds')
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak_rss: float = usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    return {'case': name, 'ok': process.returncode == 0, 'wall_seconds': wall, 'case_seconds': inner,
+            'api_calls': stats['calls'], 'bytes': stats['bytes'], 'peak_rss_mib': peak_rss}
+
+
+def run_in_child(name: str) -> None:
+    """
+    Body of a child interpreter: runs a Kuber case with its output
+    discarded and prints how long it took
+    """
+    from k8s.functions import Kuber
+
+    Kuber.load_kube_config()
+    kuber: Kuber = Kuber(**KUBER_OPTIONS.get(name, {}))
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start: float = time.perf_counter()
+        KUBER_CASES[name](kuber)
+        seconds: float = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--case', action='append', help='Run only these cases, repeatable')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        run_in_child(args.run_case)
+        return
+
+    server = FakeApiServer(scale=scale_from_arguments(args))
+    server.start()
+    print(f'Fake API server: {server.scale.describe()}\n')
+
+    results: list = []
+    with tempfile.TemporaryDirectory() as directory:
+        kubeconfig: str = write_kubeconfig(url=server.url, directory=directory)
+        for name in args.case or list(KUBER_CASES) + list(CLI_CASES):
+            results.append(run_case(name=name, kubeconfig=kubeconfig, server=server))
+    server.stop()
+
+    print(tabulate([[r['case'], 'ok' if r['ok'] else 'FAILED', f'{r["wall_seconds"]:.2f}',
+                     '' if r['case_seconds'] is None else f'{r["case_seconds"]:.2f}',
+                     r['api_calls'], f'{r["bytes"] / 1024 ** 2:.1f}', f'{r["peak_rss_mib"]:.0f}']
+                    for r in results],
+                   headers=['Case', 'Status', 'Wall(s)', 'Case(s)', 'API calls', 'MiB sent', 'Peak RSS(MiB)'],
+                   tablefmt='grid'))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'scale': vars(server.scale), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,159 +1,432 @@
+from typing import TYPE_CHECKING
+
+import importlib
+import os
+import re
+import threading
+
 import click
 import inquirer
-from k8s.functions import Kuber
+
+from cli import output, picker
+from helpers import helpers, profiler
+
+if TYPE_CHECKING:
+    from k8s.functions import Kuber
+
+ALL_NAMESPACES: str = 'All namespaces'
 
     
-# @cli.command()
-def choose_option() -> None:
+ACTIONS: list = ['Get Deployment Logs',
+                 'Get StatefulSet Logs',
+                 'Stream Deployment Logs',
+                 'Stream StatefulSet Logs',
+                 'Search Deployment Logs',
+                 'Search StatefulSet Logs',
+                 'Export Logs',
+                 'Get Pods Metrics',
+                 'Top Pods',
+                 'Get Container Images',
+                 'Get Image Inventory',
+                 'Get Resource Requests Information',
+                 'Get Replica Count',
+                 'Get Requests vs Usage',
+                 'Get Namespace Overview',
+                 'Run Report Across Clusters',
+                 'Exit'
+                 ]
+REPORTS: dict = {'Get Pods Metrics': 'get_pod_metrics',
+                 'Top Pods': 'top_pods',
+                 'Get Container Images': 'get_images_info',
+                 'Get Resource Requests Information': 'get_resources_requests',
+                 'Get Replica Count': 'get_replicas_count',
+                 'Get Requests vs Usage': 'get_efficiency_report',
+                 'Get Namespace Overview': 'get_namespace_overview'}
+REPEAT_PREFIX: str = 'Repeat: '
+
+
+class Session():
     """
-    1. Checks for the active context and provides options
-    2. Provides options for choosing what action to take
+    Long lived interactive session. Holds one Kuber for the whole
+    run so its API connection pool is reused between actions, and
+    remembers the last namespace and workload so a repeated query
+    doesn't go through the pickers again
+    """
+    def __init__(self, kuber: "Kuber", cache_options: dict = None, limits: dict = None) -> None:
+        self.kuber = kuber
+        self.cache_options = cache_options
+        self.limits = limits
+        self.last_action: str = None
+        self.namespace: str = None
+        self.workload: str = None
+        # Options asked by the last log, search, export or inventory action, reused on repeat
+        self.options: dict = None
+        self.clusters: dict = None
+
+    def run(self) -> None:
+        """
+        Shows the menu and runs the chosen actions until Exit
+        """
+        while True:
+            action: str = choose_option(repeat=self._describe_last())
+            if action == "Exit":
+                return
+            repeat: bool = action.startswith(REPEAT_PREFIX)
+            self.run_action(action=self.last_action if repeat else action, repeat=repeat)
+
+    def run_action(self, action: str, repeat: bool = False) -> None:
+        """
+        Runs a menu action
+
+        Args:
+            action (str): One of ACTIONS
+            repeat (bool): Reuse the last namespace, workload and log options
+        """
+        kuber = self.kuber
+
+        match action:
+            case "Get Deployment Logs" | "Stream Deployment Logs" | "Search Deployment Logs":
+                chosen_ns: str = self._namespace(repeat=repeat)
+                deployment_name: str = self._workload(repeat=repeat, namespace=chosen_ns,
+                                                      names=kuber.deployment_names, choose=choose_deployment)
+                if not deployment_name:
+                    click.echo(click.style(f'No Deployments in {chosen_ns}\n', fg='red'))
+                    return
+                label_selector: str = kuber.get_deployment_labels(deployment_name=deployment_name,
+                                                                  namespace=chosen_ns)
+                self._logs(action=action, repeat=repeat, namespace=chosen_ns, label_selector=label_selector)
+            case "Get StatefulSet Logs" | "Stream StatefulSet Logs" | "Search StatefulSet Logs":
+                chosen_ns: str = self._namespace(repeat=repeat)
+                sts_name: str = self._workload(repeat=repeat, namespace=chosen_ns,
+                                               names=kuber.statefulset_names, choose=choose_statefulset)
+                if not sts_name:
+                    click.echo(click.style(f'No StatefulSets in {chosen_ns}\n', fg='red'))
+                    return
+                label_selector: str = kuber.get_statefulset_labels(namespace=chosen_ns,
+                                                                   sts_name=sts_name)
+                self._logs(action=action, repeat=repeat, namespace=chosen_ns, label_selector=label_selector)
+            case "Export Logs":
+                chosen_ns: str = self._namespace(repeat=repeat)
+                if not repeat:
+                    self.workload = choose_export_scope(deployments=kuber.list_deployments(namespace=chosen_ns),
+                                                        statefulsets=kuber.list_statefulsets(namespace=chosen_ns),
+                                                        default=self.workload)
+                    self.options = choose_export_options()
+                kind, _, name = (self.workload or '').partition('/')
+                match kind:
+                    case 'deployment':
+                        label_selector: str = kuber.get_deployment_labels(deployment_name=name, namespace=chosen_ns)
+                    case 'statefulset':
+                        label_selector: str = kuber.get_statefulset_labels(sts_name=name, namespace=chosen_ns)
+                    case _:
+                        label_selector: str = None
+                kuber.export_logs(namespace=chosen_ns, label_selector=label_selector, **self.options)
+            case "Get Image Inventory":
+                chosen_ns: str = self._namespace(repeat=repeat, allow_all=True)
+                self.workload = None
+                if not repeat:
+                    self.options = choose_inventory_options()
+                with profiler.PROFILER.stage('report image_inventory'):
+                    kuber.get_image_inventory(namespace=chosen_ns, **self.options)
+            case "Run Report Across Clusters":
+                if not repeat:
+                    self.clusters = choose_clusters()
+                    self.namespace = None
+                self.workload = None
+                run_across_clusters(**self.clusters, cache_options=self.cache_options, limits=self.limits)
+            case _:
+                chosen_ns: str = self._namespace(repeat=repeat, allow_all=True)
+                self.workload = None
+                with profiler.PROFILER.stage(f'report {REPORTS[action]}'):
+                    getattr(kuber, REPORTS[action])(namespace=chosen_ns)
+
+        self.last_action = action
+
+    def _describe_last(self) -> str:
+        if not self.last_action:
+            return None
+        target: str = self.namespace or ALL_NAMESPACES
+        if self.workload:
+            target += f'/{self.workload}'
+        return f'{REPEAT_PREFIX}{self.last_action} ({target})'
+
+    def _namespace(self, repeat: bool, allow_all: bool = False) -> str:
+        if not repeat:
+            self.namespace = choose_namespace(ns_list=self.kuber.namespace_names,
+                                              allow_all=allow_all,
+                                              default=self.namespace)
+        return self.namespace
+
+    def _workload(self, repeat: bool, namespace: str, names, choose) -> str:
+        if not repeat:
+            self.workload = choose(lambda: names(namespace=namespace), default=self.workload)
+        return self.workload
+
+    def _logs(self, action: str, repeat: bool, namespace: str, label_selector: str) -> None:
+        if action.startswith('Get'):
+            self.kuber.read_logs(namespace=namespace, label_selector=label_selector)
+            return
+        if action.startswith('Search'):
+            if not repeat:
+                self.options = choose_search_options()
+            self.kuber.search_logs(namespace=namespace, label_selector=label_selector, **self.options)
+            return
+        if not repeat:
+            self.options = choose_log_options()
+        self.kuber.stream_logs(namespace=namespace, label_selector=label_selector, **self.options)
+
+
+def choose_option(repeat: str = None) -> str:
+    """
+    Provides options for choosing what action to take
+
+    Args:
+        repeat (str): Description of the last action, offered first to run it again
+
+    Returns:
+        str: Returns the chosen action
     """
-    kuber: Kuber = Kuber()
-    
     questions = [
         inquirer.List(
             'option',
             message="Choose an action",
-            choices=['Get Deployment Logs',
-                     'Get StatefulSet Logs',
-                     'Get Pods Metrics',
-                     'Get Container Images', 
-                     'Get Resource Requests Information',
-                     'Get Replica Count',
-                     'Exit'
-                     ],
+            choices=([repeat] if repeat else []) + ACTIONS,
         ),
     ]
     answers: dict = inquirer.prompt(questions)
     click.echo(f'You chose: {answers["option"]}')
-    
-    match answers["option"]:
-        case "Exit":
-            exit(0)
-        case "Get StatefulSet Logs":
-            ns_list: list = kuber.list_namespaces()
-            chosen_ns: str = choose_namespace(ns_list=ns_list)
-            sts_list: list = kuber.list_statefulsets(namespace=chosen_ns)
-            if sts_list:
-                sts_name: str = choose_statefulset(sts_list=sts_list)
-                sts_label_selector: str = kuber.get_statefulset_labels(namespace=chosen_ns,
-                                                                    sts_name=sts_name)
-                kuber.read_logs(namespace=chosen_ns,
-                                label_selector=sts_label_selector)
-                choose_option()
-            else:
-                # print(f'No StatefulSets in {chosen_ns}\n')
-                click.echo(click.style(f'No StatefulSets in {chosen_ns}\n', fg='red'))
-                choose_option()
-        case "Get Deployment Logs":
-            ns_list: list = kuber.list_namespaces()
-            chosen_ns: str = choose_namespace(ns_list=ns_list)
-            deployment_list: list = kuber.list_deployments(namespace=chosen_ns)
-            if deployment_list:
-                deployment_name: str = choose_deployment(deployment_list=deployment_list)
-                deployment_label_selector: str = kuber.get_deployment_labels(deployment_name=deployment_name,
-                                                                            namespace=chosen_ns)
-                kuber.read_logs(namespace=chosen_ns,
-                                label_selector=deployment_label_selector)
-                choose_option()
-            else: 
-                click.echo(click.style(f'No Deployments in {chosen_ns}\n', fg='red'))
-                choose_option()
-        case "Get Pods Metrics":
-            ns_list: list = kuber.list_namespaces()
-            chosen_ns: str = choose_namespace(ns_list=ns_list)
-            kuber.get_pod_metrics(namespace=chosen_ns)
-            choose_option()
-        case "Get Container Images":
-            ns_list: list = kuber.list_namespaces()
-            chosen_ns: str = choose_namespace(ns_list=ns_list)
-            kuber.get_images_info(namespace=chosen_ns)
-            choose_option()
-        case "Get Resource Requests Information":
-            ns_list: list = kuber.list_namespaces()
-            chosen_ns: str = choose_namespace(ns_list=ns_list)
-            kuber.get_resources_requests(namespace=chosen_ns)
-            choose_option()
-        case "Get Replica Count":
-            ns_list: list = kuber.list_namespaces()
-            chosen_ns: str = choose_namespace(ns_list=ns_list)
-            kuber.get_replicas_count(namespace=chosen_ns)
-            choose_option()
-
-def choose_deployment(deployment_list: list) -> str:
+
+    return answers["option"]
+
+def choose_clusters() -> dict:
     """
-    Gets a list of deployments in the cluster
-    and presents them as options
+    Asks for the contexts, report and namespace to run across clusters
+
+    Returns:
+        dict: Returns the run_across_clusters keyword arguments
+    """
+    from k8s import clusters
+
+    contexts: list = clusters.list_contexts()
+    questions = [
+        inquirer.Checkbox('contexts', message="Choose clusters (space to select)",
+                          choices=contexts, default=contexts),
+        inquirer.List('report', message="Choose report", choices=clusters.REPORTS),
+        inquirer.Text('namespace', message="Namespace (empty for all namespaces)"),
+    ]
+    answers: dict = inquirer.prompt(questions)
+
+    return {
+        "contexts": answers["contexts"],
+        "report": answers["report"],
+        "namespace": answers["namespace"].strip() or None,
+    }
+
+def run_across_clusters(contexts: list, report: str, namespace: str, output_format: str = 'table',
+                        timeout: float = None, cache_options: dict = None, limits: dict = None) -> None:
+    """
+    Runs a report across clusters and prints one table with a
+    cluster column, followed by the clusters that failed
 
     Args:
-        deployment_list (list): List of deployments in the cluster
+        contexts (list): Kubeconfig contexts to query
+        report (str): One of clusters.REPORTS
+        namespace (str): Namespace to report on, None for all namespaces
+        output_format (str): One of output.OUTPUT_FORMATS
+        timeout (float): Seconds to wait for each cluster
+        cache_options (dict): ResponseCache options, None to disable the cache
+        limits (dict): qps and burst of each cluster's API requests, the Kuber defaults if None
+    """
+    from k8s import clusters
+
+    errors: list = []
+    rows = clusters.fan_out(contexts=contexts, report=report, namespace=namespace,
+                            timeout=timeout or clusters.CLUSTER_TIMEOUT_SECONDS, errors=errors,
+                            cache_options=cache_options, limits=limits)
+    output.write_rows(rows=rows, headers=clusters.report_headers(report), output=output_format)
+    for context, error in errors:
+        click.echo(click.style(f'{context}: {error}', fg='red'), err=True)
+
+def choose_log_options() -> dict:
+    """
+    Asks for the options used when streaming logs
 
     Returns:
-        str: Returns the chosen deployment
+        dict: Returns the stream_logs keyword arguments
     """
-    
+    def _to_int(value: str):
+        return int(value) if value.strip() else None
+
     questions = [
-        inquirer.List(
-            'option',
-            message="Choose Deployment",
-            choices=lambda answers: deployment_list,
-        ),
+        inquirer.Confirm('follow', message="Follow the logs?", default=False),
+        inquirer.Text('tail_lines', message="Tail lines (empty for all)",
+                      validate=lambda _, x: not x.strip() or x.strip().isdigit()),
+        inquirer.Text('since_seconds', message="Since seconds (empty for all)",
+                      validate=lambda _, x: not x.strip() or x.strip().isdigit()),
+        inquirer.Text('limit_bytes', message="Limit bytes per container (empty for no limit)",
+                      validate=lambda _, x: not x.strip() or x.strip().isdigit()),
     ]
     answers: dict = inquirer.prompt(questions)
 
-    return answers["option"] 
+    return {
+        "follow": answers["follow"],
+        "tail_lines": _to_int(answers["tail_lines"]),
+        "since_seconds": _to_int(answers["since_seconds"]),
+        "limit_bytes": _to_int(answers["limit_bytes"]),
+    }
 
-def choose_statefulset(sts_list: list) -> str:
+def choose_search_options() -> dict:
     """
-    Gets a list of statefulsets in the cluster
-    and presents them as options
+    Asks for the pattern and options used when searching logs
 
-    Args:
-        sts_list (list): List of statefulsets in the cluster
+    Returns:
+        dict: Returns the search_logs keyword arguments
+    """
+    def _is_regex(value: str) -> bool:
+        try:
+            re.compile(value)
+        except re.error:
+            return False
+        return bool(value)
+
+    questions = [
+        inquirer.Text('pattern', message="Regex to search for", validate=lambda _, x: _is_regex(x)),
+        inquirer.Confirm('ignore_case', message="Ignore case?", default=False),
+        inquirer.Text('since_seconds', message="Since seconds (empty for all)",
+                      validate=lambda _, x: not x.strip() or x.strip().isdigit()),
+        inquirer.Text('context_lines', message="Context lines around each hit", default='0',
+                      validate=lambda _, x: x.strip().isdigit()),
+        inquirer.Confirm('all_cores', message="Match on every CPU core? (for heavy patterns)", default=False),
+    ]
+    answers: dict = inquirer.prompt(questions)
+
+    return {
+        "pattern": answers["pattern"],
+        "ignore_case": answers["ignore_case"],
+        "since_seconds": int(answers["since_seconds"]) if answers["since_seconds"].strip() else None,
+        "context_lines": int(answers["context_lines"]),
+        "processes": 0 if answers["all_cores"] else 1,
+    }
+
+def choose_inventory_options() -> dict:
+    """
+    Asks which images to look for and how to group them
 
     Returns:
-        str: Returns the chosen statefulset
+        dict: Returns the get_image_inventory keyword arguments
     """
+    from k8s import images
+
     questions = [
-        inquirer.List(
-            'option',
-            message="Choose StatefulSet",
-            choices=lambda answers: sts_list,
-        ),
+        inquirer.Text('image', message="Image to look for, e.g. nginx:1.25 or *redis* (empty for all)"),
+        inquirer.List('group_by', message="Group by", choices=['Nothing, list the containers'] + images.GROUP_FIELDS),
     ]
     answers: dict = inquirer.prompt(questions)
 
-    return answers["option"] 
+    return {
+        "image": answers["image"].strip() or None,
+        "group_by": answers["group_by"] if answers["group_by"] in images.GROUP_FIELDS else None,
+    }
 
-# @cli.command()
-def choose_namespace(ns_list: list) -> str:
+def choose_export_scope(deployments: list, statefulsets: list, default: str = None) -> str:
     """
-    Gets a list of namespaces in the cluster
-    and presents them as options
+    Asks whether to export the logs of every pod or of one workload
 
     Args:
-        ns_list (list): List of namespaces in the cluster
+        deployments (list): Deployment names of the namespace
+        statefulsets (list): StatefulSet names of the namespace
+        default (str): Scope chosen last time
 
     Returns:
-        str: Returns the chosen namespace
+        str: Returns deployment/<name>, statefulset/<name> or None for every pod
     """
-    # ns_list = kuber.list_namespaces()
-    # print(ns_list)
+    choices: list = (['All pods'] + [f'deployment/{name}' for name in deployments]
+                     + [f'statefulset/{name}' for name in statefulsets])
     questions = [
-        inquirer.List(
-            'option',
-            message="Choose Namespace",
-            choices=lambda answers: ns_list,
-        ),
+        inquirer.List('scope', message="Export the logs of", choices=choices,
+                      default=default if default in choices else None),
     ]
     answers: dict = inquirer.prompt(questions)
-    # click.echo(f'You chose: {answers["option"]}')
 
-    return answers["option"] 
+    return None if answers["scope"] == 'All pods' else answers["scope"]
+
+def choose_export_options() -> dict:
+    """
+    Asks where and how to export logs
+
+    Returns:
+        dict: Returns the export_logs keyword arguments
+    """
+    from k8s import logexport
+
+    questions = [
+        inquirer.Text('directory', message="Directory to export to", default='k8snitch-logs'),
+        inquirer.List('compression', message="Compression", choices=logexport.available_compressions()),
+    ]
+    answers: dict = inquirer.prompt(questions)
+
+    return {
+        "directory": answers["directory"],
+        "compression": answers["compression"],
+    }
+
+def choose_deployment(deployment_list, default: str = None) -> str:
+    """
+    Gets a list of deployments in the cluster
+    and presents them in a type-ahead picker
+
+    Args:
+        deployment_list (list | callable): Deployments in the cluster, or a function listing them
+        default (str): Deployment selected when the prompt opens
+
+    Returns:
+        str: Returns the chosen deployment, None if there are none
+    """
+    return picker.pick(message="Choose Deployment", source=deployment_list, default=default)
+
+def choose_statefulset(sts_list, default: str = None) -> str:
+    """
+    Gets a list of statefulsets in the cluster
+    and presents them in a type-ahead picker
+
+    Args:
+        sts_list (list | callable): StatefulSets in the cluster, or a function listing them
+        default (str): StatefulSet selected when the prompt opens
+
+    Returns:
+        str: Returns the chosen statefulset, None if there are none
+    """
+    return picker.pick(message="Choose StatefulSet", source=sts_list, default=default)
+
+def choose_namespace(ns_list, allow_all: bool = False, default: str = None) -> str:
+    """
+    Gets a list of namespaces in the cluster
+    and presents them in a type-ahead picker
 
-def show_connected_cluster(kuber) -> None:
-    print(f'You are connected to {kuber.show_active_context()}\n')    
+    Args:
+        ns_list (list | callable): Namespaces in the cluster, or a function listing them
+        allow_all (bool): Offer an "All namespaces" option first
+        default (str): Namespace selected when the prompt opens
+
+    Returns:
+        str: Returns the chosen namespace, None for all namespaces
+    """
+    chosen: str = picker.pick(message="Choose Namespace",
+                              source=ns_list,
+                              default=default,
+                              pinned=[ALL_NAMESPACES] if allow_all else None)
+    if chosen == ALL_NAMESPACES:
+        return None
+    return chosen
+
+def show_connected_cluster(context: str) -> None:
+    """
+    Shows the active context and asks to confirm it
+
+    Args:
+        context (str): Name of the active kubeconfig context
+    """
+    print(f'You are connected to {context}\n')    
     
     questions = [
         inquirer.List(
@@ -174,4 +447,441 @@ def show_connected_cluster(kuber) -> None:
         case "Yes":
             pass
         case "Exit":
-            exit(0)
\ No newline at end of file
+            exit(0)
+
+
+@click.group(invoke_without_command=True)
+@click.option('--context', default=None, help='Kubeconfig context to use instead of the current one')
+@click.option('--cache/--no-cache', 'use_cache', default=None,
+              help='Cache lists and report data under ~/.cache/k8snitch (or set K8SNITCH_CACHE=1)')
+@click.option('--refresh', is_flag=True, help='Ignore cached data and fetch it again')
+@click.option('--cache-ttl', type=float, default=300, show_default=True, help='Seconds cached data stays fresh')
+@click.option('--qps', type=click.FloatRange(min=0, min_open=True), default=50, show_default=True, help='Maximum API requests per second')
+@click.option('--burst', type=click.IntRange(min=1), default=100, show_default=True, help='API requests allowed in a burst above --qps')
+@click.option('--profile', is_flag=True, help='Print the API calls and stage timings to stderr at exit')
+@click.option('--profile-trace', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Also write a Chrome trace of the API calls and stages to this file')
+@click.option('--snapshot', 'snapshot_dir', type=click.Path(exists=True, file_okay=False), default=None,
+              help='Run the metrics, images, requests, replicas and overview reports against a snapshot, offline')
+@click.pass_context
+def k8snitch(ctx: click.Context, context: str, use_cache: bool, refresh: bool, cache_ttl: float,
+             qps: float, burst: int, profile: bool, profile_trace: str, snapshot_dir: str) -> None:
+    """
+    Fetch information from your Kubernetes cluster on the fly.
+    Run without a command for the interactive menu.
+    """
+    if profile or profile_trace:
+        profiler.PROFILER.enable()
+        ctx.call_on_close(lambda: _report_profile(trace=profile_trace))
+    if use_cache is None:
+        use_cache = os.environ.get('K8SNITCH_CACHE', '') not in ('', '0')
+    ctx.obj = {'context': context,
+               'cache': {'ttl': cache_ttl, 'refresh': refresh} if use_cache else None,
+               'limits': {'qps': qps, 'burst': burst},
+               'snapshot': snapshot_dir}
+    if ctx.invoked_subcommand is None:
+        if snapshot_dir:
+            raise click.UsageError('--snapshot needs a report command, e.g. images -A')
+        interactive(context=context, cache_options=ctx.obj['cache'], limits=ctx.obj['limits'])
+
+
+def _report_profile(trace: str = None) -> None:
+    """
+    Prints the profile summary to stderr and writes the trace file if asked
+
+    Args:
+        trace (str): Path of the Chrome trace file, None to skip it
+    """
+    click.echo(profiler.PROFILER.summary(), err=True)
+    if trace:
+        profiler.PROFILER.write_trace(path=trace)
+        click.echo(f'Trace written to {trace}', err=True)
+
+
+def _new_kuber(ctx: click.Context, offline: bool = False) -> "Kuber":
+    """
+    Loads the kubeconfig and builds a Kuber with the cache options
+    of the command line, or a SnapshotKuber when --snapshot was given
+
+    Args:
+        ctx (click.Context): Click context holding the context, cache and snapshot options
+        offline (bool): The command can run against a snapshot
+
+    Returns:
+        Kuber: Returns the Kuber
+    """
+    from k8s.cache import ResponseCache
+    from k8s.functions import Kuber
+
+    if ctx.obj['snapshot']:
+        if not offline:
+            raise click.UsageError(f'{ctx.info_name} needs the cluster, drop --snapshot')
+        return _open_snapshot_kuber(directory=ctx.obj['snapshot'])
+
+    Kuber.load_kube_config(context=ctx.obj['context'])
+    cache_options: dict = ctx.obj['cache']
+    context: str = ctx.obj['context'] or helpers.read_current_context()
+    return Kuber(cache=ResponseCache(context=context, **cache_options) if cache_options else None,
+                 **ctx.obj['limits'])
+
+
+def _open_snapshot_kuber(directory: str) -> "Kuber":
+    from k8s.snapshot import Snapshot, SnapshotKuber
+
+    try:
+        return SnapshotKuber(snapshot=Snapshot(directory=directory))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+def interactive(context: str = None, cache_options: dict = None, limits: dict = None) -> None:
+    """
+    Confirms the cluster and starts the interactive menu
+
+    Args:
+        context (str): Kubeconfig context to use, the current one if None
+        cache_options (dict): ResponseCache options, None to disable the cache
+        limits (dict): qps and burst of the API requests, the Kuber defaults if None
+    """
+    # The kubernetes client is slow to import, load it while the first prompt is shown
+    threading.Thread(target=importlib.import_module, args=('k8s.functions',), daemon=True).start()
+    current_context: str = context or helpers.read_current_context()
+    if not current_context:
+        print('No current context is set in your kubeconfig')
+        exit(1)
+    show_connected_cluster(context=current_context)
+
+    from k8s.cache import ResponseCache
+    from k8s.functions import Kuber
+    Kuber.load_kube_config(context=context)
+    kuber: Kuber = Kuber(cache=ResponseCache(context=current_context, **cache_options) if cache_options else None,
+                         **(limits or {}))
+    kuber.start_informers()
+    Session(kuber=kuber, cache_options=cache_options, limits=limits).run()
+
+
+def _namespace_options(func):
+    func = click.option('-o', '--output', 'output_format', type=click.Choice(output.OUTPUT_FORMATS),
+                        default='table', show_default=True, help='Output format')(func)
+    func = click.option('-A', '--all-namespaces', is_flag=True, help='Report on every namespace')(func)
+    func = click.option('-n', '--namespace', default=None, help='Namespace to report on')(func)
+    return func
+
+
+def _run_report(ctx: click.Context, report: str, namespace: str, all_namespaces: bool,
+                output_format: str) -> None:
+    """
+    Streams the rows of a Kuber report in the chosen output format
+    without any prompt
+
+    Args:
+        ctx (click.Context): Click context holding the kubeconfig context
+        report (str): Name of the report: pod_metrics, resources_requests, images or replicas
+        namespace (str): Namespace to report on
+        all_namespaces (bool): Report on every namespace instead
+        output_format (str): One of output.OUTPUT_FORMATS
+    """
+    if bool(namespace) == all_namespaces:
+        raise click.UsageError('Pass either --namespace or --all-namespaces')
+
+    from kubernetes.client.exceptions import ApiException
+    from k8s import functions
+
+    offline: bool = False
+    if ctx.obj['snapshot']:
+        # k8s.snapshot loads pyarrow, live reports don't need it
+        from k8s.snapshot import SNAPSHOT_REPORTS
+        offline = report in SNAPSHOT_REPORTS
+    kuber: Kuber = _new_kuber(ctx, offline=offline)
+    kwargs: dict = {'namespace': None if all_namespaces else namespace}
+    if report == 'images' and output_format != 'table':
+        kwargs['separator'] = ', '
+
+    try:
+        with profiler.PROFILER.stage(f'report {report}'):
+            output.write_rows(rows=getattr(kuber, f'{report}_rows')(**kwargs),
+                              headers=['Namespace'] + getattr(functions, f'{report.upper()}_HEADERS'),
+                              output=output_format)
+    except ApiException as e:
+        raise click.ClickException(f'Request failed with code {e.status}: {e.reason}')
+
+
+@k8snitch.command()
+@_namespace_options
+@click.pass_context
+def metrics(ctx: click.Context, namespace: str, all_namespaces: bool, output_format: str) -> None:
+    """Pod CPU and memory usage from the metrics server."""
+    _run_report(ctx, 'pod_metrics', namespace, all_namespaces, output_format)
+
+
+@k8snitch.command()
+@_namespace_options
+@click.pass_context
+def images(ctx: click.Context, namespace: str, all_namespaces: bool, output_format: str) -> None:
+    """Container images of the deployments and statefulsets."""
+    _run_report(ctx, 'images', namespace, all_namespaces, output_format)
+
+
+@k8snitch.command()
+@_namespace_options
+@click.pass_context
+def requests(ctx: click.Context, namespace: str, all_namespaces: bool, output_format: str) -> None:
+    """Resource requests and limits of every container."""
+    _run_report(ctx, 'resources_requests', namespace, all_namespaces, output_format)
+
+
+@k8snitch.command()
+@_namespace_options
+@click.pass_context
+def replicas(ctx: click.Context, namespace: str, all_namespaces: bool, output_format: str) -> None:
+    """Set and ready replica counts of the workloads."""
+    _run_report(ctx, 'replicas', namespace, all_namespaces, output_format)
+
+
+@k8snitch.command()
+@_namespace_options
+@click.pass_context
+def efficiency(ctx: click.Context, namespace: str, all_namespaces: bool, output_format: str) -> None:
+    """Live usage against the requests of every workload container."""
+    _run_report(ctx, 'efficiency', namespace, all_namespaces, output_format)
+
+
+@k8snitch.command()
+@click.option('-n', '--namespace', default=None, help='Namespace to report on')
+@click.option('-A', '--all-namespaces', is_flag=True, help='Report on every namespace')
+@click.pass_context
+def overview(ctx: click.Context, namespace: str, all_namespaces: bool) -> None:
+    """Images, requests, replicas and pods of a namespace from one snapshot."""
+    if bool(namespace) == all_namespaces:
+        raise click.UsageError('Pass either --namespace or --all-namespaces')
+
+    _new_kuber(ctx, offline=True).get_namespace_overview(namespace=None if all_namespaces else namespace)
+
+
+@k8snitch.command(name='clusters')
+@click.argument('report', type=click.Choice(['pod_metrics', 'images', 'resources_requests', 'replicas', 'efficiency']))
+@click.option('--cluster', 'contexts', multiple=True, help='Kubeconfig context to query, repeatable')
+@click.option('--all-contexts', is_flag=True, help='Query every context of the kubeconfig')
+@click.option('--timeout', type=float, default=60, show_default=True, help='Seconds to wait for each cluster')
+@_namespace_options
+@click.pass_context
+def clusters_command(ctx: click.Context, report: str, contexts: tuple, all_contexts: bool, timeout: float,
+                     namespace: str, all_namespaces: bool, output_format: str) -> None:
+    """Run a report across several clusters at once."""
+    if bool(contexts) == all_contexts:
+        raise click.UsageError('Pass either --cluster or --all-contexts')
+    if bool(namespace) == all_namespaces:
+        raise click.UsageError('Pass either --namespace or --all-namespaces')
+
+    if all_contexts:
+        from k8s import clusters
+        contexts = clusters.list_contexts()
+    run_across_clusters(contexts=list(contexts),
+                        report=report,
+                        namespace=None if all_namespaces else namespace,
+                        output_format=output_format,
+                        timeout=timeout,
+                        cache_options=ctx.obj['cache'],
+                        limits=ctx.obj['limits'])
+
+
+@k8snitch.command()
+@click.option('-n', '--namespace', default=None, help='Namespace to watch')
+@click.option('-A', '--all-namespaces', is_flag=True, help='Watch every namespace')
+@click.option('--interval', type=float, default=5, show_default=True, help='Seconds between samples')
+@click.option('--window', 'window_minutes', type=float, default=10, show_default=True,
+              help='Minutes of history for min/avg/p95 and trend')
+@click.pass_context
+def top(ctx: click.Context, namespace: str, all_namespaces: bool, interval: float, window_minutes: float) -> None:
+    """Live pod CPU and memory usage with history."""
+    if bool(namespace) == all_namespaces:
+        raise click.UsageError('Pass either --namespace or --all-namespaces')
+
+    _new_kuber(ctx).top_pods(namespace=None if all_namespaces else namespace,
+                     interval=interval,
+                     window_minutes=window_minutes)
+
+
+@k8snitch.command()
+@click.option('-n', '--namespace', required=True, help='Namespace of the workload')
+@click.option('--deployment', default=None, help='Deployment to read the logs from')
+@click.option('--statefulset', default=None, help='StatefulSet to read the logs from')
+@click.option('-f', '--follow', is_flag=True, help='Keep streaming new lines')
+@click.option('--tail', 'tail_lines', type=int, default=None, help='Lines from the end of the logs to show')
+@click.option('--since', 'since_seconds', type=int, default=None, help='Only logs newer than this many seconds')
+@click.option('--limit-bytes', type=int, default=None, help='Maximum bytes to read per container')
+@click.pass_context
+def logs(ctx: click.Context, namespace: str, deployment: str, statefulset: str, follow: bool,
+         tail_lines: int, since_seconds: int, limit_bytes: int) -> None:
+    """Stream the logs of a deployment or statefulset."""
+    if bool(deployment) == bool(statefulset):
+        raise click.UsageError('Pass either --deployment or --statefulset')
+
+    kuber: Kuber = _new_kuber(ctx)
+    if deployment:
+        label_selector: str = kuber.get_deployment_labels(deployment_name=deployment, namespace=namespace)
+    else:
+        label_selector: str = kuber.get_statefulset_labels(sts_name=statefulset, namespace=namespace)
+    kuber.stream_logs(namespace=namespace,
+                      label_selector=label_selector,
+                      follow=follow,
+                      tail_lines=tail_lines,
+                      since_seconds=since_seconds,
+                      limit_bytes=limit_bytes)
+
+
+@k8snitch.command()
+@click.argument('pattern')
+@click.option('-n', '--namespace', required=True, help='Namespace of the workload')
+@click.option('--deployment', default=None, help='Deployment to search the logs of')
+@click.option('--statefulset', default=None, help='StatefulSet to search the logs of')
+@click.option('--since', 'since_seconds', type=int, default=None, help='Only search logs newer than this many seconds')
+@click.option('-C', '--context-lines', 'context_lines', type=int, default=0, show_default=True,
+              help='Lines to show before and after each hit')
+@click.option('-i', '--ignore-case', is_flag=True, help='Match regardless of case')
+@click.option('--processes', type=int, default=1, show_default=True,
+              help='Processes matching the lines, 0 for one per CPU core')
+@click.pass_context
+def search(ctx: click.Context, pattern: str, namespace: str, deployment: str, statefulset: str,
+           since_seconds: int, context_lines: int, ignore_case: bool, processes: int) -> None:
+    """Search the logs of every pod of a workload for a regex."""
+    if bool(deployment) == bool(statefulset):
+        raise click.UsageError('Pass either --deployment or --statefulset')
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise click.BadParameter(str(e), param_hint='PATTERN')
+
+    kuber: Kuber = _new_kuber(ctx)
+    if deployment:
+        label_selector: str = kuber.get_deployment_labels(deployment_name=deployment, namespace=namespace)
+    else:
+        label_selector: str = kuber.get_statefulset_labels(sts_name=statefulset, namespace=namespace)
+    kuber.search_logs(namespace=namespace,
+                      label_selector=label_selector,
+                      pattern=pattern,
+                      since_seconds=since_seconds,
+                      context_lines=context_lines,
+                      ignore_case=ignore_case,
+                      processes=processes)
+
+
+@k8snitch.command(name='export')
+@click.option('-n', '--namespace', required=True, help='Namespace of the pods')
+@click.option('--deployment', default=None, help='Only export the pods of this deployment')
+@click.option('--statefulset', default=None, help='Only export the pods of this statefulset')
+@click.option('-d', '--directory', default='k8snitch-logs', show_default=True, help='Directory to export to')
+@click.option('--compression', type=click.Choice(['gzip', 'zstd']), default='gzip', show_default=True)
+@click.option('--workers', type=int, default=10, show_default=True, help='Containers downloaded at the same time')
+@click.pass_context
+def export_command(ctx: click.Context, namespace: str, deployment: str, statefulset: str, directory: str,
+                   compression: str, workers: int) -> None:
+    """Export logs to compressed files, only new lines on later runs."""
+    from k8s import logexport
+
+    if deployment and statefulset:
+        raise click.UsageError('Pass either --deployment or --statefulset')
+    if compression not in logexport.available_compressions():
+        raise click.UsageError('zstd compression needs the zstandard package: pip install zstandard')
+
+    kuber: Kuber = _new_kuber(ctx)
+    label_selector: str = None
+    if deployment:
+        label_selector = kuber.get_deployment_labels(deployment_name=deployment, namespace=namespace)
+    elif statefulset:
+        label_selector = kuber.get_statefulset_labels(sts_name=statefulset, namespace=namespace)
+    kuber.export_logs(namespace=namespace,
+                      directory=directory,
+                      label_selector=label_selector,
+                      compression=compression,
+                      max_workers=workers)
+
+
+@k8snitch.command()
+@_namespace_options
+@click.option('--image', default=None, help='Image reference or glob to look for, e.g. nginx:1.25 or *redis*')
+@click.option('--group-by', type=click.Choice(['registry', 'repository', 'tag', 'digest']), default=None,
+              help='Count the images per group instead of listing the containers')
+@click.pass_context
+def inventory(ctx: click.Context, namespace: str, all_namespaces: bool, output_format: str, image: str,
+              group_by: str) -> None:
+    """Image inventory of workloads, jobs and running pods."""
+    if bool(namespace) == all_namespaces:
+        raise click.UsageError('Pass either --namespace or --all-namespaces')
+
+    from kubernetes.client.exceptions import ApiException
+    from k8s import functions
+
+    kuber: Kuber = _new_kuber(ctx)
+    chosen_ns: str = None if all_namespaces else namespace
+    try:
+        with profiler.PROFILER.stage('report image_inventory'):
+            if group_by:
+                output.write_rows(rows=kuber.image_groups_rows(namespace=chosen_ns, group_by=group_by, image=image),
+                                  headers=[group_by.capitalize()] + functions.IMAGE_GROUPS_HEADERS,
+                                  output=output_format)
+            else:
+                output.write_rows(rows=kuber.image_inventory_rows(namespace=chosen_ns, image=image),
+                                  headers=['Namespace'] + functions.IMAGE_INVENTORY_HEADERS,
+                                  output=output_format)
+    except ApiException as e:
+        raise click.ClickException(f'Request failed with code {e.status}: {e.reason}')
+
+
+@k8snitch.group(name='snapshot')
+def snapshot_group() -> None:
+    """Save the cluster to a columnar snapshot and compare snapshots."""
+
+
+@snapshot_group.command(name='save')
+@click.argument('directory', type=click.Path(file_okay=False))
+@click.option('-n', '--namespace', default=None, help='Namespace to capture')
+@click.option('-A', '--all-namespaces', is_flag=True, help='Capture every namespace')
+@click.option('--format', 'snapshot_format', type=click.Choice(['arrow', 'parquet']), default='arrow',
+              show_default=True, help='arrow files are memory-mapped when read, parquet files are smaller')
+@click.pass_context
+def snapshot_save(ctx: click.Context, directory: str, namespace: str, all_namespaces: bool,
+                  snapshot_format: str) -> None:
+    """Capture namespaces, workloads, pods and metrics to DIRECTORY."""
+    if bool(namespace) == all_namespaces:
+        raise click.UsageError('Pass either --namespace or --all-namespaces')
+
+    from kubernetes.client.exceptions import ApiException
+    from k8s import snapshot
+
+    kuber: Kuber = _new_kuber(ctx)
+    try:
+        with profiler.PROFILER.stage('snapshot capture'):
+            tables: dict = snapshot.capture(kuber=kuber, namespace=None if all_namespaces else namespace)
+        with profiler.PROFILER.stage('snapshot write'):
+            meta: dict = snapshot.write(tables=tables, directory=directory, snapshot_format=snapshot_format,
+                                        meta={'context': ctx.obj['context'] or helpers.read_current_context(),
+                                              'namespace': None if all_namespaces else namespace})
+    except ApiException as e:
+        raise click.ClickException(f'Request failed with code {e.status}: {e.reason}')
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Snapshot written to {directory}: '
+               + ', '.join(f'{rows} {table.replace("_", " ")}' for table, rows in meta['rows'].items()))
+
+
+@snapshot_group.command(name='diff')
+@click.argument('old', type=click.Path(exists=True, file_okay=False))
+@click.argument('new', type=click.Path(exists=True, file_okay=False))
+@click.option('-o', '--output', 'output_format', type=click.Choice(output.OUTPUT_FORMATS),
+              default='table', show_default=True, help='Output format')
+def snapshot_diff(old: str, new: str, output_format: str) -> None:
+    """Workloads, replicas, images and requests that drifted from OLD to NEW."""
+    from k8s import snapshot
+
+    try:
+        before, after = snapshot.Snapshot(directory=old), snapshot.Snapshot(directory=new)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if before.namespace != after.namespace:
+        click.echo(click.style(f'Comparing snapshots of different scopes: {before.namespace or "all namespaces"}'
+                               f' and {after.namespace or "all namespaces"}', fg='red'), err=True)
+    with profiler.PROFILER.stage('snapshot diff'):
+        output.write_rows(rows=snapshot.diff(old=before, new=after),
+                          headers=snapshot.DIFF_HEADERS,
+                          output=output_format)
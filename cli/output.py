@@ -0,0 +1,49 @@
+import csv
+import json
+import sys
+from typing import Iterable
+
+from tabulate import tabulate
+
+from helpers import profiler
+
+OUTPUT_FORMATS: list = ['table', 'json', 'ndjson', 'csv']
+
+
+def write_rows(rows: Iterable, headers: list, output: str, stream=None) -> None:
+    """
+    Writes report rows in the chosen format. Every format except
+    the table is written row by row as the rows are produced
+
+    Args:
+        rows (Iterable): Rows of the report
+        headers (list): Headers matching the columns of the rows
+        output (str): One of OUTPUT_FORMATS
+        stream (TextIO): Where to write, stdout by default
+    """
+    stream = stream or sys.stdout
+
+    match output:
+        case 'table':
+            data: list = list(rows)
+            with profiler.PROFILER.stage('render'):
+                table: str = tabulate(data, headers=headers, tablefmt='grid', showindex=range(1, len(data) + 1))
+            stream.write(table + '\n')
+        case 'ndjson':
+            for row in rows:
+                stream.write(json.dumps(dict(zip(headers, row)), default=str) + '\n')
+                stream.flush()
+        case 'json':
+            # Written as the rows arrive, so the array is never held in memory
+            stream.write('[')
+            for i, row in enumerate(rows):
+                stream.write((',\n' if i else '\n') + json.dumps(dict(zip(headers, row)), default=str))
+            stream.write('\n]\n')
+        case 'csv':
+            writer = csv.writer(stream)
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow(row)
+                stream.flush()
+        case _:
+            raise ValueError(f'Unknown output format: {output}')
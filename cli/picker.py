@@ -0,0 +1,299 @@
+import queue
+import shutil
+import sys
+import threading
+from collections import defaultdict
+from typing import Iterable
+
+import click
+
+PICKER_HEIGHT: int = 12
+# Names handed from the loading thread to the picker at a time
+LOAD_BATCH: int = 500
+# Seconds between checks for newly loaded names while the list is loading
+LOAD_POLL_SECONDS: float = 0.05
+WORD_SEPARATORS: str = '-_./'
+GRAM_SIZES: tuple = (1, 2, 3)
+# Shorter queries only match substrings, fuzzy matches of 1 or 2 characters are mostly noise
+FUZZY_MIN_LENGTH: int = 3
+
+
+class NameIndex():
+    """
+    Search index over names for type-ahead filtering. Every name is
+    indexed by its 1, 2 and 3 character grams, and separately by
+    the grams it starts with and the grams starting one of its
+    words, so a query of up to 3 characters is answered and ranked
+    from the postings alone. Longer queries only verify the names
+    holding all of their trigrams. Fuzzy (subsequence) matches are
+    added from 3 characters on. A query that extends the previous
+    one only narrows its results, so typing filters the last
+    matches instead of the whole index
+    """
+    def __init__(self, names: Iterable = ()) -> None:
+        self._names: list = []
+        self._lower: list = []
+        self._grams: defaultdict = defaultdict(list)
+        self._prefixes: defaultdict = defaultdict(list)
+        self._word_starts: defaultdict = defaultdict(list)
+        self._last: tuple = ('', None)
+        self.extend(names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def extend(self, names: Iterable) -> None:
+        """
+        Adds names to the index
+
+        Args:
+            names (Iterable): Names to add, in display order
+        """
+        for name in names:
+            lower: str = name.lower()
+            index: int = len(self._names)
+            self._names.append(name)
+            self._lower.append(lower)
+            for gram in {lower[start:start + size] for size in GRAM_SIZES for start in range(len(lower) - size + 1)}:
+                self._grams[gram].append(index)
+            for size in GRAM_SIZES:
+                if len(lower) >= size:
+                    self._prefixes[lower[:size]].append(index)
+            word_grams: set = {lower[start:start + size] for size in GRAM_SIZES
+                               for start in range(1, len(lower) - size + 1)
+                               if lower[start - 1] in WORD_SEPARATORS}
+            for gram in word_grams:
+                self._word_starts[gram].append(index)
+        self._last = ('', None)
+
+    def search(self, query: str) -> list:
+        """
+        Finds the names matching a query, prefix matches first, then
+        matches at the start of a word, other substrings and finally
+        fuzzy matches holding the query characters in order. Names
+        keep their order within each group
+
+        Args:
+            query (str): Text typed so far
+
+        Returns:
+            list: Returns the matching names, best first
+        """
+        query = query.lower()
+        if not query:
+            return list(self._names)
+
+        last_query, last_matches = self._last
+        # Results of a shorter query only hold fuzzy matches once it was long enough to look for them
+        reuse: bool = (last_matches is not None and query.startswith(last_query)
+                       and (len(last_query) >= FUZZY_MIN_LENGTH or len(query) < FUZZY_MIN_LENGTH))
+
+        if len(query) <= max(GRAM_SIZES):
+            substring: list = self._grams.get(query, [])
+            prefix: list = self._prefixes.get(query, [])
+            word_start: list = self._word_starts.get(query, [])
+        else:
+            candidates: list = last_matches if reuse else self._holding(
+                [query[start:start + 3] for start in range(len(query) - 2)])
+            lower: list = self._lower
+            substring: list = [index for index in candidates if query in lower[index]]
+            prefix: list = [index for index in substring if lower[index].startswith(query)]
+            # Only names with a word starting with the first trigram can have one starting with the query
+            starts: set = set(self._word_starts.get(query[:3], []))
+            word_start: list = [index for index in substring if index in starts
+                                and any(separator + query in lower[index] for separator in WORD_SEPARATORS)]
+
+        ranked: set = set(prefix)
+        matches: list = list(prefix)
+        matches += [index for index in word_start if index not in ranked]
+        ranked.update(word_start)
+        matches += [index for index in substring if index not in ranked]
+
+        if len(query) >= FUZZY_MIN_LENGTH:
+            ranked.update(substring)
+            pool: list = last_matches if reuse else self._holding(list(query))
+            matches += [index for index in pool
+                        if index not in ranked and self._is_subsequence(query, self._lower[index])]
+
+        self._last = (query, sorted(matches))
+        return [self._names[index] for index in matches]
+
+    def _holding(self, grams: list) -> list:
+        # Names holding every gram, in index order
+        postings: list = sorted((self._grams.get(gram, []) for gram in set(grams)), key=len)
+        if not postings or not postings[0]:
+            return []
+        candidates: set = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+        return sorted(candidates)
+
+    def _is_subsequence(self, query: str, text: str) -> bool:
+        position: int = -1
+        for char in query:
+            position = text.find(char, position + 1)
+            if position < 0:
+                return False
+        return True
+
+
+def pick(message: str, source, default: str = None, pinned: list = None, height: int = PICKER_HEIGHT) -> str:
+    """
+    Type-ahead picker. Opens at once while the names load in the
+    background, filters them through a NameIndex on every keystroke
+    and redraws only the lines of the visible window that changed.
+    Falls back to a plain inquirer list when not on a terminal
+
+    Args:
+        message (str): Prompt shown before the query
+        source (list | callable): Names, or a function returning them, run in a background thread
+        default (str): Name selected once it's loaded, until the selection is moved
+        pinned (list): Choices listed before the names, e.g. All namespaces
+        height (int): Maximum number of names shown at once
+
+    Returns:
+        str: Returns the chosen name, None if there was nothing to choose from
+    """
+    import blessed
+
+    term = blessed.Terminal()
+    if not term.is_a_tty:
+        return _pick_from_list(message=message, names=(pinned or []) + list(source() if callable(source) else source),
+                               default=default)
+
+    loaded: queue.Queue = queue.Queue()
+    threading.Thread(target=_load, args=(source, loaded), daemon=True).start()
+
+    index: NameIndex = NameIndex(pinned or [])
+    view = _PickerView(message=message,
+                       height=max(1, min(height, shutil.get_terminal_size().lines - 3)))
+    query: str = ''
+    matches: list = index.search(query)
+    selected: int = 0
+    moved: bool = False
+    loading: bool = True
+
+    with term.cbreak():
+        try:
+            while True:
+                while loading and not loaded.empty():
+                    names = loaded.get()
+                    if isinstance(names, BaseException):
+                        raise names
+                    if names is None:
+                        loading = False
+                        continue
+                    index.extend(names)
+                    matches = index.search(query)
+                    if not moved and default in matches:
+                        selected = matches.index(default)
+
+                if not loading and not len(index):
+                    view.close(answer=None)
+                    return None
+
+                view.render(query=query, matches=matches, selected=selected,
+                            status=f'{len(matches)}/{len(index)}{" loading..." if loading else ""}')
+
+                key = term.inkey(timeout=LOAD_POLL_SECONDS if loading else None)
+                if not key:
+                    continue
+                if key.code == term.KEY_ENTER:
+                    if matches:
+                        view.close(answer=matches[selected])
+                        return matches[selected]
+                elif key.code in (term.KEY_UP, term.KEY_DOWN, term.KEY_PGUP, term.KEY_PGDOWN):
+                    step: int = {term.KEY_UP: -1, term.KEY_DOWN: 1,
+                                 term.KEY_PGUP: -view.height, term.KEY_PGDOWN: view.height}[key.code]
+                    selected = max(0, min(len(matches) - 1, selected + step))
+                    moved = True
+                elif key.code in (term.KEY_BACKSPACE, term.KEY_DELETE) or key.code == term.KEY_ESCAPE:
+                    query = '' if key.code == term.KEY_ESCAPE else query[:-1]
+                    matches = index.search(query)
+                    selected = 0
+                elif not key.is_sequence and key.isprintable():
+                    query += str(key)
+                    matches = index.search(query)
+                    selected = 0
+        except KeyboardInterrupt:
+            view.close(answer=None)
+            raise
+
+
+class _PickerView():
+    """
+    Draws the query line, the visible window of matches and a
+    status line below the cursor, rewriting only the lines that
+    changed since the last render
+    """
+    def __init__(self, message: str, height: int, stream=None) -> None:
+        self.height = height
+        self._message = message
+        self._stream = stream or sys.stdout
+        self._lines: list = []
+        self._offset: int = 0
+        # Make room below the prompt so relative moves never scroll
+        self._stream.write('\n' * (height + 1) + f'\x1b[{height + 1}A')
+
+    def render(self, query: str, matches: list, selected: int, status: str) -> None:
+        if selected < self._offset:
+            self._offset = selected
+        elif selected >= self._offset + self.height:
+            self._offset = selected - self.height + 1
+        self._offset = max(0, min(self._offset, len(matches) - self.height))
+
+        width: int = shutil.get_terminal_size().columns - 1
+        prompt: str = f'? {self._message}: {query}'[:width]
+        lines: list = [prompt]
+        for position in range(self._offset, self._offset + self.height):
+            if position >= len(matches):
+                lines.append('')
+            elif position == selected:
+                lines.append(click.style(f'> {matches[position]}'[:width], fg='cyan'))
+            else:
+                lines.append(f'  {matches[position]}'[:width])
+        lines.append(click.style(f'  {status}  (type to filter, arrows to move, Enter to choose)'[:width], dim=True))
+
+        for number, line in enumerate(lines):
+            if number >= len(self._lines) or self._lines[number] != line:
+                self._write_line(number=number, line=line)
+        self._lines = lines
+        # Back to the end of the query
+        self._stream.write(f'\r\x1b[{len(prompt)}C' if prompt else '\r')
+        self._stream.flush()
+
+    def close(self, answer: str) -> None:
+        # Clear the window and leave a single line with the answer
+        self._stream.write('\r\x1b[J')
+        self._stream.write(f'? {self._message}: {answer}\n' if answer is not None else '\n')
+        self._stream.flush()
+
+    def _write_line(self, number: int, line: str) -> None:
+        down: str = f'\x1b[{number}B' if number else ''
+        up: str = f'\x1b[{number}A' if number else ''
+        self._stream.write(f'{down}\r{line}\x1b[K{up}')
+
+
+def _load(source, loaded: queue.Queue) -> None:
+    try:
+        batch: list = []
+        for name in (source() if callable(source) else source):
+            batch.append(name)
+            if len(batch) >= LOAD_BATCH:
+                loaded.put(batch)
+                batch = []
+        if batch:
+            loaded.put(batch)
+        loaded.put(None)
+    except BaseException as e:
+        # Raised again in the picker, including the SystemExit of a failed list
+        loaded.put(e)
+
+
+def _pick_from_list(message: str, names: list, default: str = None) -> str:
+    import inquirer
+
+    if not names:
+        return None
+    answers: dict = inquirer.prompt([inquirer.List('option', message=message, choices=names, default=default)])
+    return answers["option"]
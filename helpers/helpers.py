@@ -1,6 +1,13 @@
+import os
+
+import yaml
+
+from helpers import quantity
+
+
 def convert_cpu_to_cores(cpu: str) -> float:
     """
-    Converts cpu millicores to cores
+    Converts a CPU quantity (nanocores, millicores, cores...) to cores
 
     Args:
         cpu (str): CPU ammount for a pod
@@ -8,26 +15,58 @@ def convert_cpu_to_cores(cpu: str) -> float:
     Returns:
         float: Returns a float with the CPU cores value
     """
-    if cpu.endswith('n'):
-        return int(cpu[:-1]) / 1e9  # Convert nanocores to cores
-    if cpu.endswith('u'):
-        return int(cpu[:-1]) / 1e6  # Convert microcores to cores
-    if cpu.endswith('m'):
-        return int(cpu[:-1]) / 1000  # Convert millicores to cores
-    return float(cpu)  # Assume the value is in cores if no unit
+    return quantity.parse_quantity(cpu)
 
-def convert_memory_to_mb(memory: str) -> int:
+def convert_memory_to_mb(memory: str) -> float:
     """
-    Converts Memory value to Mi
+    Converts a Memory quantity (binary or decimal SI) to Mi
 
     Args:
         memory (str): Memory value for each pod
 
     Returns:
-        int: Returns a Memory value in Mi
+        float: Returns a Memory value in Mi
+    """
+    return quantity.parse_quantity(memory) / quantity.MEBIBYTE
+
+
+def match_label_selector(labels: dict, label_selector: str) -> bool:
+    """
+    Checks if a set of labels matches an equality based
+    label selector such as "app=web,tier=frontend"
+
+    Args:
+        labels (dict): Labels of the object
+        label_selector (str): Label selector to match
+
+    Returns:
+        bool: Returns True if every requirement in the selector is met
+    """
+    labels = labels or {}
+    for requirement in filter(None, label_selector.split(',')):
+        key, _, value = requirement.partition('=')
+        if labels.get(key.strip()) != value.lstrip('=').strip():
+            return False
+    return True
+
+
+
+def read_current_context() -> str:
+    """
+    Reads the current context straight from the kubeconfig files
+    without importing the kubernetes client, so the first prompt
+    can be shown right away
+
+    Returns:
+        str: Returns the current context, None if none is set
     """
-    units: dict = {'Ki': 1 / 1024, 'Mi': 1, 'Gi': 1024, 'Ti': 1024 ** 2, 'Pi': 1024 ** 3, 'Ei': 1024 ** 4}
-    for unit, factor in units.items():
-        if memory.endswith(unit):
-            return int(memory[:-len(unit)]) * factor
-    return int(memory) / (1024 ** 2) 
\ No newline at end of file
+    paths: str = os.environ.get('KUBECONFIG') or os.path.join('~', '.kube', 'config')
+    for path in paths.split(os.pathsep):
+        path = os.path.expanduser(path)
+        if not os.path.isfile(path):
+            continue
+        with open(path) as f:
+            kubeconfig: dict = yaml.safe_load(f) or {}
+        if kubeconfig.get('current-context'):
+            return kubeconfig['current-context']
+    return None
@@ -0,0 +1,209 @@
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+# Object names in API paths, replaced so calls group by endpoint
+_PATH_NAMES = [(re.compile(r'/namespaces/[^/]+'), '/namespaces/{namespace}'),
+               (re.compile(r'/(pods|deployments|statefulsets|replicasets)/[^/]+'), r'/\1/{name}')]
+
+
+class CallRecord(NamedTuple):
+    method: str
+    endpoint: str
+    status: int
+    start: float
+    seconds: float
+    size: int
+    objects: int
+    retries: int
+    thread: int
+
+
+class Profiler():
+    """
+    Records the latency, response size, object count and retries
+    of every API call made through an instrumented ApiClient, and
+    the time spent in named stages such as decoding, quantity
+    parsing and rendering. Stages nest, so their times are
+    inclusive. Does nothing until enabled
+    """
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin: float = time.perf_counter()
+        # Mutable [method, endpoint, status, start, seconds, size, objects, retries, thread] per call
+        self._calls: list = []
+        # (name, start, seconds, thread) per stage
+        self._stages: list = []
+
+    def enable(self) -> None:
+        self._origin = time.perf_counter()
+        self.enabled = True
+
+    def instrument(self, api_client) -> None:
+        """
+        Wraps the request and deserialize methods of a kubernetes
+        ApiClient so every call it makes is recorded. Safe to call
+        more than once on the same client
+
+        Args:
+            api_client (client.ApiClient): Client to instrument
+        """
+        if not self.enabled or getattr(api_client, '_profiled', False):
+            return
+        request, deserialize = api_client.request, api_client.deserialize
+
+        def profiled_request(method: str, url: str, *args, **kwargs):
+            call: list = [method, self._endpoint(url), None, time.perf_counter(), None, None, None, 0,
+                          threading.get_ident()]
+            self._local.call = call
+            try:
+                resp = request(method, url, *args, **kwargs)
+                call[2] = resp.status
+                raw = getattr(resp, 'urllib3_response', resp)
+                if kwargs.get('_preload_content', True):
+                    call[5] = len(resp.data)
+                elif raw.headers.get('Content-Length'):
+                    # Streamed bodies are sized by annotate() once read, if they're read whole
+                    call[5] = int(raw.headers['Content-Length'])
+                call[7] += len(raw.retries.history) if getattr(raw, 'retries', None) else 0
+                return resp
+            except Exception as e:
+                call[2] = getattr(e, 'status', None) or type(e).__name__
+                raise
+            finally:
+                call[4] = time.perf_counter() - call[3]
+                with self._lock:
+                    self._calls.append(call)
+
+        def profiled_deserialize(response, response_type):
+            with self.stage('deserialize'):
+                data = deserialize(response, response_type)
+            if isinstance(getattr(data, 'items', None), list):
+                self.annotate(objects=len(data.items))
+            return data
+
+        api_client.request = profiled_request
+        api_client.deserialize = profiled_deserialize
+        api_client._profiled = True
+
+    def annotate(self, size: int = None, objects: int = None, retries: int = None) -> None:
+        """
+        Adds what's only known after the response was read, the size
+        of a streamed body or the number of objects decoded, to the
+        last call of the current thread
+
+        Args:
+            size (int): Bytes of the response body
+            objects (int): Objects in the response
+            retries (int): Retries to add to the call
+        """
+        call: list = getattr(self._local, 'call', None) if self.enabled else None
+        if call is None:
+            return
+        if size is not None:
+            call[5] = size
+        if objects is not None:
+            call[6] = objects
+        if retries is not None:
+            call[7] += retries
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        Times the body of the with block as a named stage
+        """
+        if not self.enabled:
+            yield
+            return
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._stages.append((name, start, time.perf_counter() - start, threading.get_ident()))
+
+    def calls(self) -> list:
+        with self._lock:
+            return [CallRecord(*call) for call in self._calls]
+
+    def summary(self) -> str:
+        """
+        Summarizes the calls per endpoint and the stages
+
+        Returns:
+            str: Returns the two tables
+        """
+        from tabulate import tabulate
+
+        endpoints: dict = {}
+        for call in self.calls():
+            endpoints.setdefault((call.method, call.endpoint), []).append(call)
+        call_rows: list = []
+        for (method, endpoint), calls in sorted(endpoints.items(), key=lambda item: -sum(c.seconds for c in item[1])):
+            latencies: list = sorted(call.seconds for call in calls)
+            sizes: list = [call.size for call in calls if call.size is not None]
+            call_rows.append([f'{method} {endpoint}', len(calls),
+                              sum(1 for call in calls if not isinstance(call.status, int) or call.status >= 400),
+                              f'{sum(latencies):.3f}',
+                              f'{sum(latencies) / len(latencies) * 1000:.1f}',
+                              f'{latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.1f}',
+                              f'{latencies[-1] * 1000:.1f}',
+                              sum(sizes) if sizes else '-',
+                              sum(call.objects or 0 for call in calls),
+                              sum(call.retries for call in calls)])
+
+        stages: dict = {}
+        with self._lock:
+            for name, _, seconds, _ in self._stages:
+                stages.setdefault(name, []).append(seconds)
+        stage_rows: list = [[name, len(times), f'{sum(times):.3f}', f'{sum(times) / len(times) * 1000:.1f}']
+                            for name, times in sorted(stages.items(), key=lambda item: -sum(item[1]))]
+
+        return '\n'.join([
+            f'API calls, {sum(row[1] for row in call_rows)} in total '
+            f'over {time.perf_counter() - self._origin:.2f}s:',
+            tabulate(call_rows, headers=['Endpoint', 'Calls', 'Errors', 'Total(s)', 'Mean(ms)', 'p95(ms)',
+                                         'Max(ms)', 'Bytes', 'Objects', 'Retries'], tablefmt='grid'),
+            'Stages, inclusive of nested stages:',
+            tabulate(stage_rows, headers=['Stage', 'Count', 'Total(s)', 'Mean(ms)'], tablefmt='grid'),
+        ])
+
+    def write_trace(self, path: str) -> None:
+        """
+        Writes the calls and stages in the Chrome trace event format,
+        which chrome://tracing and Perfetto open
+
+        Args:
+            path (str): Path of the trace file
+        """
+        events: list = []
+        for call in self.calls():
+            events.append({'name': f'{call.method} {call.endpoint}', 'cat': 'api', 'ph': 'X',
+                           'ts': (call.start - self._origin) * 1e6, 'dur': call.seconds * 1e6,
+                           'pid': os.getpid(), 'tid': call.thread,
+                           'args': {'status': call.status, 'bytes': call.size,
+                                    'objects': call.objects, 'retries': call.retries}})
+        with self._lock:
+            stages: list = list(self._stages)
+        for name, start, seconds, thread in stages:
+            events.append({'name': name, 'cat': 'stage', 'ph': 'X', 'ts': (start - self._origin) * 1e6,
+                           'dur': seconds * 1e6, 'pid': os.getpid(), 'tid': thread})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+    def _endpoint(self, url: str) -> str:
+        path: str = urlparse(url).path
+        for pattern, replacement in _PATH_NAMES:
+            path = pattern.sub(replacement, path)
+        return path
+
+
+# Shared by the whole process, enabled by --profile
+PROFILER: Profiler = Profiler()
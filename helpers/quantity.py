@@ -0,0 +1,84 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from helpers import profiler
+
+BINARY_SUFFIXES: dict = {'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40, 'Pi': 2 ** 50, 'Ei': 2 ** 60}
+DECIMAL_SUFFIXES: dict = {'n': 1e-9, 'u': 1e-6, 'm': 1e-3, '': 1, 'k': 1e3, 'M': 1e6,
+                          'G': 1e9, 'T': 1e12, 'P': 1e15, 'E': 1e18}
+MEBIBYTE: int = 2 ** 20
+
+# <signedNumber><suffix>, the suffix being binary SI, decimal SI or a decimal exponent
+_QUANTITY = re.compile(r'^([+-]?(?:\d+\.?\d*|\.\d+))(?:[eE]([+-]?\d+)|([a-zA-Z]*))$')
+
+
+@lru_cache(maxsize=4096)
+def parse_quantity(quantity: str) -> float:
+    """
+    Parses a Kubernetes quantity such as "250m", "1.5Gi", "2k"
+    or "12e6" into its plain value. Results are memoized since
+    the same few quantities repeat across a cluster
+
+    Args:
+        quantity (str): Kubernetes quantity
+
+    Raises:
+        ValueError: If the quantity is not valid
+
+    Returns:
+        float: Returns the value in base units, cores or bytes
+    """
+    match = _QUANTITY.match(str(quantity).strip())
+    if not match:
+        raise ValueError(f'Invalid quantity: {quantity!r}')
+
+    number, exponent, suffix = match.groups()
+    if exponent is not None:
+        return float(number) * 10 ** int(exponent)
+    if suffix in BINARY_SUFFIXES:
+        return float(number) * BINARY_SUFFIXES[suffix]
+    if suffix in DECIMAL_SUFFIXES:
+        return float(number) * DECIMAL_SUFFIXES[suffix]
+    raise ValueError(f'Invalid quantity suffix: {quantity!r}')
+
+
+def parse_quantities(quantities: Iterable):
+    """
+    Parses a column of quantities into a NumPy array. Each
+    distinct quantity is parsed once and the values are spread
+    back to the column by index
+
+    Args:
+        quantities (Iterable): Kubernetes quantities, None or "None" are read as 0
+
+    Returns:
+        numpy.ndarray: Returns the values in base units, cores or bytes
+    """
+    import numpy as np
+
+    with profiler.PROFILER.stage('parse quantities'):
+        column = np.asarray([q if q not in (None, "None") else "0" for q in quantities], dtype=str)
+        if not column.size:
+            return np.zeros(0)
+        uniques, inverse = np.unique(column, return_inverse=True)
+        values = np.fromiter((parse_quantity(q) for q in uniques), dtype=float, count=len(uniques))
+        return values[inverse]
+
+
+def sum_by_group(values, groups, size: int):
+    """
+    Sums values that belong to the same group, e.g. the containers
+    of a pod
+
+    Args:
+        values (numpy.ndarray): Values to sum
+        groups (numpy.ndarray): Group index of every value
+        size (int): Number of groups
+
+    Returns:
+        numpy.ndarray: Returns the total of every group
+    """
+    import numpy as np
+
+    return np.bincount(np.asarray(groups, dtype=np.intp), weights=values, minlength=size)
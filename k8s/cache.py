@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import time
+from typing import NamedTuple
+
+CACHE_DIR: str = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join('~', '.cache'), 'k8snitch')
+CACHE_TTL_SECONDS: float = 300
+CACHE_MAX_BYTES: int = 256 * 1024 ** 2
+
+
+class CacheEntry(NamedTuple):
+    value: object
+    versions: dict
+    fresh: bool
+
+
+class ResponseCache():
+    """
+    On disk cache for list responses and report data of one
+    kubeconfig context. Entries are keyed by context, namespace
+    and kind, stay fresh for the TTL and keep the resourceVersions
+    they were built from so expired entries can be revalidated
+    instead of fetched again. The oldest files are evicted once
+    the directory grows over max_bytes
+    """
+    def __init__(self, context: str, directory: str = CACHE_DIR, ttl: float = CACHE_TTL_SECONDS,
+                 max_bytes: int = CACHE_MAX_BYTES, refresh: bool = False) -> None:
+        self._context = context
+        self._directory = os.path.expanduser(directory)
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._refresh = refresh
+
+    def get(self, namespace: str, kind: str) -> CacheEntry:
+        """
+        Reads an entry
+
+        Args:
+            namespace (str): Namespace of the data, None for cluster wide data
+            kind (str): Kind of the data, e.g. namespaces or workloads
+
+        Returns:
+            CacheEntry: Returns the entry, None if it's missing or refresh was asked
+        """
+        if self._refresh:
+            return None
+        path: str = self._path(namespace=namespace, kind=kind)
+        try:
+            with open(path) as f:
+                data: dict = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(value=data['value'],
+                          versions=data.get('versions') or {},
+                          fresh=time.time() - data['created'] < self._ttl)
+
+    def put(self, namespace: str, kind: str, value, versions: dict = None) -> None:
+        """
+        Writes an entry and evicts the oldest ones if the cache is too big
+
+        Args:
+            namespace (str): Namespace of the data, None for cluster wide data
+            kind (str): Kind of the data
+            value (object): JSON serializable data
+            versions (dict): API path -> resourceVersion the data was built from
+        """
+        os.makedirs(self._directory, exist_ok=True)
+        path: str = self._path(namespace=namespace, kind=kind)
+        # Write to a temporary file first so readers never see half an entry
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump({'context': self._context, 'namespace': namespace, 'kind': kind,
+                       'created': time.time(), 'versions': versions or {}, 'value': value},
+                      f, default=str)
+        os.replace(f'{path}.tmp', path)
+        self._evict()
+
+    def touch(self, namespace: str, kind: str) -> None:
+        """
+        Marks a revalidated entry as fresh again
+
+        Args:
+            namespace (str): Namespace of the data
+            kind (str): Kind of the data
+        """
+        entry: CacheEntry = self.get(namespace=namespace, kind=kind)
+        if entry:
+            self.put(namespace=namespace, kind=kind, value=entry.value, versions=entry.versions)
+
+    def _path(self, namespace: str, kind: str) -> str:
+        key: str = '\0'.join([self._context or '', namespace or '', kind])
+        return os.path.join(self._directory, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _evict(self) -> None:
+        files: list = []
+        for entry in os.scandir(self._directory):
+            try:
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                # Removed by another process meanwhile
+                continue
+        total: int = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self._max_bytes:
+                return
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
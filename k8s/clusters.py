@@ -0,0 +1,95 @@
+import queue
+import threading
+import time
+from typing import Iterator
+
+from kubernetes import config
+
+from k8s import functions
+from k8s.cache import ResponseCache
+
+CLUSTER_TIMEOUT_SECONDS: float = 60
+# Reports that can fan out, the name of their Kuber *_rows method and *_HEADERS constant
+REPORTS: list = ['pod_metrics', 'images', 'resources_requests', 'replicas', 'efficiency']
+
+
+def list_contexts() -> list:
+    """
+    Lists the contexts of the kubeconfig
+
+    Returns:
+        list: Returns the context names
+    """
+    contexts, _ = config.list_kube_config_contexts()
+    return [context['name'] for context in contexts]
+
+
+def report_headers(report: str) -> list:
+    """
+    Headers of a fanned out report, its rows start with the cluster and namespace
+
+    Args:
+        report (str): One of REPORTS
+
+    Returns:
+        list: Returns the headers
+    """
+    return ['Cluster', 'Namespace'] + getattr(functions, f'{report.upper()}_HEADERS')
+
+
+def fan_out(contexts: list, report: str, namespace: str, timeout: float = CLUSTER_TIMEOUT_SECONDS,
+            errors: list = None, cache_options: dict = None, limits: dict = None) -> Iterator:
+    """
+    Runs a report against several clusters at the same time, each
+    with its own ApiClient, and yields the rows of every cluster
+    that answered within the timeout as soon as it finishes, so the
+    whole run takes about as long as the slowest cluster
+
+    Args:
+        contexts (list): Kubeconfig contexts to query
+        report (str): One of REPORTS
+        namespace (str): Namespace to report on, None for all namespaces
+        timeout (float): Seconds to wait for each cluster, measured from the start
+        errors (list): Collects a (context, message) tuple for every failed or timed out cluster
+        cache_options (dict): ResponseCache options, None to disable the cache
+        limits (dict): qps and burst of each cluster's API requests, the Kuber defaults if None
+
+    Yields:
+        list: Rows prefixed with the cluster name
+    """
+    results: queue.Queue = queue.Queue()
+    for context in contexts:
+        # Daemon threads, a cluster that never answers can't hold the exit
+        threading.Thread(target=_collect, args=(context, report, namespace, results, cache_options, limits),
+                         name=f'cluster-{context}', daemon=True).start()
+
+    deadline: float = time.monotonic() + timeout
+    pending: set = set(contexts)
+    while pending:
+        try:
+            context, rows, error = results.get(timeout=max(0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        pending.discard(context)
+        if error:
+            if errors is not None:
+                errors.append((context, error))
+            continue
+        for row in rows:
+            yield [context] + row
+
+    if errors is not None:
+        errors.extend((context, f'timed out after {timeout:g}s') for context in sorted(pending))
+
+
+def _collect(context: str, report: str, namespace: str, results: queue.Queue, cache_options: dict,
+             limits: dict) -> None:
+    try:
+        kuber = functions.Kuber(api_client=config.new_client_from_config(context=context),
+                                use_informers=False,
+                                cache=ResponseCache(context=context, **cache_options) if cache_options else None,
+                                **(limits or {}))
+        rows: list = list(getattr(kuber, f'{report}_rows')(namespace=namespace))
+        results.put((context, rows, None))
+    except Exception as e:
+        results.put((context, None, f'{type(e).__name__}: {getattr(e, "reason", None) or e}'))
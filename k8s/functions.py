@@ -1,23 +1,385 @@
+import email.utils
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+import click
+import numpy as np
+import urllib3
 from kubernetes import client, config
 from kubernetes.config.config_exception import ConfigException
 from kubernetes.client.exceptions import ApiException
-import pandas as pd
 from tabulate import tabulate
-from helpers import helpers
+from helpers import helpers, profiler, quantity
+from k8s.cache import ResponseCache
+from k8s.informer import InformerCache
+from k8s import images, logexport, logsearch, records, top
+
+MAX_LOG_WORKERS: int = 10
+LOG_CHUNK_SIZE: int = 64 * 1024
+LOG_QUEUE_SIZE: int = 1000
+LIST_PAGE_SIZE: int = 500
+TOP_INTERVAL_SECONDS: float = 5
+TOP_WINDOW_MINUTES: float = 10
+TOP_MAX_PODS: int = 10000
+REVALIDATE_TIMEOUT_SECONDS: int = 1
+# How long after the informer cache started its reads wait for it to sync
+INFORMER_SYNC_WAIT_SECONDS: float = 5
+# Client side limits of every ApiClient, one control plane each
+API_QPS: float = 50
+API_BURST: int = 100
+API_MAX_RETRIES: int = 5
+RETRY_BASE_SECONDS: float = 0.5
+RETRY_MAX_SECONDS: float = 30
+RETRY_STATUSES: tuple = (429, 500, 502, 503, 504)
+# Ask for a server side Table, servers that don't support it answer with the plain list
+TABLE_ACCEPT: str = 'application/json;as=Table;v=v1;g=meta.k8s.io,application/json'
+
+# Report columns, every report row is prefixed with its namespace
+POD_METRICS_HEADERS: list = ["Pod", "CPU(Cores)", "Memory(Bytes)"]
+RESOURCES_REQUESTS_HEADERS: list = ["Container Name", "Resource Type", "CPU", "Memory"]
+IMAGES_HEADERS: list = ["Type", "Name", "Image Used", "Last Update Time"]
+REPLICAS_HEADERS: list = ["Type", "Name", "Replicas Set", "Replicas Ready"]
+EFFICIENCY_HEADERS: list = ["Type", "Workload", "Container", "Pods",
+                            "CPU Used", "CPU Request", "CPU Used/Req",
+                            "Memory Used(Mi)", "Memory Request", "Memory Used/Req", "Verdict"]
+OVERVIEW_PODS_HEADERS: list = ["Pod", "Phase", "Restarts", "CPU(Cores)", "Memory(Bytes)"]
+LOG_SEARCH_HEADERS: list = ["Pod", "Containers", "Matches"]
+IMAGE_INVENTORY_HEADERS: list = ["Type", "Name", "Container", "Registry", "Repository", "Tag", "Digest"]
+IMAGE_GROUPS_HEADERS: list = ["Images", "Containers", "Workloads", "Namespaces"]
+# Average usage below this share of the request counts as over provisioned
+OVER_PROVISIONED_RATIO: float = 0.5
+
+class TokenBucket():
+    """
+    Token bucket rate limiter: allows bursts of up to burst calls,
+    then qps calls per second. Callers reserve a token and sleep
+    outside the lock until it's due, so waiting threads are served
+    in the order they arrived
+    """
+    def __init__(self, qps: float, burst: int) -> None:
+        if qps <= 0:
+            raise ValueError(f'qps must be positive: {qps!r}')
+        self._qps = qps
+        self._burst = burst
+        self._tokens: float = burst
+        self._updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Takes a token, waiting until one is available
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._qps)
+            self._updated = now
+            self._tokens -= 1
+            wait: float = -self._tokens / self._qps if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class RequestLayer():
+    """
+    Shared request layer of an ApiClient. Every request waits for
+    the token bucket, identical GETs in flight at the same time are
+    sent once and share the response, and throttled or failed
+    requests are retried with jittered exponential backoff that
+    honours Retry-After
+    """
+    def __init__(self, request, qps: float = API_QPS, burst: int = API_BURST,
+                 max_retries: int = API_MAX_RETRIES) -> None:
+        self._request = request
+        self._limiter = TokenBucket(qps=qps, burst=burst)
+        self._max_retries = max_retries
+        self._lock = threading.Lock()
+        # Request key -> Future of the request in flight
+        self._in_flight: dict = {}
+
+    @classmethod
+    def install(cls, api_client: client.ApiClient, **kwargs) -> None:
+        """
+        Routes the requests of an ApiClient through a request layer,
+        once per client
+
+        Args:
+            api_client (client.ApiClient): Client to install the layer on
+            **kwargs: RequestLayer options
+        """
+        if getattr(api_client, '_request_layer', None):
+            return
+        api_client._request_layer = cls(request=api_client.request, **kwargs)
+        api_client.request = api_client._request_layer.request
+
+    def request(self, method: str, url: str, query_params: list = None, headers: dict = None, **kwargs):
+        key: tuple = self._coalesce_key(method=method, url=url, query_params=query_params,
+                                        headers=headers, preload=kwargs.get('_preload_content', True))
+        if key is None:
+            return self._send(method, url, query_params=query_params, headers=headers, **kwargs)
+
+        with self._lock:
+            future: Future = self._in_flight.get(key)
+            leader: bool = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            resp = self._send(method, url, query_params=query_params, headers=headers, **kwargs)
+            if not kwargs.get('_preload_content', True):
+                # Read the body now so every caller can read it
+                resp.data
+            future.set_result(resp)
+            return resp
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _send(self, method: str, url: str, **kwargs):
+        attempt: int = 0
+        # Watches are reopened by their callers, retrying them here would only delay that
+        max_retries: int = 0 if dict(kwargs.get('query_params') or []).get('watch') else self._max_retries
+        while True:
+            self._limiter.acquire()
+            try:
+                return self._request(method, url, **kwargs)
+            except ApiException as e:
+                error: Exception = e
+                retry: bool = e.status == 429 or (method == 'GET' and e.status in RETRY_STATUSES)
+                retry_after: float = self._retry_after(e.headers)
+            except urllib3.exceptions.HTTPError as e:
+                error: Exception = e
+                retry: bool = method == 'GET'
+                retry_after: float = None
+            if not retry or attempt >= max_retries:
+                raise error
+            # Full jitter spreads the retries of concurrent callers apart
+            backoff: float = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+            time.sleep(max(backoff, retry_after or 0))
+            attempt += 1
+            profiler.PROFILER.annotate(retries=1)
+
+    def _coalesce_key(self, method: str, url: str, query_params: list, headers: dict, preload: bool) -> tuple:
+        if method != 'GET':
+            return None
+        params: dict = dict(query_params or [])
+        # Watches, followed and plain logs are streams that can't be shared
+        if not preload and (params.get('watch') or params.get('follow') or url.endswith('/log')):
+            return None
+        return (url, repr(query_params), (headers or {}).get('Accept'), preload)
+
+    def _retry_after(self, headers) -> float:
+        value: str = (headers or {}).get('Retry-After')
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return max(0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
 
 class Kuber():
-    def __init__(self) -> None:
-        self._appsv1api = client.AppsV1Api()
-        self._corev1api = client.CoreV1Api()
-        self._customobjectsapi = client.CustomObjectsApi()
+    _informers: InformerCache = None
 
-    def load_kube_config() -> None:
+    def __init__(self, page_size: int = LIST_PAGE_SIZE, raw_decode: bool = True,
+                 api_client: client.ApiClient = None, use_informers: bool = True,
+                 cache: ResponseCache = None, qps: float = API_QPS, burst: int = API_BURST) -> None:
+        # One ApiClient means one keep-alive connection pool for all the APIs
+        self._api_client = api_client or self.new_api_client()
+        RequestLayer.install(self._api_client, qps=qps, burst=burst)
+        self._appsv1api = client.AppsV1Api(self._api_client)
+        self._corev1api = client.CoreV1Api(self._api_client)
+        self._batchv1api = client.BatchV1Api(self._api_client)
+        self._customobjectsapi = client.CustomObjectsApi(self._api_client)
+        self._page_size = page_size
+        self._raw_decode = raw_decode
+        # The informer cache belongs to the default cluster, clients of other clusters skip it
+        self._use_informers = use_informers
+        self._cache = cache
+        profiler.PROFILER.instrument(self._api_client)
+
+    def load_kube_config(context: str = None) -> None:
         try:
-            config.load_kube_config()
+            config.load_kube_config(context=context)
         except ConfigException as e:
             print(e)
             exit(1)
 
+    @staticmethod
+    def new_api_client() -> client.ApiClient:
+        """
+        Builds an ApiClient from the loaded kubeconfig with a
+        connection pool big enough for the concurrent log fetches
+
+        Returns:
+            client.ApiClient: Returns the API client
+        """
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = max(configuration.connection_pool_maxsize or 0,
+                                                    MAX_LOG_WORKERS)
+        return client.ApiClient(configuration)
+
+    def start_informers(self) -> None:
+        """
+        Starts the shared informer cache so every Kuber instance
+        reads namespaces, deployments, statefulsets and pods from
+        memory instead of listing them from the API server
+        """
+        if Kuber._informers:
+            return
+        Kuber._informers = InformerCache(corev1api=self._corev1api,
+                                         appsv1api=self._appsv1api,
+                                         page_size=self._page_size)
+        # Sync runs in the background, reads wait for it for a few seconds and then go to the API server
+        Kuber._informers.start()
+
+    def _paginate(self, list_func, *args, raw: bool = False, versions: list = None, **kwargs) -> Iterator:
+        """
+        Calls a LIST endpoint page by page using limit and continue
+        and yields the items as each page arrives, so only one page
+        is held in memory at a time
+
+        Args:
+            list_func (callable): Kubernetes client list function
+            raw (bool): Skip the model deserialization and yield the decoded JSON
+            versions (list): Gets the resourceVersion of the list appended
+
+        Yields:
+            object: Items of the list, models or dicts for raw and custom objects
+        """
+        _continue: str = None
+        while True:
+            if raw:
+                data: bytes = list_func(*args, limit=self._page_size, _continue=_continue,
+                                        _preload_content=False, **kwargs).data
+                with profiler.PROFILER.stage('decode'):
+                    resp = records.loads(data)
+                profiler.PROFILER.annotate(size=len(data), objects=len(resp['items']))
+            else:
+                resp = list_func(*args, limit=self._page_size, _continue=_continue, **kwargs)
+            if isinstance(resp, dict):
+                if not raw:
+                    # Custom objects deserialize to plain dicts, which the profiler can't count itself
+                    profiler.PROFILER.annotate(objects=len(resp['items']))
+                if versions is not None and _continue is None:
+                    versions.append(resp['metadata'].get('resourceVersion'))
+                yield from resp['items']
+                _continue = resp['metadata'].get('continue')
+            else:
+                if versions is not None and _continue is None:
+                    versions.append(resp.metadata.resource_version)
+                yield from resp.items
+                _continue = resp.metadata._continue
+            if not _continue:
+                return
+
+    def _from_disk_cache(self, namespace: str, kind: str, fetch, decode=None):
+        """
+        Serves data from the on disk cache when it's fresh, or when
+        it expired but the lists it was built from haven't changed
+        since. Otherwise fetches it and stores it. If the API server
+        can't be reached, stale data is served
+
+        Args:
+            namespace (str): Namespace of the data, None for cluster wide data
+            kind (str): Kind of the data
+            fetch (callable): Returns the data and a dict of API path -> resourceVersion
+            decode (callable): Rebuilds the data from its cached JSON form
+
+        Returns:
+            object: Returns the data
+        """
+        decode = decode or (lambda value: value)
+        entry = self._cache.get(namespace=namespace, kind=kind)
+        try:
+            if entry and (entry.fresh or self._unchanged_since(entry.versions)):
+                if not entry.fresh:
+                    self._cache.touch(namespace=namespace, kind=kind)
+                return decode(entry.value)
+            value, versions = fetch()
+        except (ApiException, urllib3.exceptions.HTTPError):
+            if entry:
+                click.echo(click.style('API server unreachable, showing cached data', fg='yellow'), err=True)
+                return decode(entry.value)
+            raise
+        self._cache.put(namespace=namespace, kind=kind, value=value, versions=versions)
+        return value
+
+    def _unchanged_since(self, versions: dict) -> bool:
+        """
+        Checks that nothing changed in the lists behind cached data
+        by opening a short watch from each of their resourceVersions
+        at the same time: any event, including 410 Gone, means the
+        data is stale
+
+        Args:
+            versions (dict): API path -> resourceVersion
+
+        Raises:
+            urllib3.exceptions.HTTPError: If the API server can't be reached
+
+        Returns:
+            bool: Returns True if every list is unchanged
+        """
+        if not versions or not all(versions.values()):
+            return False
+        with ThreadPoolExecutor(max_workers=len(versions)) as executor:
+            futures: list = [executor.submit(self._watch_is_quiet, path, resource_version)
+                             for path, resource_version in versions.items()]
+            return all([future.result() for future in futures])
+
+    def _watch_is_quiet(self, path: str, resource_version: str) -> bool:
+        try:
+            # Watches aren't retried by the request layer, and the connect timeout keeps an
+            # unreachable server from holding up the stale data
+            resp = self._api_client.call_api(path, 'GET',
+                                             query_params=[('watch', 'true'),
+                                                           ('resourceVersion', resource_version),
+                                                           ('timeoutSeconds', REVALIDATE_TIMEOUT_SECONDS)],
+                                             header_params={'Accept': 'application/json'},
+                                             auth_settings=['BearerToken'],
+                                             _return_http_data_only=True,
+                                             _preload_content=False,
+                                             _request_timeout=(REVALIDATE_TIMEOUT_SECONDS,
+                                                               REVALIDATE_TIMEOUT_SECONDS + 1))
+        except ApiException:
+            return False
+        try:
+            return not next(resp.stream(LOG_CHUNK_SIZE), b'').strip()
+        finally:
+            # Only the first chunk was read, the watch would otherwise go back to the pool half read
+            resp.close()
+            resp.release_conn()
+
+    def _cached(self, kind: str):
+        """
+        Returns the informer for a kind if the cache is running
+        and synced, None otherwise. Reads made shortly after the
+        cache started wait for its sync rather than listing the
+        same objects again
+        """
+        if not self._use_informers or not Kuber._informers:
+            return None
+        informer = getattr(Kuber._informers, kind)
+        timeout: float = max(0, Kuber._informers.started + INFORMER_SYNC_WAIT_SECONDS - time.monotonic())
+        return informer if informer.wait_for_sync(timeout=timeout) else None
+
     def show_active_context(self) -> str:
         """
         Retrieves the current kubeconfig context
@@ -31,43 +393,405 @@ class Kuber():
         return current_context
     
     def get_deployment_labels(self, deployment_name: str, namespace: str) -> str:
-        deployment: dict = self._appsv1api.read_namespaced_deployment(name=deployment_name, 
-                                                                      namespace=namespace)
+        informer = self._cached('deployments')
+        deployment: dict = informer.get(name=deployment_name, namespace=namespace) if informer else None
+        if deployment is None:
+            deployment = self._appsv1api.read_namespaced_deployment(name=deployment_name,
+                                                                     namespace=namespace)
         labels: dict = deployment.spec.selector.match_labels
         label_selector: str = ",".join([f"{key}={value}" for key, value in labels.items()])
         
         return label_selector
     
-    def get_statefulset_labels(self, sts_name: str, namespace: str) -> str:        
-        sts: dict = self._appsv1api.read_namespaced_stateful_set(name=sts_name, 
-                                                                 namespace=namespace)
+    def get_statefulset_labels(self, sts_name: str, namespace: str) -> str:
+        informer = self._cached('statefulsets')
+        sts: dict = informer.get(name=sts_name, namespace=namespace) if informer else None
+        if sts is None:
+            sts = self._appsv1api.read_namespaced_stateful_set(name=sts_name,
+                                                               namespace=namespace)
         labels: dict = sts.spec.selector.match_labels
         label_selector: str = ",".join([f"{key}={value}" for key, value in labels.items()])
         
         return label_selector
     
-    def read_logs(self, namespace: str, label_selector: str) -> None:
+    def read_logs(self, namespace: str, label_selector: str, max_workers: int = MAX_LOG_WORKERS) -> None:
+        """
+        Fetches the logs of all the pods matching a label selector
+        concurrently and prints each pod's logs as one block, in the
+        order the pods were listed
+
+        Args:
+            namespace (str): Namespace of the pods
+            label_selector (str): Label selector of the workload
+            max_workers (int): Maximum number of pods fetched at the same time
+        """
+        pods: list = list(self.list_pods(namespace=namespace, label_selector=label_selector))
+        if not pods:
+            return
+
+        workers: int = max(1, min(max_workers, len(pods)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() yields in submission order, so blocks print in a stable order
+            for pod_name, logs, errors, elapsed in executor.map(
+                    lambda pod: self._fetch_pod_logs(pod=pod, namespace=namespace), pods):
+                print('-' * 20 + f" Logs for pod {pod_name} ({elapsed:.2f}s): " + '-' * 20 + '\n')
+                for container_logs in logs:
+                    print(container_logs)
+                for error in errors:
+                    click.echo(click.style(error, fg='red'))
+
+    def _fetch_pod_logs(self, pod, namespace: str) -> tuple:
+        """
+        Fetches the logs of every none sidecar container in a pod
+
+        Args:
+            pod (V1Pod): Pod to fetch the logs for
+            namespace (str): Namespace of the pod
+
+        Returns:
+            tuple: Pod name, list of logs, list of errors and the elapsed seconds
+        """
         v1 = self._corev1api
+        pod_name: str = pod.metadata.name
+        logs: list = []
+        errors: list = []
+        start: float = time.perf_counter()
 
-        pods = v1.list_namespaced_pod(namespace, label_selector=label_selector)
-        
-        for pod in pods.items:
-            pod_name: str = pod.metadata.name
-            containers: dict = pod.spec.containers
-            
-            for container in containers:
+        for container in pod.spec.containers:
+            if container.name.startswith('istio'):
+                continue
+            try:
+                logs.append(v1.read_namespaced_pod_log(name=pod_name,
+                                                       namespace=namespace,
+                                                       container=container.name))
+            except ApiException as e:
+                errors.append(f'Failed to fetch logs for {pod_name}/{container.name}: {e.status} {e.reason}')
+
+        return pod_name, logs, errors, time.perf_counter() - start
+
+    def stream_logs(self, namespace: str, label_selector: str, follow: bool = False,
+                    tail_lines: int = None, since_seconds: int = None,
+                    limit_bytes: int = None) -> None:
+        """
+        Streams the logs of all the pods matching a label selector
+        and prints the lines as they arrive, prefixed with the pod
+        and container name. The responses are read in chunks so
+        memory stays flat regardless of the log size
+
+        Args:
+            namespace (str): Namespace of the pods
+            label_selector (str): Label selector of the workload
+            follow (bool): Keep the streams open and print new lines
+            tail_lines (int): Number of lines from the end of the logs to show
+            since_seconds (int): Only return logs newer than this many seconds
+            limit_bytes (int): Maximum number of bytes to read per container
+        """
+        v1 = self._corev1api
+
+        pods = self.list_pods(namespace=namespace, label_selector=label_selector)
+        lines: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        responses: list = []
+        threads: list = []
+
+        for pod in pods:
+            for container in pod.spec.containers:
                 if container.name.startswith('istio'):
-                    break
+                    continue
+                try:
+                    resp = v1.read_namespaced_pod_log(name=pod.metadata.name,
+                                                      namespace=namespace,
+                                                      container=container.name,
+                                                      follow=follow,
+                                                      tail_lines=tail_lines,
+                                                      since_seconds=since_seconds,
+                                                      limit_bytes=limit_bytes,
+                                                      _preload_content=False)
+                except ApiException as e:
+                    click.echo(click.style(f'Failed to stream logs for {pod.metadata.name}/{container.name}: '
+                                           f'{e.status} {e.reason}', fg='red'))
+                    continue
+                prefix: str = f'[{pod.metadata.name}/{container.name}]'
+                responses.append(resp)
+                # One reader per container, a followed stream never ends on its own
+                thread = threading.Thread(target=self._pump_log_lines,
+                                          args=(resp, prefix, lines),
+                                          daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        remaining: int = len(threads)
+        try:
+            while remaining:
+                item = lines.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                print(item)
+        except KeyboardInterrupt:
+            print("\n")
+        finally:
+            for resp in responses:
+                # Close first, a stream cut short still holds unread data and mustn't go back to the shared pool
+                resp.close()
+                resp.release_conn()
+
+    def _pump_log_lines(self, resp, prefix: str, lines: queue.Queue) -> None:
+        """
+        Reads a log response chunk by chunk and pushes every complete
+        line with its prefix to the shared queue. Pushes None when
+        the stream ends
+
+        Args:
+            resp (HTTPResponse): Raw log response opened without preloading
+            prefix (str): Prefix to add to every line
+            lines (queue.Queue): Queue the lines are pushed to
+        """
+        pending: bytes = b''
+        try:
+            for chunk in resp.stream(LOG_CHUNK_SIZE):
+                pending += chunk
+                *complete, pending = pending.split(b'\n')
+                for line in complete:
+                    lines.put(f'{prefix} {line.decode("utf-8", errors="replace")}')
+            if pending:
+                lines.put(f'{prefix} {pending.decode("utf-8", errors="replace")}')
+        except Exception as e:
+            lines.put(f'{prefix} stream closed: {e}')
+        finally:
+            lines.put(None)
+
+    def export_logs(self, namespace: str, directory: str, label_selector: str = None,
+                    compression: str = 'gzip', max_workers: int = MAX_LOG_WORKERS) -> list:
+        """
+        Downloads the logs of every container of the pods matching a
+        label selector, a few at a time, streaming each one straight
+        into its own compressed file under directory/namespace/pod/.
+        The timestamp of the last line of every container is kept as
+        a checkpoint, so exporting again only fetches the new lines
+
+        Args:
+            namespace (str): Namespace of the pods
+            directory (str): Directory to export to
+            label_selector (str): Label selector of the workload, None for every pod of the namespace
+            compression (str): One of logexport.COMPRESSIONS
+            max_workers (int): Maximum number of containers downloaded at the same time
+
+        Returns:
+            list: Returns a (pod, container, lines, path, error) tuple per container
+        """
+        os.makedirs(directory, exist_ok=True)
+        checkpoints = logexport.Checkpoints(directory=directory)
+        containers: list = [(pod.metadata.name, container.name)
+                            for pod in self.list_pods(namespace=namespace, label_selector=label_selector or '')
+                            for container in pod.spec.containers]
+        if not containers:
+            return []
+
+        results: list = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(containers)))) as executor:
+            futures: list = [executor.submit(self._export_container_log, namespace=namespace, pod_name=pod_name,
+                                             container_name=container_name, directory=directory,
+                                             compression=compression, checkpoints=checkpoints)
+                             for pod_name, container_name in containers]
+            for future in as_completed(futures):
+                pod_name, container_name, lines, path, error = future.result()
+                results.append((pod_name, container_name, lines, path, error))
+                if error:
+                    click.echo(click.style(f'[{pod_name}/{container_name}] {error}', fg='red'))
                 else:
-                    try:
-                        print('-' * 20 + f" Logs for pod {pod_name}: " + '-' * 20 + '\n')
-                        logs = v1.read_namespaced_pod_log(name=pod_name, 
-                                                        namespace=namespace, 
-                                                        container=container.name)
-                        print(logs)
-                    except ApiException as e:
-                        print(e)
-            
+                    print(f'[{pod_name}/{container_name}] {lines} new lines -> {path}')
+
+        print(f'Exported {sum(result[2] for result in results)} lines from '
+              f'{sum(1 for result in results if not result[4])}/{len(results)} containers to {directory}')
+        return results
+
+    def _export_container_log(self, namespace: str, pod_name: str, container_name: str, directory: str,
+                              compression: str, checkpoints: logexport.Checkpoints) -> tuple:
+        """
+        Streams the log of one container into its compressed file,
+        starting after its checkpoint. Lines are requested with their
+        timestamps, which is what the checkpoint is read from
+
+        Returns:
+            tuple: Pod name, container name, lines written, file path and the error if it failed
+        """
+        path: str = os.path.join(directory, namespace, pod_name,
+                                 f'{container_name}.log{logexport.COMPRESSIONS[compression]}')
+        since: str = checkpoints.get(namespace=namespace, pod=pod_name, container=container_name)
+        query_params: list = [('container', container_name), ('timestamps', 'true')]
+        if since:
+            # sinceTime has second precision, lines of that second that were exported already are skipped below
+            query_params.append(('sinceTime', since.partition('.')[0].rstrip('Z') + 'Z'))
+
+        try:
+            resp = self._api_client.call_api(f'/api/v1/namespaces/{namespace}/pods/{pod_name}/log', 'GET',
+                                             query_params=query_params,
+                                             auth_settings=['BearerToken'],
+                                             _return_http_data_only=True,
+                                             _preload_content=False)
+        except ApiException as e:
+            return pod_name, container_name, 0, path, f'Failed to export logs: {e.status} {e.reason}'
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        skip_until: str = logexport.timestamp_key(since) if since else None
+        last: str = since
+        lines: int = 0
+        pending: bytes = b''
+        error: str = None
+        try:
+            with logexport.open_compressed(path=path, compression=compression) as f:
+                for chunk in itertools.chain(resp.stream(LOG_CHUNK_SIZE), [b'\n']):
+                    pending += chunk
+                    *complete, pending = pending.split(b'\n')
+                    complete = [line for line in complete if line]
+                    if skip_until:
+                        # Drop the lines at or before the checkpoint, they only show up at the start
+                        while complete and logexport.timestamp_key(complete[0].split(b' ', 1)[0].decode()) <= skip_until:
+                            complete.pop(0)
+                        if complete:
+                            skip_until = None
+                    if complete:
+                        f.write(b'\n'.join(complete) + b'\n')
+                        lines += len(complete)
+                        last = complete[-1].split(b' ', 1)[0].decode()
+        except Exception as e:
+            error = f'Export interrupted after {lines} lines: {e}'
+        finally:
+            # An interrupted export leaves unread data on the connection
+            resp.close()
+            resp.release_conn()
+            # Whatever was written is kept, the next export resumes after it
+            if last != since:
+                checkpoints.set(namespace=namespace, pod=pod_name, container=container_name, timestamp=last)
+
+        return pod_name, container_name, lines, path, error
+
+    def search_logs(self, namespace: str, label_selector: str, pattern: str, since_seconds: int = None,
+                    context_lines: int = 0, ignore_case: bool = False, processes: int = 1) -> dict:
+        """
+        Searches the logs of all the pods matching a label selector
+        for a regex. Every container is streamed by its own thread and
+        its lines are matched batch by batch as they arrive, in worker
+        processes when asked so heavy patterns use every core. Prints
+        only the hits, with their context, followed by the number of
+        matches per pod
+
+        Args:
+            namespace (str): Namespace of the pods
+            label_selector (str): Label selector of the workload
+            pattern (str): Regular expression to search for
+            since_seconds (int): Only search logs newer than this many seconds
+            context_lines (int): Lines to show before and after every hit
+            ignore_case (bool): Match regardless of case
+            processes (int): Processes matching the lines, 1 to match in the reading threads, 0 for one per core
+
+        Raises:
+            re.error: If the pattern is not a valid regex
+
+        Returns:
+            dict: Returns pod name -> number of matching lines
+        """
+        v1 = self._corev1api
+        flags: int = re.IGNORECASE if ignore_case else 0
+        re.compile(pattern, flags)
+
+        pods: list = list(self.list_pods(namespace=namespace, label_selector=label_selector))
+        # Spawned workers only import k8s.logsearch, not the kubernetes client
+        pool = ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                                   mp_context=multiprocessing.get_context('spawn')) if processes != 1 else None
+
+        def match(lines: list) -> Future:
+            if pool:
+                return pool.submit(logsearch.grep_lines, pattern, flags, lines)
+            future: Future = Future()
+            future.set_result(logsearch.grep_lines(pattern, flags, lines))
+            return future
+
+        output: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        responses: list = []
+        scanners: dict = {}
+        for pod in pods:
+            scanners[pod.metadata.name] = []
+            for container in pod.spec.containers:
+                if container.name.startswith('istio'):
+                    continue
+                try:
+                    resp = v1.read_namespaced_pod_log(name=pod.metadata.name,
+                                                      namespace=namespace,
+                                                      container=container.name,
+                                                      since_seconds=since_seconds,
+                                                      _preload_content=False)
+                except ApiException as e:
+                    click.echo(click.style(f'Failed to search logs for {pod.metadata.name}/{container.name}: '
+                                           f'{e.status} {e.reason}', fg='red'))
+                    continue
+                scanner = logsearch.ContextScanner(prefix=f'[{pod.metadata.name}/{container.name}]',
+                                                   context_lines=context_lines)
+                scanners[pod.metadata.name].append(scanner)
+                responses.append(resp)
+                threading.Thread(target=self._search_log_stream,
+                                 args=(resp, scanner, match, output),
+                                 daemon=True).start()
+
+        remaining: int = len(responses)
+        try:
+            while remaining:
+                item = output.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                print('\n'.join(item))
+        except KeyboardInterrupt:
+            print("\n")
+        finally:
+            for resp in responses:
+                # Searches cut short by Ctrl+C leave unread data behind
+                resp.close()
+                resp.release_conn()
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        counts: dict = {pod_name: sum(scanner.matches for scanner in pod_scanners)
+                        for pod_name, pod_scanners in scanners.items()}
+        print()
+        self._print_table(data=[[namespace, pod_name, len(scanners[pod_name]), matches]
+                                for pod_name, matches in counts.items()],
+                          headers=LOG_SEARCH_HEADERS,
+                          namespace=namespace)
+        return counts
+
+    def _search_log_stream(self, resp, scanner: logsearch.ContextScanner, match, output: queue.Queue) -> None:
+        """
+        Reads a log response in batches and pushes the hits of every
+        batch to the shared queue. The next batch is read while the
+        previous one is being matched. Pushes None when the stream ends
+
+        Args:
+            resp (HTTPResponse): Raw log response opened without preloading
+            scanner (logsearch.ContextScanner): Scanner of the container
+            match (callable): Returns a future of the indexes of the matching lines of a batch
+            output (queue.Queue): Queue the hits are pushed to
+        """
+        previous: tuple = None
+        try:
+            for lines in logsearch.line_batches(resp, chunk_size=LOG_CHUNK_SIZE):
+                current: tuple = (lines, match(lines))
+                if previous:
+                    self._push_hits(scanner=scanner, batch=previous, output=output)
+                previous = current
+            if previous:
+                self._push_hits(scanner=scanner, batch=previous, output=output)
+        except Exception as e:
+            output.put([f'{scanner.prefix} stream closed: {e}'])
+        finally:
+            output.put(None)
+
+    def _push_hits(self, scanner: logsearch.ContextScanner, batch: tuple, output: queue.Queue) -> None:
+        lines, hits = batch
+        shown: list = scanner.feed(lines=lines, hits=hits.result())
+        if shown:
+            output.put(shown)
+
     def get_pod_metrics(self, namespace: str) -> None:
         """
         Fetches metrics for each pod in a namespaces 
@@ -75,144 +799,278 @@ class Kuber():
         the values
 
         Args:
-            namespace (str): Namespace to analyze
+            namespace (str): Namespace to analyze, None for all namespaces
         """
         try:
+            self._print_table(data=list(self.pod_metrics_rows(namespace=namespace)),
+                              headers=POD_METRICS_HEADERS,
+                              namespace=namespace)
+
+        except ApiException as e:
+            print(f"Exception when calling CustomObjectsApi->list_{'cluster' if namespace is None else 'namespaced'}_custom_object: {e}")
 
-            api_instance = self._customobjectsapi
+    def pod_metrics_rows(self, namespace: str) -> Iterator:
+        """
+        Yields the metrics report rows as the metrics pages arrive
+
+        Args:
+            namespace (str): Namespace to analyze, None for all namespaces
 
-            data: list = []
-            headers: list = ["Pod", "CPU(Cores)", "Memory(Bytes)"]
-            
-            group = 'metrics.k8s.io'
-            version = 'v1beta1'
-            namespace = namespace
-            plural = 'pods'
+        Yields:
+            list: Namespace followed by the POD_METRICS_HEADERS columns
+        """
+        for pod_namespace, pod_name, total_cpu_cores, total_memory_mb in self.pod_usage(namespace=namespace):
+            yield [
+                pod_namespace,
+                pod_name,
+                f'{total_cpu_cores:.2f}C',
+                f'{total_memory_mb:.0f}Mi'
+            ]
+
+    def pod_usage(self, namespace: str) -> Iterator:
+        """
+        Yields the CPU and memory usage of every pod from the
+        metrics server
 
-            pod_metrics = api_instance.list_namespaced_custom_object(group, version, namespace, plural)
+        Args:
+            namespace (str): Namespace to analyze, None for all namespaces
 
-            # Print pod metrics
-            for pod in pod_metrics['items']:
-                pod_name = pod['metadata']['name']
-                total_cpu_cores = 0
-                total_memory_mb = 0
+        Yields:
+            tuple: Namespace, pod name, CPU cores and memory Mi
+        """
+        pod_metrics: Iterator = self._metrics_items(namespace=namespace)
 
+        # Sum the containers of a whole page of pods at once
+        while pods := list(itertools.islice(pod_metrics, self._page_size)):
+            owners: list = []
+            cpu_usage: list = []
+            memory_usage: list = []
+            for index, pod in enumerate(pods):
                 for container in pod['containers']:
-                    cpu_usage = container['usage']['cpu']
-                    memory_usage = container['usage']['memory']
-
-                    total_cpu_cores += helpers.convert_cpu_to_cores(cpu_usage)
-                    total_memory_mb += helpers.convert_memory_to_mb(memory_usage)
-            
-                data.append([
-                    pod_name,
-                    f'{total_cpu_cores:.2f}C',
-                    f'{total_memory_mb:.0f}Mi'
-                ])
-            
-            df = pd.DataFrame(data, columns=headers)
-        
-            df.index = df.index + 1
+                    owners.append(index)
+                    cpu_usage.append(container['usage']['cpu'])
+                    memory_usage.append(container['usage']['memory'])
 
-            print(tabulate(df, headers='keys', tablefmt='grid'))
-            
+            total_cpu_cores = quantity.sum_by_group(quantity.parse_quantities(cpu_usage), owners, len(pods))
+            total_memory_mb = quantity.sum_by_group(quantity.parse_quantities(memory_usage), owners, len(pods)) / quantity.MEBIBYTE
+
+            for index, pod in enumerate(pods):
+                yield (pod['metadata']['namespace'],
+                       pod['metadata']['name'],
+                       float(total_cpu_cores[index]),
+                       float(total_memory_mb[index]))
+
+    def top_pods(self, namespace: str, interval: float = TOP_INTERVAL_SECONDS,
+                 window_minutes: float = TOP_WINDOW_MINUTES, max_pods: int = TOP_MAX_PODS) -> None:
+        """
+        Polls the metrics server every interval and keeps a live
+        table with the current usage of every pod and its min, avg,
+        p95 and trend over the window. Stops with Ctrl+C
+
+        Args:
+            namespace (str): Namespace to watch, None for all namespaces
+            interval (float): Seconds between samples
+            window_minutes (float): Minutes of history kept per pod
+            max_pods (int): Maximum number of pods tracked
+        """
+        history = top.MetricsHistory(capacity=max(1, int(window_minutes * 60 / interval)),
+                                     max_pods=max_pods)
+        view = top.TopView()
+
+        try:
+            while True:
+                started: float = time.monotonic()
+                try:
+                    history.record({(pod_namespace, pod_name): (cpu, memory)
+                                    for pod_namespace, pod_name, cpu, memory in self.pod_usage(namespace=namespace)})
+                    status: str = f'updated {time.strftime("%H:%M:%S")}'
+                except ApiException as e:
+                    status: str = f'metrics request failed with code {e.status}: {e.reason}'
+                view.render(summaries=history.summary(),
+                            title=f'Top pods in {namespace or "all namespaces"}, '
+                                  f'{window_minutes:g}m window, every {interval:g}s - {status} (Ctrl+C to stop)')
+                time.sleep(max(0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
             print("\n")
 
-        except ApiException as e:
-            print(f"Exception when calling CustomObjectsApi->list_namespaced_custom_object: {e}")
+    def list_pods(self, namespace: str, label_selector: str) -> Iterator:
+        """
+        Fetches the pods matching a label selector in a namespace
+
+        Args:
+            namespace (str): Namespace of the pods, None for all namespaces
+            label_selector (str): Label selector to match
+
+        Returns:
+            Iterator: Pods with the full JSON, fetched page by page
+        """
+        informer = self._cached('pods')
+        if informer:
+            return (pod for pod in informer.list(namespace=namespace)
+                    if helpers.match_label_selector(pod.metadata.labels, label_selector))
+
+        if namespace is None:
+            return self._paginate(self._corev1api.list_pod_for_all_namespaces,
+                                  label_selector=label_selector)
 
+        return self._paginate(self._corev1api.list_namespaced_pod,
+                              namespace, label_selector=label_selector)
 
-    def get_deployments(self, namespace: str) -> list:
+    def get_deployments(self, namespace: str) -> Iterator:
         """
         Fetches the list of deployments for a specific namespace
 
         Args:
-            namespace (str): Namespace name to fetch deployments from
+            namespace (str): Namespace name to fetch deployments from, None for all namespaces
 
         Returns:
-            list: List of deployments witht he full JASON
+            Iterator: Deployments with the full JSON, fetched page by page
         """
+        informer = self._cached('deployments')
+        if informer:
+            return iter(informer.list(namespace=namespace))
+
         v1 = self._appsv1api
+        if namespace is None:
+            return self._paginate(v1.list_deployment_for_all_namespaces)
         
-        deployment_list = v1.list_namespaced_deployment(namespace=namespace)
-        
-        return deployment_list
+        return self._paginate(v1.list_namespaced_deployment, namespace=namespace)
 
-    def get_statefulsets(self, namespace: str) -> list:
+    def get_statefulsets(self, namespace: str) -> Iterator:
         """
         Fetches the list of statefulsets for a specific namespace
 
         Args:
-            namespace (str): Namespace name to fetch statefulsets from
+            namespace (str): Namespace name to fetch statefulsets from, None for all namespaces
 
         Returns:
-            list: List of statefulsets witht he full JASON
+            Iterator: Statefulsets with the full JSON, fetched page by page
         """
+        informer = self._cached('statefulsets')
+        if informer:
+            return iter(informer.list(namespace=namespace))
+
         v1 = self._appsv1api
+        if namespace is None:
+            return self._paginate(v1.list_stateful_set_for_all_namespaces)
         
-        sts_list: list = v1.list_namespaced_stateful_set(namespace=namespace)
-        
-        return sts_list
+        return self._paginate(v1.list_namespaced_stateful_set, namespace=namespace)
+
+    def get_workloads(self, namespace: str) -> Iterator:
+        """
+        Fetches the deployments and statefulsets of a namespace as
+        lightweight records holding only the fields the reports use.
+        Unless the informer cache is synced, the raw JSON is decoded
+        directly instead of building the kubernetes models
+
+        Args:
+            namespace (str): Namespace to fetch the workloads from, None for all namespaces
+
+        Returns:
+            Iterator: Deployment records followed by statefulset records
+        """
+        if self._cache:
+            return iter(self._from_disk_cache(namespace=namespace, kind='workloads',
+                                              fetch=lambda: self._fetch_workloads(namespace=namespace),
+                                              decode=lambda rows: [records.workload_from_row(row) for row in rows]))
+
+        return itertools.chain(self._workload_records(kind='Deployment', namespace=namespace),
+                               self._workload_records(kind='StatefulSet', namespace=namespace))
+
+    def _fetch_workloads(self, namespace: str) -> tuple:
+        prefix: str = '/apis/apps/v1' if namespace is None else f'/apis/apps/v1/namespaces/{namespace}'
+        versions: dict = {}
+        workloads: list = []
+        for kind, resource in (('Deployment', 'deployments'), ('StatefulSet', 'statefulsets')):
+            resource_versions: list = []
+            workloads.extend(self._workload_records(kind=kind, namespace=namespace, versions=resource_versions))
+            versions[f'{prefix}/{resource}'] = resource_versions[0] if resource_versions else None
+        return workloads, versions
+
+    def _workload_records(self, kind: str, namespace: str, versions: list = None) -> Iterator:
+        v1 = self._appsv1api
+        if kind == 'Deployment':
+            informer_kind, get_models = 'deployments', self.get_deployments
+            list_func = v1.list_deployment_for_all_namespaces if namespace is None else v1.list_namespaced_deployment
+        else:
+            informer_kind, get_models = 'statefulsets', self.get_statefulsets
+            list_func = v1.list_stateful_set_for_all_namespaces if namespace is None else v1.list_namespaced_stateful_set
+
+        if self._raw_decode and not self._cached(informer_kind):
+            args: tuple = () if namespace is None else (namespace,)
+            return (records.workload_from_dict(kind=kind, obj=obj)
+                    for obj in self._paginate(list_func, *args, raw=True, versions=versions))
+
+        return (records.workload_from_model(kind=kind, obj=obj)
+                for obj in get_models(namespace=namespace))
 
     def get_resources_requests(self, namespace: str) -> None:
-        deployment_list: list = self.get_deployments(namespace=namespace)
-        sts_list: list = self.get_statefulsets(namespace=namespace)
-        
-        data = []
-        headers = ["Container Name", "Resource Type", "CPU", "Memory"]
-        
-        for deployment in deployment_list.items:
-            deployment_name: str = deployment.metadata.name
-            for container in deployment.spec.template.spec.containers:
-                resources: dict = container.resources
-                requests = resources.requests or {}
-                limits = resources.limits or {}
-
-                # Prepare row data for requests and limits
-                data.append([
-                    container.name,
-                    "Requests",
-                    requests.get("cpu", "None"),
-                    requests.get("memory", "None"),
-                ])
-                data.append([
-                    container.name,
-                    "Limits",
-                    limits.get("cpu", "None"),
-                    limits.get("memory", "None"),
-                ])
-        
-        for sts in sts_list.items:
-            sts_name: str = sts.metadata.name
-            for container in sts.spec.template.spec.containers:
-                for container in sts.spec.template.spec.containers:
-                    resources: dict = container.resources
-                    requests = resources.requests or {}
-                    limits = resources.limits or {}
-
-                    # Prepare row data for requests and limits
-                    data.append([
-                        container.name,
-                        "Requests",
-                        requests.get("cpu", "None"),
-                        requests.get("memory", "None"),
-                    ])
-                    data.append([
-                        container.name,
-                        "Limits",
-                        limits.get("cpu", "None"),
-                        limits.get("memory", "None"),
-                    ])
-            
-        df = pd.DataFrame(data, columns=headers)
-        
-        df.index = df.index + 1
+        """
+        Builds a table with the requests and limits of every
+        container in the deployments and statefulsets of a namespace
 
-        print(tabulate(df, headers='keys', tablefmt='grid'))
-        
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+        """
+        data: list = list(self.resources_requests_rows(namespace=namespace))
+        self._print_table(data=data,
+                          headers=RESOURCES_REQUESTS_HEADERS,
+                          namespace=namespace)
+
+        for resource_type, (cpu, memory) in self.resources_requests_totals(rows=data).items():
+            print(f'Total {resource_type}: {cpu:.2f}C, {memory:.0f}Mi')
         print("\n")
-        
-                
+
+    def resources_requests_totals(self, rows: list) -> dict:
+        """
+        Sums the CPU and memory columns of the requests report
+
+        Args:
+            rows (list): Rows of resources_requests_rows
+
+        Returns:
+            dict: Returns (cores, Mi) for Requests and for Limits
+        """
+        columns: list = list(zip(*rows)) or [()] * 5
+        resource_types = np.asarray(columns[2], dtype=str)
+        cpu = quantity.parse_quantities(columns[3])
+        memory = quantity.parse_quantities(columns[4]) / quantity.MEBIBYTE
+
+        return {resource_type: (float(cpu[resource_types == resource_type].sum()),
+                                float(memory[resource_types == resource_type].sum()))
+                for resource_type in ("Requests", "Limits")}
+
+    def resources_requests_rows(self, namespace: str) -> Iterator:
+        """
+        Yields the requests and limits report rows as the workloads arrive
+
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+
+        Yields:
+            list: Namespace followed by the RESOURCES_REQUESTS_HEADERS columns
+        """
+        for workload in self.get_workloads(namespace=namespace):
+            yield from self._resources_requests_rows(workload=workload)
+
+    def _resources_requests_rows(self, workload: records.WorkloadRecord) -> list:
+        rows: list = []
+        for container in workload.containers:
+            rows.append([
+                workload.namespace,
+                container.name,
+                "Requests",
+                container.requests.get("cpu", "None"),
+                container.requests.get("memory", "None"),
+            ])
+            rows.append([
+                workload.namespace,
+                container.name,
+                "Limits",
+                container.limits.get("cpu", "None"),
+                container.limits.get("memory", "None"),
+            ])
+        return rows
 
     def get_images_info(self, namespace: str) -> None:
         """
@@ -221,61 +1079,379 @@ class Kuber():
         stateful sets and builds a table with the information
 
         Args:
-            namespace (str): Chosen namespace to analyze
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+        """
+        self._print_table(data=list(self.images_rows(namespace=namespace)),
+                          headers=IMAGES_HEADERS,
+                          namespace=namespace)
+
+    def images_rows(self, namespace: str, separator: str = ", \n") -> Iterator:
+        """
+        Yields the images report rows as the workloads arrive
+
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+            separator (str): Separator between the images of a workload
+
+        Yields:
+            list: Namespace followed by the IMAGES_HEADERS columns
+        """
+        for workload in self.get_workloads(namespace=namespace):
+            yield self._images_row(workload=workload, separator=separator)
+
+    def _images_row(self, workload: records.WorkloadRecord, separator: str = ", \n") -> list:
+        return [
+            workload.namespace,
+            workload.kind,
+            workload.name,
+            separator.join([container.image for container in workload.containers]),
+            workload.last_update_time
+        ]
+
+    def get_image_inventory(self, namespace: str, image: str = None, group_by: str = None) -> None:
+        """
+        Builds the image inventory of the deployments, statefulsets,
+        daemonsets, jobs and running pods and prints the containers
+        running the matching images, or their counts grouped by
+        registry, repository, tag or digest
+
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+            image (str): Image reference or glob to look for, None for every image
+            group_by (str): One of images.GROUP_FIELDS, None to list the containers
+        """
+        try:
+            inventory: images.ImageInventory = self.image_inventory(namespace=namespace)
+        except ApiException as e:
+            print(f'Your request failed with code: {e.status}')
+            print(f'Reason for failure: {e.reason}')
+            return
+
+        image_ids: list = inventory.find(image)
+        if group_by:
+            with profiler.PROFILER.stage('render'):
+                table: str = tabulate(inventory.groups(field=group_by, image_ids=image_ids),
+                                      headers=[group_by.capitalize()] + IMAGE_GROUPS_HEADERS, tablefmt='grid')
+            print(table)
+            print("\n")
+        else:
+            self._print_table(data=[self._image_inventory_row(*container)
+                                    for container in inventory.containers(image_ids)],
+                              headers=IMAGE_INVENTORY_HEADERS,
+                              namespace=namespace)
+        print(f'{len(inventory)} containers running {inventory.image_count} distinct images '
+              f'from {inventory.repository_count} repositories, {len(image_ids)} images matched')
+
+    def image_inventory_rows(self, namespace: str, image: str = None) -> Iterator:
+        """
+        Yields a row per container running an image matching the query
+
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+            image (str): Image reference or glob to look for, None for every image
+
+        Yields:
+            list: Namespace followed by the IMAGE_INVENTORY_HEADERS columns
+        """
+        inventory: images.ImageInventory = self.image_inventory(namespace=namespace)
+        for container in inventory.containers(inventory.find(image)):
+            yield self._image_inventory_row(*container)
+
+    def image_groups_rows(self, namespace: str, group_by: str, image: str = None) -> list:
+        """
+        Counts the images matching a query grouped by one of images.GROUP_FIELDS
+
+        Returns:
+            list: Group followed by the IMAGE_GROUPS_HEADERS columns
+        """
+        inventory: images.ImageInventory = self.image_inventory(namespace=namespace)
+        return inventory.groups(field=group_by, image_ids=inventory.find(image))
+
+    def _image_inventory_row(self, kind: str, namespace: str, name: str, container: str,
+                             ref: images.ImageRef) -> list:
+        return [namespace, kind, name, container, ref.registry, ref.repository, ref.tag or '', ref.digest or '']
+
+    def image_inventory(self, namespace: str) -> images.ImageInventory:
+        """
+        Lists the deployments, statefulsets, daemonsets, jobs and
+        running pods concurrently, as raw JSON, and indexes the image
+        of every container, init containers included. Pods are
+        recorded with the digest they actually run when the runtime
+        reports one
+
+        Args:
+            namespace (str): Namespace to list, None for all namespaces
+
+        Returns:
+            images.ImageInventory: Returns the inventory
+        """
+        apps, batch, core = self._appsv1api, self._batchv1api, self._corev1api
+        all_namespaces: bool = namespace is None
+        sources: list = [
+            ('Deployment', apps.list_deployment_for_all_namespaces if all_namespaces else apps.list_namespaced_deployment, {}),
+            ('StatefulSet', apps.list_stateful_set_for_all_namespaces if all_namespaces else apps.list_namespaced_stateful_set, {}),
+            ('DaemonSet', apps.list_daemon_set_for_all_namespaces if all_namespaces else apps.list_namespaced_daemon_set, {}),
+            ('Job', batch.list_job_for_all_namespaces if all_namespaces else batch.list_namespaced_job, {}),
+            ('Pod', core.list_pod_for_all_namespaces if all_namespaces else core.list_namespaced_pod,
+             {'field_selector': 'status.phase=Running'}),
+        ]
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            fetched = executor.map(lambda source: list(self._image_usages(*source, namespace=namespace)), sources)
+            inventory = images.ImageInventory()
+            for usages in fetched:
+                for usage in usages:
+                    inventory.add(*usage)
+        return inventory
+
+    def _image_usages(self, kind: str, list_func, kwargs: dict, namespace: str) -> Iterator:
+        args: tuple = () if namespace is None else (namespace,)
+        for obj in self._paginate(list_func, *args, raw=True, **kwargs):
+            metadata: dict = obj['metadata']
+            spec: dict = obj.get('spec') or {}
+            if kind == 'Pod':
+                digests: dict = {status['name']: images.image_id_digest(status.get('imageID'))
+                                 for status in (obj.get('status') or {}).get('containerStatuses') or []}
+            else:
+                spec = ((spec.get('template') or {}).get('spec')) or {}
+                digests: dict = {}
+            for container in (spec.get('initContainers') or []) + (spec.get('containers') or []):
+                image: str = container.get('image') or ''
+                digest: str = digests.get(container['name'])
+                if digest and '@' not in image:
+                    image = f'{image}@{digest}'
+                yield kind, metadata.get('namespace'), metadata['name'], container['name'], image
+
+    def get_namespace_overview(self, namespace: str) -> None:
+        """
+        Fetches the deployments, statefulsets, pods and metrics of a
+        namespace concurrently, once, and builds the images, requests,
+        replicas and pods tables from that snapshot in a single pass
+
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+        """
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            deployments = executor.submit(lambda: list(self._workload_records(kind='Deployment', namespace=namespace)))
+            statefulsets = executor.submit(lambda: list(self._workload_records(kind='StatefulSet', namespace=namespace)))
+            pods = executor.submit(lambda: list(self.pod_statuses(namespace=namespace)))
+            usage = executor.submit(lambda: {(pod_namespace, pod_name): (cpu, memory)
+                                             for pod_namespace, pod_name, cpu, memory in self.pod_usage(namespace=namespace)})
+
+        image_rows: list = []
+        requests: list = []
+        replicas: list = []
+        for workload in itertools.chain(deployments.result(), statefulsets.result()):
+            image_rows.append(self._images_row(workload=workload))
+            replicas.append(self._replicas_row(workload=workload))
+            requests.extend(self._resources_requests_rows(workload=workload))
+
+        try:
+            pod_usage: dict = usage.result()
+        except ApiException as e:
+            click.echo(click.style(f'Metrics unavailable: {e.status} {e.reason}', fg='red'))
+            pod_usage: dict = {}
+        pod_rows: list = []
+        for pod_namespace, pod_name, phase, restarts in pods.result():
+            cpu, memory = pod_usage.get((pod_namespace, pod_name), (None, None))
+            pod_rows.append([pod_namespace, pod_name, phase, restarts,
+                             'N/A' if cpu is None else f'{cpu:.2f}C',
+                             'N/A' if memory is None else f'{memory:.0f}Mi'])
+
+        for title, data, headers in (('Container Images', image_rows, IMAGES_HEADERS),
+                                     ('Resource Requests', requests, RESOURCES_REQUESTS_HEADERS),
+                                     ('Replica Count', replicas, REPLICAS_HEADERS),
+                                     ('Pods', pod_rows, OVERVIEW_PODS_HEADERS)):
+            click.echo(click.style(title, bold=True))
+            self._print_table(data=data, headers=headers, namespace=namespace)
+
+    def pod_statuses(self, namespace: str) -> Iterator:
+        """
+        Yields the phase and restart count of every pod
+
+        Args:
+            namespace (str): Namespace of the pods, None for all namespaces
+
+        Yields:
+            tuple: Namespace, pod name, phase and total container restarts
+        """
+        informer = self._cached('pods')
+        if informer:
+            for pod in informer.list(namespace=namespace):
+                yield (pod.metadata.namespace, pod.metadata.name, pod.status.phase,
+                       sum(status.restart_count for status in pod.status.container_statuses or []))
+            return
+
+        v1 = self._corev1api
+        if namespace is None:
+            pods: Iterator = self._paginate(v1.list_pod_for_all_namespaces, raw=True)
+        else:
+            pods: Iterator = self._paginate(v1.list_namespaced_pod, namespace, raw=True)
+        for pod in pods:
+            status: dict = pod.get('status') or {}
+            yield (pod['metadata']['namespace'], pod['metadata']['name'], status.get('phase'),
+                   sum(container.get('restartCount', 0) for container in status.get('containerStatuses') or []))
+
+    def get_efficiency_report(self, namespace: str) -> None:
+        """
+        Joins the live usage of every container to the requests
+        declared by its deployment or statefulset and shows which
+        ones are over or under provisioned
+
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+        """
+        try:
+            self._print_table(data=list(self.efficiency_rows(namespace=namespace)),
+                              headers=EFFICIENCY_HEADERS,
+                              namespace=namespace)
+        except ApiException as e:
+            print(f'Your request failed with code: {e.status}')
+            print(f'Reason for failure: {e.reason}')
+
+    def efficiency_rows(self, namespace: str) -> Iterator:
+        """
+        Yields one row per workload container with its average usage
+        per pod against its requests. Pods are tied to their workload
+        through hash indexes of the pod and ReplicaSet ownerReferences,
+        so every object is visited once
+
+        Args:
+            namespace (str): Chosen namespace to analyze, None for all namespaces
+
+        Yields:
+            list: Namespace followed by the EFFICIENCY_HEADERS columns
+        """
+        owners: dict = self._pod_owners(namespace=namespace)
+        declared: dict = {}
+        for workload in self.get_workloads(namespace=namespace):
+            for container in workload.containers:
+                declared[(workload.namespace, workload.kind, workload.name, container.name)] = container
+
+        # Group index of every used container, plus the usage columns to sum by group
+        groups: dict = {}
+        group_ids: list = []
+        pod_names: list = []
+        cpu_usage: list = []
+        memory_usage: list = []
+        for pod in self._metrics_items(namespace=namespace):
+            pod_namespace: str = pod['metadata']['namespace']
+            owner: tuple = owners.get((pod_namespace, pod['metadata']['name']))
+            if owner is None:
+                continue
+            for container in pod['containers']:
+                key: tuple = (pod_namespace, *owner, container['name'])
+                if key not in declared:
+                    continue
+                group_ids.append(groups.setdefault(key, len(groups)))
+                pod_names.append(pod['metadata']['name'])
+                cpu_usage.append(container['usage']['cpu'])
+                memory_usage.append(container['usage']['memory'])
+
+        if not groups:
+            return
+
+        keys: list = list(groups)
+        pods = quantity.sum_by_group(np.ones(len(group_ids)), group_ids, len(keys))
+        cpu_used = quantity.sum_by_group(quantity.parse_quantities(cpu_usage), group_ids, len(keys)) / pods
+        memory_used = quantity.sum_by_group(quantity.parse_quantities(memory_usage), group_ids, len(keys)) / pods / quantity.MEBIBYTE
+        cpu_requested = quantity.parse_quantities([declared[key].requests.get('cpu') for key in keys])
+        memory_requested = quantity.parse_quantities([declared[key].requests.get('memory') for key in keys]) / quantity.MEBIBYTE
+        memory_limits = quantity.parse_quantities([declared[key].limits.get('memory') for key in keys]) / quantity.MEBIBYTE
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cpu_ratio = np.where(cpu_requested > 0, cpu_used / cpu_requested, np.nan)
+            memory_ratio = np.where(memory_requested > 0, memory_used / memory_requested, np.nan)
+
+        for index, (pod_namespace, kind, workload_name, container_name) in enumerate(keys):
+            container = declared[keys[index]]
+            yield [
+                pod_namespace,
+                kind,
+                workload_name,
+                container_name,
+                int(pods[index]),
+                f'{cpu_used[index]:.3f}C',
+                container.requests.get('cpu', 'None'),
+                self._format_ratio(cpu_ratio[index]),
+                f'{memory_used[index]:.0f}Mi',
+                container.requests.get('memory', 'None'),
+                self._format_ratio(memory_ratio[index]),
+                self._verdict(cpu_ratio=cpu_ratio[index],
+                              memory_ratio=memory_ratio[index],
+                              memory_used=memory_used[index],
+                              memory_limit=memory_limits[index]),
+            ]
+
+    def _format_ratio(self, ratio: float) -> str:
+        return 'N/A' if np.isnan(ratio) else f'{ratio:.0%}'
+
+    def _verdict(self, cpu_ratio: float, memory_ratio: float, memory_used: float, memory_limit: float) -> str:
+        if memory_limit and memory_used > 0.9 * memory_limit:
+            return 'Near memory limit'
+        if np.isnan(cpu_ratio) and np.isnan(memory_ratio):
+            return 'No requests'
+        ratios: list = [ratio for ratio in (cpu_ratio, memory_ratio) if not np.isnan(ratio)]
+        if max(ratios) > 1:
+            return 'Under provisioned'
+        if max(ratios) < OVER_PROVISIONED_RATIO:
+            return 'Over provisioned'
+        return 'OK'
+
+    def _metrics_items(self, namespace: str) -> Iterator:
+        api_instance = self._customobjectsapi
+        if namespace is None:
+            return self._paginate(api_instance.list_cluster_custom_object,
+                                  'metrics.k8s.io', 'v1beta1', 'pods')
+        return self._paginate(api_instance.list_namespaced_custom_object,
+                              'metrics.k8s.io', 'v1beta1', namespace, 'pods')
+
+    def _pod_owners(self, namespace: str) -> dict:
+        """
+        Indexes every pod to the deployment or statefulset that owns
+        it, going through the ReplicaSet for deployments
+
+        Args:
+            namespace (str): Namespace of the pods, None for all namespaces
+
+        Returns:
+            dict: (namespace, pod) -> (kind, workload name)
         """
-        
         v1 = self._appsv1api
-        
-        deployment_list: list = self.get_deployments(namespace=namespace)
-                
-        data: dict = {
-                    "Type": [],
-                    "Name": [],
-                    "Image Used": [],
-                    "Last Update Time": []
-                }
-
-        for deployment in deployment_list.items:
-            deployment_name: str = deployment.metadata.name
-            deployment_container_image: str = ", \n".join([container.image for container in deployment.spec.template.spec.containers])
-            last_update_time: str = "N/A"
-            
-            if deployment.status.conditions:
-                for condition in deployment.status.conditions:
-                    if condition.type == "Progressing" and condition.status == "True":
-                        last_update_time = condition.last_update_time
-                        break
-            
-            data["Type"].append('Deployment')
-            data["Name"].append(deployment_name)
-            data["Image Used"].append(deployment_container_image)
-            data["Last Update Time"].append(last_update_time)
-        
-        sts_list: list = self.get_statefulsets(namespace=namespace)
-        
-        for sts in sts_list.items:
-            sts_name: str = sts.metadata.name
-            sts_container_images: str = ", \n".join([container.image for container in sts.spec.template.spec.containers])
-            last_update_time: str = "N/A"
-            
-            if sts.status.conditions:
-                for condition in sts.status.conditions:
-                    if condition.type == "Progressing" and condition.status == "True":
-                        last_update_time = condition.last_update_time
-                        break
-            
-            data["Type"].append('StatefulSet')
-            data["Name"].append(sts_name)
-            data["Image Used"].append(sts_container_images)
-            data["Last Update Time"].append(last_update_time)
-        
-        df = pd.DataFrame(data)
-        
-        df.index = df.index + 1
+        if namespace is None:
+            replica_sets: Iterator = self._paginate(v1.list_replica_set_for_all_namespaces, raw=True)
+        else:
+            replica_sets: Iterator = self._paginate(v1.list_namespaced_replica_set, namespace, raw=True)
 
-        print(tabulate(df, headers='keys', tablefmt='grid'))
-        
-        print("\n")
+        deployment_of: dict = {}
+        for replica_set in replica_sets:
+            for reference in replica_set['metadata'].get('ownerReferences') or []:
+                if reference.get('kind') == 'Deployment':
+                    deployment_of[(replica_set['metadata']['namespace'], replica_set['metadata']['name'])] = reference['name']
+
+        informer = self._cached('pods')
+        if informer:
+            pods: Iterator = ((pod.metadata.namespace, pod.metadata.name,
+                               [(reference.kind, reference.name) for reference in pod.metadata.owner_references or []])
+                              for pod in informer.list(namespace=namespace))
+        else:
+            core = self._corev1api
+            if namespace is None:
+                raw_pods: Iterator = self._paginate(core.list_pod_for_all_namespaces, raw=True)
+            else:
+                raw_pods: Iterator = self._paginate(core.list_namespaced_pod, namespace, raw=True)
+            pods: Iterator = ((pod['metadata']['namespace'], pod['metadata']['name'],
+                               [(reference.get('kind'), reference.get('name'))
+                                for reference in pod['metadata'].get('ownerReferences') or []])
+                              for pod in raw_pods)
+
+        owners: dict = {}
+        for pod_namespace, pod_name, references in pods:
+            for kind, name in references:
+                if kind == 'StatefulSet':
+                    owners[(pod_namespace, pod_name)] = ('StatefulSet', name)
+                elif kind == 'ReplicaSet' and (pod_namespace, name) in deployment_of:
+                    owners[(pod_namespace, pod_name)] = ('Deployment', deployment_of[(pod_namespace, name)])
+        return owners
 
     def list_deployments(self, namespace: str) -> list:
         """
@@ -287,15 +1463,27 @@ class Kuber():
         Returns:
             list: List of deployments names
         """
-        v1 = self._appsv1api
-        deployment_list: list = []
-        
-        deployments = v1.list_namespaced_deployment(namespace=namespace)
-        for deployment in deployments.items:
-            deployment_name: str = deployment.metadata.name
-            deployment_list.append(deployment_name)
-        
-        return deployment_list
+        return list(self.deployment_names(namespace=namespace))
+
+    def deployment_names(self, namespace: str) -> Iterator:
+        """
+        Fetches the names of the deployments of a namespace page by
+        page, so a picker can show them before the last page arrives
+
+        Args:
+            namespace (str): Namespace name to fetch deployments from
+
+        Yields:
+            str: Deployment names
+        """
+        if not self._cached('deployments'):
+            names: Iterator = self._list_names(path=f'/apis/apps/v1/namespaces/{namespace}/deployments')
+            if names is not None:
+                yield from names
+                return
+
+        for deployment in self.get_deployments(namespace=namespace):
+            yield deployment.metadata.name
     
     def list_statefulsets(self, namespace: str) -> list:
         """
@@ -307,15 +1495,27 @@ class Kuber():
         Returns:
             list: List of statefulsets names
         """
-        v1 = self._appsv1api
-        sts_list: list = []
-        
-        statefulsets = v1.list_namespaced_stateful_set(namespace=namespace)
-        for sts in statefulsets.items:
-            sts_name: str = sts.metadata.name
-            sts_list.append(sts_name)
-        
-        return sts_list
+        return list(self.statefulset_names(namespace=namespace))
+
+    def statefulset_names(self, namespace: str) -> Iterator:
+        """
+        Fetches the names of the statefulsets of a namespace page by
+        page, so a picker can show them before the last page arrives
+
+        Args:
+            namespace (str): Namespace name to fetch statefulsets from
+
+        Yields:
+            str: StatefulSet names
+        """
+        if not self._cached('statefulsets'):
+            names: Iterator = self._list_names(path=f'/apis/apps/v1/namespaces/{namespace}/statefulsets')
+            if names is not None:
+                yield from names
+                return
+
+        for sts in self.get_statefulsets(namespace=namespace):
+            yield sts.metadata.name
     
     def list_namespaces(self) -> list:
         """
@@ -325,20 +1525,104 @@ class Kuber():
         Returns:
             list: Returns the list of namespaces in the cluster
         """
-        
-        v1 = self._corev1api
-        namespace_list: list = []
-        
+        return list(self.namespace_names())
+
+    def namespace_names(self) -> Iterator:
+        """
+        Fetches the names of the namespaces in the cluster page by
+        page, so a picker can show them before the last page arrives
+
+        Yields:
+            str: Namespace names
+        """
+        informer = self._cached('namespaces')
+        if informer:
+            yield from (namespace.metadata.name for namespace in informer.list())
+            return
+
+        names: Iterator = self._list_names(path='/api/v1/namespaces')
+        if names is not None:
+            yield from names
+            return
+
         try:
-            namespaces: dict = v1.list_namespace()
+            for namespace in self._paginate(self._corev1api.list_namespace):
+                yield namespace.metadata.name
         except ApiException as e:
             print(f'Your request failed with code: {e.status}')
             print(f'Reason for failure: {e.reason}')
             exit(1)
-            
-        for i in range(len(namespaces.items)):
-            namespace_list.append(namespaces.items[i].metadata.name)
-        return namespace_list
+
+    def _list_names(self, path: str) -> Iterator:
+        """
+        Lists only the names of the objects behind a LIST path by
+        asking the API server for a Table without the objects, which
+        is a fraction of the size of the full list. Servers that
+        don't serve tables send the regular list, which is read too.
+        The first page is fetched right away, the others as the
+        names are read
+
+        Args:
+            path (str): API path of the list, e.g. /api/v1/namespaces
+
+        Returns:
+            Iterator: Returns the names, or None if the first page failed
+        """
+        try:
+            if self._cache:
+                return iter(self._from_disk_cache(namespace=None, kind=f'names:{path}',
+                                                  fetch=lambda: self._fetch_names(path=path)))
+            pages: Iterator = self._name_pages(path=path)
+            first_page: list = next(pages)
+        except (ApiException, urllib3.exceptions.HTTPError, KeyError, ValueError):
+            return None
+        return itertools.chain(first_page, itertools.chain.from_iterable(pages))
+
+    def _fetch_names(self, path: str) -> tuple:
+        versions: list = []
+        names: list = [name for page in self._name_pages(path=path, versions=versions) for name in page]
+        return names, {path: versions[0]}
+
+    def _name_pages(self, path: str, versions: list = None) -> Iterator:
+        """
+        Calls a LIST path page by page asking for a Table and yields
+        the names of each page as it arrives
+
+        Args:
+            path (str): API path of the list
+            versions (list): Gets the resourceVersion of the list appended
+
+        Yields:
+            list: Names of one page
+        """
+        api_client = self._corev1api.api_client
+        _continue: str = None
+        while True:
+            query_params: list = [('limit', self._page_size), ('includeObject', 'None')]
+            if _continue:
+                query_params.append(('continue', _continue))
+            resp = api_client.call_api(path, 'GET',
+                                       query_params=query_params,
+                                       header_params={'Accept': TABLE_ACCEPT},
+                                       auth_settings=['BearerToken'],
+                                       _return_http_data_only=True,
+                                       _preload_content=False)
+            data: bytes = resp.data
+            with profiler.PROFILER.stage('decode'):
+                body: dict = records.loads(data)
+            profiler.PROFILER.annotate(size=len(data))
+            metadata: dict = body.get('metadata') or {}
+            if versions is not None and _continue is None:
+                versions.append(metadata.get('resourceVersion'))
+            if body.get('kind') == 'Table':
+                columns: list = [column['name'] for column in body['columnDefinitions']]
+                name_index: int = columns.index('Name')
+                yield [row['cells'][name_index] for row in body.get('rows') or []]
+            else:
+                yield [item['metadata']['name'] for item in body.get('items') or []]
+            _continue = metadata.get('continue')
+            if not _continue:
+                return
 
     def get_replicas_count(self, namespace: str) -> None:
         """
@@ -347,38 +1631,55 @@ class Kuber():
         in a table
 
         Args:
-            namespace (str): Chosen namespace by the user
+            namespace (str): Chosen namespace by the user, None for all namespaces
         """
-        v1 = self._appsv1api
-        
-        deployment_list: list = self.get_deployments(namespace=namespace)
-        sts_list: list = self.get_statefulsets(namespace=namespace)
-        
-        data = []
-        
-        headers = ["Type", "Name", "Namespace", "Replicas Set", "Replicas Ready"]
-
-        for deployment in deployment_list.items:
-                data.append([
-                    "Deployment",
-                    deployment.metadata.name,
-                    deployment.metadata.namespace,
-                    deployment.spec.replicas,
-                    deployment.status.ready_replicas
-                ])
-
-        for statefulset in sts_list.items:
-            data.append([
-                "StatefulSet",
-                statefulset.metadata.name,
-                statefulset.metadata.namespace,
-                statefulset.spec.replicas,
-                statefulset.status.ready_replicas
-            ])
+        # The namespace column is always part of this report
+        self._print_table(data=list(self.replicas_rows(namespace=namespace)),
+                          headers=REPLICAS_HEADERS,
+                          namespace=None)
 
-        df = pd.DataFrame(data, columns=headers)
-        
-        df.index = df.index + 1
+    def replicas_rows(self, namespace: str) -> Iterator:
+        """
+        Yields the replica count rows as the workloads arrive
 
-        print(tabulate(df, headers=headers, tablefmt="grid"))
-        print("\n")
\ No newline at end of file
+        Args:
+            namespace (str): Chosen namespace by the user, None for all namespaces
+
+        Yields:
+            list: Namespace followed by the REPLICAS_HEADERS columns
+        """
+        for workload in self.get_workloads(namespace=namespace):
+            yield self._replicas_row(workload=workload)
+
+    def _replicas_row(self, workload: records.WorkloadRecord) -> list:
+        return [
+            workload.namespace,
+            workload.kind,
+            workload.name,
+            workload.replicas,
+            workload.ready_replicas
+        ]
+
+    def _print_table(self, data: list, headers: list, namespace: str) -> None:
+        """
+        Prints report rows as a grid. Every row starts with the
+        namespace of its workload; when a single namespace was
+        chosen that column is dropped, otherwise the rows are
+        grouped by namespace
+
+        Args:
+            data (list): Rows of the report, namespace first
+            headers (list): Headers of the columns after the namespace
+            namespace (str): Chosen namespace, None for all namespaces
+        """
+        if namespace is None:
+            headers = ["Namespace"] + headers
+            # sorted() is stable so the order inside a namespace is kept
+            data = sorted(data, key=lambda row: row[0])
+        else:
+            data = [row[1:] for row in data]
+
+        with profiler.PROFILER.stage('render'):
+            table: str = tabulate(data, headers=headers, tablefmt='grid', showindex=range(1, len(data) + 1))
+        print(table)
+        print("\n")
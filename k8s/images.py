@@ -0,0 +1,219 @@
+import fnmatch
+import sys
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterator, NamedTuple
+
+DEFAULT_REGISTRY: str = 'docker.io'
+DEFAULT_TAG: str = 'latest'
+# Fields an inventory can be grouped by
+GROUP_FIELDS: list = ['registry', 'repository', 'tag', 'digest']
+
+
+class ImageRef(NamedTuple):
+    reference: str
+    registry: str
+    repository: str
+    tag: str
+    digest: str
+
+
+@lru_cache(maxsize=65536)
+def parse_image(reference: str, default_tag: str = DEFAULT_TAG) -> ImageRef:
+    """
+    Parses an image reference into its registry, repository, tag
+    and digest, normalized the way the container runtime reads it:
+    nginx is docker.io/library/nginx:latest. Results are memoized,
+    so every container running the same image shares one ImageRef
+    and its interned strings
+
+    Args:
+        reference (str): Image reference, e.g. ghcr.io/org/app:1.2@sha256:...
+        default_tag (str): Tag of references with neither tag nor digest, None to leave it empty
+
+    Returns:
+        ImageRef: Returns the parsed reference
+    """
+    name, _, digest = reference.partition('@')
+    tag: str = None
+    # A colon after the last slash starts the tag, before it it's a registry port
+    colon: int = name.rfind(':')
+    if colon > name.rfind('/'):
+        name, tag = name[:colon], name[colon + 1:]
+
+    first, _, rest = name.partition('/')
+    if rest and ('.' in first or ':' in first or first == 'localhost'):
+        registry, repository = first, rest
+    else:
+        registry, repository = DEFAULT_REGISTRY, name
+    if registry in (DEFAULT_REGISTRY, 'index.docker.io'):
+        registry = DEFAULT_REGISTRY
+        if '/' not in repository:
+            repository = f'library/{repository}'
+    if tag is None and not digest:
+        tag = default_tag
+
+    return ImageRef(reference=sys.intern(reference),
+                    registry=sys.intern(registry),
+                    repository=sys.intern(repository),
+                    tag=sys.intern(tag) if tag else None,
+                    digest=digest or None)
+
+
+def image_id_digest(image_id: str) -> str:
+    """
+    Reads the repo digest out of a container status imageID such as
+    docker-pullable://nginx@sha256:..., None if it only holds a local image id
+
+    Args:
+        image_id (str): imageID of a container status
+
+    Returns:
+        str: Returns the digest
+    """
+    return image_id.rpartition('@')[2] if image_id and '@' in image_id else None
+
+
+class ImageInventory():
+    """
+    Compact inventory of the images run by every container. Images,
+    workloads and container names are stored once, each container
+    is three integers in typed arrays, and reverse indexes from image
+    to containers and from repository to images answer queries and
+    groupings over the distinct images instead of every container
+    """
+    def __init__(self) -> None:
+        self._images: list = []
+        self._image_ids: dict = {}
+        self._workloads: list = []
+        self._workload_ids: dict = {}
+        self._names: list = []
+        self._name_ids: dict = {}
+        self._container_image: array = array('I')
+        self._container_workload: array = array('I')
+        self._container_name: array = array('I')
+        self._by_image: defaultdict = defaultdict(lambda: array('I'))
+        self._by_repository: defaultdict = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._container_image)
+
+    @property
+    def image_count(self) -> int:
+        return len(self._images)
+
+    @property
+    def repository_count(self) -> int:
+        return len(self._by_repository)
+
+    def add(self, kind: str, namespace: str, name: str, container: str, image: str) -> None:
+        """
+        Adds a container
+
+        Args:
+            kind (str): Kind of the owner: Deployment, StatefulSet, DaemonSet, Job or Pod
+            namespace (str): Namespace of the owner
+            name (str): Name of the owner
+            container (str): Name of the container
+            image (str): Image reference of the container
+        """
+        image_id: int = self._image_ids.get(image)
+        if image_id is None:
+            ref: ImageRef = parse_image(image)
+            image_id = self._image_ids[image] = len(self._images)
+            self._images.append(ref)
+            self._by_repository[(ref.registry, ref.repository)].add(image_id)
+
+        workload: tuple = (kind, namespace, name)
+        workload_id: int = self._workload_ids.get(workload)
+        if workload_id is None:
+            workload_id = self._workload_ids[workload] = len(self._workloads)
+            self._workloads.append(workload)
+
+        name_id: int = self._name_ids.get(container)
+        if name_id is None:
+            name_id = self._name_ids[container] = len(self._names)
+            self._names.append(container)
+
+        self._by_image[image_id].append(len(self._container_image))
+        self._container_image.append(image_id)
+        self._container_workload.append(workload_id)
+        self._container_name.append(name_id)
+
+    def find(self, query: str = None) -> list:
+        """
+        Finds the images matching a query. A reference matches on the
+        fields it names: nginx matches every tag and digest of
+        docker.io/library/nginx, nginx:1.25 only that tag. Queries
+        with * or ? are matched as globs against the references
+
+        Args:
+            query (str): Image reference or glob, None for every image
+
+        Returns:
+            list: Returns the ids of the matching images
+        """
+        if not query:
+            return list(range(len(self._images)))
+        if any(char in query for char in '*?['):
+            return [image_id for image_id, ref in enumerate(self._images)
+                    if fnmatch.fnmatchcase(ref.reference, query)
+                    or fnmatch.fnmatchcase(f'{ref.registry}/{ref.repository}:{ref.tag}', query)]
+
+        wanted: ImageRef = parse_image(query, default_tag=None)
+        return sorted(image_id for image_id in self._by_repository.get((wanted.registry, wanted.repository), ())
+                      if (wanted.tag is None or self._images[image_id].tag == wanted.tag)
+                      and (wanted.digest is None or self._images[image_id].digest == wanted.digest))
+
+    def containers(self, image_ids: list) -> Iterator:
+        """
+        Yields the containers running some images, through the reverse index
+
+        Args:
+            image_ids (list): Ids returned by find
+
+        Yields:
+            tuple: Kind, namespace, name, container name and ImageRef
+        """
+        for image_id in image_ids:
+            ref: ImageRef = self._images[image_id]
+            for index in self._by_image[image_id]:
+                kind, namespace, name = self._workloads[self._container_workload[index]]
+                yield kind, namespace, name, self._names[self._container_name[index]], ref
+
+    def groups(self, field: str, image_ids: list) -> list:
+        """
+        Groups images by one of GROUP_FIELDS and counts what runs them
+
+        Args:
+            field (str): One of GROUP_FIELDS, tag and digest groups are per repository
+            image_ids (list): Ids returned by find
+
+        Returns:
+            list: Returns (group, images, containers, workloads, namespaces) rows, most containers first
+        """
+        groups: dict = {}
+        for image_id in image_ids:
+            ref: ImageRef = self._images[image_id]
+            match field:
+                case 'registry':
+                    key: str = ref.registry
+                case 'repository':
+                    key: str = f'{ref.registry}/{ref.repository}'
+                case 'tag':
+                    key: str = f'{ref.registry}/{ref.repository}:{ref.tag or "-"}'
+                case 'digest':
+                    key: str = f'{ref.registry}/{ref.repository}@{ref.digest or "-"}'
+                case _:
+                    raise ValueError(f'Unknown group field: {field!r}')
+            group: list = groups.setdefault(key, [0, 0, set()])
+            group[0] += 1
+            containers: array = self._by_image[image_id]
+            group[1] += len(containers)
+            group[2].update(self._container_workload[index] for index in containers)
+
+        return sorted(([key, images, containers, len(workloads),
+                        len({self._workloads[workload][1] for workload in workloads})]
+                       for key, (images, containers, workloads) in groups.items()),
+                      key=lambda row: (-row[2], row[0]))
@@ -0,0 +1,157 @@
+import threading
+import time
+
+from kubernetes import watch
+from kubernetes.client.exceptions import ApiException
+
+WATCH_TIMEOUT_SECONDS: int = 300
+SYNC_TIMEOUT_SECONDS: int = 60
+RETRY_DELAY_SECONDS: int = 5
+
+
+class Informer():
+    """
+    Keeps a local copy of one resource kind current by doing an
+    initial LIST and then following a WATCH stream, resuming from
+    the last seen resourceVersion. Objects are indexed by namespace
+    and name
+    """
+    def __init__(self, list_func, kind: str, page_size: int) -> None:
+        self._list_func = list_func
+        self._kind = kind
+        self._page_size = page_size
+        self._index: dict = {}
+        self._lock = threading.Lock()
+        self._resource_version: str = None
+        self._synced = threading.Event()
+        self._thread: threading.Thread = None
+
+    def start(self) -> None:
+        """
+        Starts the list and watch loop in a background thread
+        """
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run,
+                                        name=f'informer-{self._kind}',
+                                        daemon=True)
+        self._thread.start()
+
+    def wait_for_sync(self, timeout: float = SYNC_TIMEOUT_SECONDS) -> bool:
+        """
+        Waits for the initial list to be loaded
+
+        Args:
+            timeout (float): Seconds to wait
+
+        Returns:
+            bool: Returns True if the cache is synced
+        """
+        return self._synced.wait(timeout)
+
+    def get(self, name: str, namespace: str = None):
+        """
+        Gets a single object from the cache
+
+        Args:
+            name (str): Name of the object
+            namespace (str): Namespace of the object, None for cluster scoped kinds
+
+        Returns:
+            object: Returns the object or None if it's not in the cache
+        """
+        with self._lock:
+            return self._index.get(namespace, {}).get(name)
+
+    def list(self, namespace: str = None) -> list:
+        """
+        Lists the objects in the cache sorted by namespace and name
+
+        Args:
+            namespace (str): Namespace to list, None for all namespaces
+
+        Returns:
+            list: Returns the list of objects
+        """
+        with self._lock:
+            if namespace is not None:
+                objects: dict = self._index.get(namespace, {})
+                return [objects[name] for name in sorted(objects)]
+            return [self._index[ns][name]
+                    for ns in sorted(self._index, key=lambda ns: ns or '')
+                    for name in sorted(self._index[ns])]
+
+    def _run(self) -> None:
+        while True:
+            try:
+                if self._resource_version is None:
+                    self._relist()
+                self._watch()
+            except ApiException as e:
+                if e.status == 410:
+                    # Our resourceVersion is too old, start over with a fresh list
+                    self._resource_version = None
+                else:
+                    time.sleep(RETRY_DELAY_SECONDS)
+            except Exception:
+                time.sleep(RETRY_DELAY_SECONDS)
+
+    def _relist(self) -> None:
+        index: dict = {}
+        resource_version: str = None
+        _continue: str = None
+        while True:
+            resp = self._list_func(limit=self._page_size, _continue=_continue)
+            # Every page is served from the snapshot of the first one
+            resource_version = resource_version or resp.metadata.resource_version
+            for obj in resp.items:
+                index.setdefault(obj.metadata.namespace, {})[obj.metadata.name] = obj
+            _continue = resp.metadata._continue
+            if not _continue:
+                break
+        with self._lock:
+            self._index = index
+        self._resource_version = resource_version
+        self._synced.set()
+
+    def _watch(self) -> None:
+        w = watch.Watch()
+        for event in w.stream(self._list_func,
+                              resource_version=self._resource_version,
+                              timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                              allow_watch_bookmarks=True):
+            obj = event['object']
+            self._resource_version = obj.metadata.resource_version
+            if event['type'] == 'BOOKMARK':
+                continue
+            with self._lock:
+                objects: dict = self._index.setdefault(obj.metadata.namespace, {})
+                if event['type'] == 'DELETED':
+                    objects.pop(obj.metadata.name, None)
+                else:
+                    objects[obj.metadata.name] = obj
+
+
+class InformerCache():
+    """
+    Holds the informers for every kind Kuber reads
+    """
+    def __init__(self, corev1api, appsv1api, page_size: int) -> None:
+        self.namespaces = Informer(corev1api.list_namespace, 'namespaces', page_size)
+        self.deployments = Informer(appsv1api.list_deployment_for_all_namespaces, 'deployments', page_size)
+        self.statefulsets = Informer(appsv1api.list_stateful_set_for_all_namespaces, 'statefulsets', page_size)
+        self.pods = Informer(corev1api.list_pod_for_all_namespaces, 'pods', page_size)
+        self.started: float = None
+
+    def _informers(self) -> list:
+        return [self.namespaces, self.deployments, self.statefulsets, self.pods]
+
+    def start(self) -> None:
+        self.started = time.monotonic()
+        for informer in self._informers():
+            informer.start()
+
+    def wait_for_sync(self, timeout: float = SYNC_TIMEOUT_SECONDS) -> bool:
+        deadline: float = time.monotonic() + timeout
+        return all(informer.wait_for_sync(max(0, deadline - time.monotonic()))
+                   for informer in self._informers())
@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compression -> file suffix
+COMPRESSIONS: dict = {'gzip': '.gz', 'zstd': '.zst'}
+CHECKPOINTS_FILE: str = 'checkpoints.json'
+
+
+def available_compressions() -> list:
+    """
+    Lists the compressions that can be used, zstd needs the zstandard package
+
+    Returns:
+        list: Returns the compression names
+    """
+    return [compression for compression in COMPRESSIONS if compression != 'zstd' or zstandard]
+
+
+def open_compressed(path: str, compression: str):
+    """
+    Opens a compressed file for appending. Every run adds a new
+    gzip member or zstd frame, and readers decompress concatenated
+    members as one stream
+
+    Args:
+        path (str): Path of the file
+        compression (str): One of COMPRESSIONS
+
+    Raises:
+        ValueError: If the compression is unknown or its package isn't installed
+
+    Returns:
+        BinaryIO: Returns a writable binary file object
+    """
+    if compression == 'gzip':
+        return gzip.open(path, 'ab')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError('zstd compression needs the zstandard package: pip install zstandard')
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'ab'), closefd=True)
+    raise ValueError(f'Unknown compression: {compression!r}')
+
+
+def timestamp_key(timestamp: str) -> str:
+    """
+    Makes RFC3339Nano timestamps comparable as strings. The kubelet
+    trims trailing zeros of the fraction, so it's padded back to
+    nanoseconds
+
+    Args:
+        timestamp (str): Timestamp such as 2024-05-01T10:00:00.12Z
+
+    Returns:
+        str: Returns the timestamp with a 9 digit fraction and no zone
+    """
+    seconds, _, fraction = timestamp.rstrip('Z').partition('.')
+    return f'{seconds}.{fraction:0<9}'
+
+
+class Checkpoints():
+    """
+    Per container timestamp of the last exported log line, kept in
+    a JSON file next to the exported logs so a later export only
+    fetches newer lines. Shared by the export threads
+    """
+    def __init__(self, directory: str) -> None:
+        self._path = os.path.join(directory, CHECKPOINTS_FILE)
+        self._lock = threading.Lock()
+        try:
+            with open(self._path) as f:
+                self._checkpoints: dict = json.load(f)
+        except (OSError, ValueError):
+            self._checkpoints: dict = {}
+
+    def get(self, namespace: str, pod: str, container: str) -> str:
+        return self._checkpoints.get(f'{namespace}/{pod}/{container}')
+
+    def set(self, namespace: str, pod: str, container: str, timestamp: str) -> None:
+        """
+        Records the last exported timestamp of a container and saves the file
+        """
+        with self._lock:
+            self._checkpoints[f'{namespace}/{pod}/{container}'] = timestamp
+            # Write to a temporary file first so a crash never leaves half a file
+            with open(f'{self._path}.tmp', 'w') as f:
+                json.dump(self._checkpoints, f, indent=1, sort_keys=True)
+            os.replace(f'{self._path}.tmp', self._path)
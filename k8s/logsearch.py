@@ -0,0 +1,104 @@
+import collections
+import re
+from typing import Iterator
+
+# Lines matched per task, big enough that handing a batch to another process pays off
+LOG_SEARCH_BATCH_LINES: int = 5000
+GROUP_SEPARATOR: str = '--'
+
+
+def grep_lines(pattern: str, flags: int, lines: list) -> list:
+    """
+    Finds the lines matching a regex. Kept at module level, away
+    from the kubernetes client, so worker processes can import it
+    cheaply
+
+    Args:
+        pattern (str): Regular expression
+        flags (int): re flags
+        lines (list): Lines to search
+
+    Returns:
+        list: Returns the indexes of the matching lines
+    """
+    # re caches compiled patterns, so every batch after the first skips the compile
+    search = re.compile(pattern, flags).search
+    return [index for index, line in enumerate(lines) if search(line)]
+
+
+def line_batches(resp, chunk_size: int, batch_lines: int = LOG_SEARCH_BATCH_LINES) -> Iterator:
+    """
+    Reads a log response chunk by chunk and yields its lines in batches
+
+    Args:
+        resp (HTTPResponse): Raw log response opened without preloading
+        chunk_size (int): Bytes read at a time
+        batch_lines (int): Lines per batch
+
+    Yields:
+        list: Decoded lines
+    """
+    pending: bytes = b''
+    batch: list = []
+    for chunk in resp.stream(chunk_size):
+        pending += chunk
+        *complete, pending = pending.split(b'\n')
+        batch.extend(line.decode('utf-8', errors='replace') for line in complete)
+        if len(batch) >= batch_lines:
+            yield batch
+            batch = []
+    if pending:
+        batch.append(pending.decode('utf-8', errors='replace'))
+    if batch:
+        yield batch
+
+
+class ContextScanner():
+    """
+    Turns the matches of one container's log, fed batch by batch,
+    into grep style output: hits prefixed with "prefix:", context
+    lines with "prefix-" and, when context is shown, a separator
+    between groups that aren't contiguous. Context carries over
+    batch boundaries
+    """
+    def __init__(self, prefix: str, context_lines: int = 0) -> None:
+        self.prefix = prefix
+        self.matches: int = 0
+        self._context_lines = context_lines
+        self._before: collections.deque = collections.deque(maxlen=context_lines or None)
+        self._after: int = 0
+        self._offset: int = 0
+        self._last_shown: int = None
+
+    def feed(self, lines: list, hits: list) -> list:
+        """
+        Args:
+            lines (list): Next batch of lines
+            hits (list): Indexes of the matching lines in the batch, ascending
+
+        Returns:
+            list: Returns the output lines for the batch
+        """
+        shown: list = []
+        hits: set = set(hits)
+        for index, line in enumerate(lines):
+            number: int = self._offset + index
+            if index in hits:
+                first: int = number - len(self._before)
+                # Like grep, groups are only separated when context lines are shown
+                if self._context_lines and self._last_shown is not None and first > self._last_shown + 1:
+                    shown.append(GROUP_SEPARATOR)
+                shown.extend(f'{self.prefix}-{before}' for before in self._before)
+                self._before.clear()
+                shown.append(f'{self.prefix}:{line}')
+                self.matches += 1
+                self._after = self._context_lines
+                self._last_shown = number
+            elif self._after:
+                shown.append(f'{self.prefix}-{line}')
+                self._after -= 1
+                self._last_shown = number
+            elif self._context_lines:
+                self._before.append(line)
+        self._offset += len(lines)
+        return shown
@@ -0,0 +1,119 @@
+import json
+from datetime import timezone
+from typing import NamedTuple
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+
+class ContainerRecord(NamedTuple):
+    name: str
+    image: str
+    requests: dict
+    limits: dict
+
+
+class WorkloadRecord(NamedTuple):
+    kind: str
+    namespace: str
+    name: str
+    replicas: int
+    ready_replicas: int
+    last_update_time: str
+    containers: tuple
+
+
+def workload_from_dict(kind: str, obj: dict) -> WorkloadRecord:
+    """
+    Builds a workload record straight from the raw JSON of a
+    deployment or statefulset, reading only the fields the
+    reports use
+
+    Args:
+        kind (str): Deployment or StatefulSet
+        obj (dict): Decoded JSON of the workload
+
+    Returns:
+        WorkloadRecord: Returns the workload record
+    """
+    metadata: dict = obj['metadata']
+    spec: dict = obj.get('spec') or {}
+    status: dict = obj.get('status') or {}
+    last_update_time: str = "N/A"
+
+    for condition in status.get('conditions') or []:
+        if condition.get('type') == "Progressing" and condition.get('status') == "True":
+            last_update_time = condition.get('lastUpdateTime', "N/A")
+            break
+
+    containers: tuple = tuple(
+        ContainerRecord(name=container['name'],
+                        image=container.get('image'),
+                        requests=(container.get('resources') or {}).get('requests') or {},
+                        limits=(container.get('resources') or {}).get('limits') or {})
+        for container in spec['template']['spec']['containers']
+    )
+
+    return WorkloadRecord(kind=kind,
+                          namespace=metadata.get('namespace'),
+                          name=metadata['name'],
+                          replicas=spec.get('replicas'),
+                          ready_replicas=status.get('readyReplicas'),
+                          last_update_time=last_update_time,
+                          containers=containers)
+
+
+def workload_from_model(kind: str, obj) -> WorkloadRecord:
+    """
+    Builds a workload record from a V1Deployment or V1StatefulSet
+    model object
+
+    Args:
+        kind (str): Deployment or StatefulSet
+        obj (V1Deployment | V1StatefulSet): Workload model
+
+    Returns:
+        WorkloadRecord: Returns the workload record
+    """
+    last_update_time: str = "N/A"
+
+    for condition in obj.status.conditions or []:
+        if condition.type == "Progressing" and condition.status == "True":
+            if condition.last_update_time:
+                # Same RFC3339 string the raw JSON carries
+                last_update_time = condition.last_update_time.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            break
+
+    containers: tuple = tuple(
+        ContainerRecord(name=container.name,
+                        image=container.image,
+                        requests=(container.resources.requests if container.resources else None) or {},
+                        limits=(container.resources.limits if container.resources else None) or {})
+        for container in obj.spec.template.spec.containers
+    )
+
+    return WorkloadRecord(kind=kind,
+                          namespace=obj.metadata.namespace,
+                          name=obj.metadata.name,
+                          replicas=obj.spec.replicas,
+                          ready_replicas=obj.status.ready_replicas,
+                          last_update_time=last_update_time,
+                          containers=containers)
+
+
+def workload_from_row(row: list) -> WorkloadRecord:
+    """
+    Rebuilds a workload record from its JSON array form, as
+    written by json.dump
+
+    Args:
+        row (list): Workload record serialized as an array
+
+    Returns:
+        WorkloadRecord: Returns the workload record
+    """
+    *fields, containers = row
+    return WorkloadRecord(*fields, containers=tuple(ContainerRecord(*container) for container in containers))
@@ -0,0 +1,309 @@
+import datetime
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import click
+import pyarrow
+import pyarrow.compute
+import pyarrow.ipc
+import pyarrow.parquet
+from kubernetes.client.exceptions import ApiException
+
+from k8s import records
+from k8s.functions import LIST_PAGE_SIZE, Kuber
+
+# Format -> table file suffix. Arrow files are written uncompressed so they can be memory-mapped,
+# Parquet files are zstd compressed and smaller
+SNAPSHOT_FORMATS: dict = {'arrow': '.arrow', 'parquet': '.parquet'}
+SNAPSHOT_META_FILE: str = 'snapshot.json'
+# Reports that only need what a snapshot holds
+SNAPSHOT_REPORTS: list = ['pod_metrics', 'images', 'resources_requests', 'replicas']
+DIFF_HEADERS: list = ["Change", "Type", "Namespace", "Name", "Field", "Old", "New"]
+# Table -> (column, type) pairs, types are pyarrow type factory names
+TABLES: dict = {
+    'namespaces': [('name', 'string')],
+    'workloads': [('kind', 'string'), ('namespace', 'string'), ('name', 'string'),
+                  ('replicas', 'int32'), ('ready_replicas', 'int32'), ('last_update_time', 'string')],
+    'containers': [('kind', 'string'), ('namespace', 'string'), ('workload', 'string'), ('name', 'string'),
+                   ('image', 'string'), ('cpu_request', 'string'), ('memory_request', 'string'),
+                   ('cpu_limit', 'string'), ('memory_limit', 'string')],
+    'pods': [('namespace', 'string'), ('name', 'string'), ('phase', 'string'), ('restarts', 'int32')],
+    'pod_metrics': [('namespace', 'string'), ('name', 'string'), ('cpu_cores', 'float64'), ('memory_mi', 'float64')],
+}
+
+
+def _schema(table: str):
+    return pyarrow.schema([(column, getattr(pyarrow, type_name)()) for column, type_name in TABLES[table]])
+
+
+def capture(kuber: Kuber, namespace: str = None) -> dict:
+    """
+    Fetches the namespaces, workloads, pods and pod metrics the
+    reports read, concurrently, and lays them out as columns
+
+    Args:
+        kuber (Kuber): Client of the cluster to capture
+        namespace (str): Namespace to capture, None for all namespaces
+
+    Returns:
+        dict: Returns the columns of every table in TABLES, as lists keyed by column name
+    """
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        workloads = executor.submit(lambda: list(kuber.get_workloads(namespace=namespace)))
+        pods = executor.submit(lambda: list(kuber.pod_statuses(namespace=namespace)))
+        usage = executor.submit(lambda: list(kuber.pod_usage(namespace=namespace)))
+        namespaces: list = [namespace] if namespace else kuber.list_namespaces()
+
+    tables: dict = {table: {column: [] for column, _ in columns} for table, columns in TABLES.items()}
+    tables['namespaces']['name'].extend(namespaces)
+
+    workload_columns: dict = tables['workloads']
+    container_columns: dict = tables['containers']
+    for workload in workloads.result():
+        for column, value in (('kind', workload.kind), ('namespace', workload.namespace), ('name', workload.name),
+                              ('replicas', workload.replicas), ('ready_replicas', workload.ready_replicas),
+                              ('last_update_time', str(workload.last_update_time))):
+            workload_columns[column].append(value)
+        for container in workload.containers:
+            for column, value in (('kind', workload.kind), ('namespace', workload.namespace),
+                                  ('workload', workload.name), ('name', container.name), ('image', container.image),
+                                  ('cpu_request', container.requests.get('cpu')),
+                                  ('memory_request', container.requests.get('memory')),
+                                  ('cpu_limit', container.limits.get('cpu')),
+                                  ('memory_limit', container.limits.get('memory'))):
+                container_columns[column].append(value)
+
+    for table, columns, rows in (('pods', ('namespace', 'name', 'phase', 'restarts'), pods.result),
+                                 ('pod_metrics', ('namespace', 'name', 'cpu_cores', 'memory_mi'), usage.result)):
+        try:
+            rows: list = rows()
+        except ApiException as e:
+            click.echo(click.style(f'Skipping {table.replace("_", " ")}: {e.status} {e.reason}', fg='red'))
+            rows: list = []
+        for column, values in zip(columns, zip(*rows)):
+            tables[table][column].extend(values)
+
+    return tables
+
+
+def write(tables: dict, directory: str, snapshot_format: str = 'arrow', meta: dict = None) -> dict:
+    """
+    Writes captured tables to a snapshot directory, one file per
+    table and a snapshot.json describing them. Taking a snapshot
+    into an existing directory replaces it
+
+    Args:
+        tables (dict): Columns returned by capture
+        directory (str): Directory of the snapshot
+        snapshot_format (str): One of SNAPSHOT_FORMATS
+        meta (dict): Extra fields for snapshot.json, e.g. the context and namespace
+
+    Raises:
+        ValueError: If the format is unknown
+
+    Returns:
+        dict: Returns the contents of snapshot.json
+    """
+    if snapshot_format not in SNAPSHOT_FORMATS:
+        raise ValueError(f'Unknown snapshot format: {snapshot_format!r}')
+
+    os.makedirs(directory, exist_ok=True)
+    meta_path: str = os.path.join(directory, SNAPSHOT_META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for table, columns in tables.items():
+        data = pyarrow.Table.from_pydict(columns, schema=_schema(table))
+        path: str = os.path.join(directory, f'{table}{SNAPSHOT_FORMATS[snapshot_format]}')
+        if snapshot_format == 'parquet':
+            pyarrow.parquet.write_table(data, path, compression='zstd')
+        else:
+            with pyarrow.OSFile(path, 'wb') as sink, pyarrow.ipc.new_file(sink, data.schema) as writer:
+                writer.write_table(data)
+
+    meta = {**(meta or {}),
+            'format': snapshot_format,
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'rows': {table: len(next(iter(columns.values()), [])) for table, columns in tables.items()}}
+    # Written last, a snapshot without it was interrupted
+    with open(f'{meta_path}.tmp', 'w') as f:
+        json.dump(meta, f, indent=1)
+    os.replace(f'{meta_path}.tmp', meta_path)
+    return meta
+
+
+class Snapshot():
+    """
+    Read side of a snapshot directory. Tables are opened on first
+    use, Arrow files through a memory map so only the pages a
+    report touches are read, and namespace filters run on the
+    columns before anything is turned into Python objects
+    """
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        try:
+            with open(os.path.join(directory, SNAPSHOT_META_FILE)) as f:
+                self.meta: dict = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f'{directory} is not a snapshot: {e}')
+        self._tables: dict = {}
+
+    @property
+    def namespace(self) -> str:
+        """Namespace the snapshot was taken of, None if it holds every namespace"""
+        return self.meta.get('namespace')
+
+    def table(self, name: str, namespace: str = None) -> dict:
+        """
+        Reads the columns of a table
+
+        Args:
+            name (str): One of TABLES
+            namespace (str): Only the rows of this namespace, None for all of them
+
+        Returns:
+            dict: Returns the columns as lists keyed by column name
+        """
+        data = self._tables.get(name)
+        if data is None:
+            path: str = os.path.join(self.directory, f'{name}{SNAPSHOT_FORMATS[self.meta["format"]]}')
+            if self.meta['format'] == 'parquet':
+                data = pyarrow.parquet.read_table(path, memory_map=True)
+            else:
+                data = pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+            self._tables[name] = data
+        if namespace is not None and 'namespace' in data.column_names:
+            data = data.filter(pyarrow.compute.equal(data['namespace'], namespace))
+        return data.to_pydict()
+
+    def workloads(self, namespace: str = None) -> list:
+        """
+        Rebuilds the workload records of the snapshot
+
+        Args:
+            namespace (str): Only the workloads of this namespace, None for all of them
+
+        Returns:
+            list: Returns the WorkloadRecords, deployments followed by statefulsets as Kuber returns them
+        """
+        containers: defaultdict = defaultdict(list)
+        columns: dict = self.table('containers', namespace=namespace)
+        for kind, workload_namespace, workload, name, image, cpu_request, memory_request, cpu_limit, memory_limit in zip(
+                *(columns[column] for column, _ in TABLES['containers'])):
+            containers[(kind, workload_namespace, workload)].append(records.ContainerRecord(
+                name=name,
+                image=image,
+                # Kept sparse like the API, so the reports show None for what isn't set
+                requests={key: value for key, value in (('cpu', cpu_request), ('memory', memory_request)) if value},
+                limits={key: value for key, value in (('cpu', cpu_limit), ('memory', memory_limit)) if value}))
+
+        columns = self.table('workloads', namespace=namespace)
+        return [records.WorkloadRecord(kind=kind, namespace=workload_namespace, name=name, replicas=replicas,
+                                       ready_replicas=ready_replicas, last_update_time=last_update_time,
+                                       containers=tuple(containers[(kind, workload_namespace, name)]))
+                for kind, workload_namespace, name, replicas, ready_replicas, last_update_time in zip(
+                    *(columns[column] for column, _ in TABLES['workloads']))]
+
+
+class SnapshotKuber(Kuber):
+    """
+    Kuber answering from a snapshot instead of the API server.
+    It overrides the fetches the reports are built on, so the
+    images, requests, replicas, metrics and overview reports run
+    unchanged and offline. Anything else needs a live Kuber
+    """
+    def __init__(self, snapshot: Snapshot) -> None:
+        self.snapshot = snapshot
+        # No API client, a report reaching past the overrides fails instead of calling a cluster
+        self._api_client = None
+        self._appsv1api = None
+        self._corev1api = None
+        self._batchv1api = None
+        self._customobjectsapi = None
+        self._page_size = LIST_PAGE_SIZE
+        self._raw_decode = True
+        self._use_informers = False
+        self._cache = None
+
+    def namespace_names(self) -> Iterator:
+        return iter(self.snapshot.table('namespaces')['name'])
+
+    def get_workloads(self, namespace: str) -> Iterator:
+        return iter(self.snapshot.workloads(namespace=namespace))
+
+    def _workload_records(self, kind: str, namespace: str, versions: list = None) -> Iterator:
+        return (workload for workload in self.snapshot.workloads(namespace=namespace) if workload.kind == kind)
+
+    def pod_statuses(self, namespace: str) -> Iterator:
+        columns: dict = self.snapshot.table('pods', namespace=namespace)
+        return zip(columns['namespace'], columns['name'], columns['phase'], columns['restarts'])
+
+    def pod_usage(self, namespace: str) -> Iterator:
+        columns: dict = self.snapshot.table('pod_metrics', namespace=namespace)
+        return zip(columns['namespace'], columns['name'], columns['cpu_cores'], columns['memory_mi'])
+
+    def show_active_context(self) -> str:
+        return self.snapshot.meta.get('context')
+
+
+def diff(old: Snapshot, new: Snapshot) -> Iterator:
+    """
+    Compares the specs held by two snapshots: namespaces and
+    workloads added or removed, replica counts, and the images,
+    requests and limits of every container. Pod phases and usage
+    change all the time and aren't compared
+
+    Args:
+        old (Snapshot): Earlier snapshot
+        new (Snapshot): Later snapshot
+
+    Yields:
+        list: Rows matching DIFF_HEADERS, by type, namespace and name
+    """
+    old_namespaces: set = set(old.table('namespaces')['name'])
+    new_namespaces: set = set(new.table('namespaces')['name'])
+    for namespace in sorted(old_namespaces | new_namespaces):
+        if namespace not in old_namespaces:
+            yield ["Added", "Namespace", namespace, namespace, "", "", ""]
+        elif namespace not in new_namespaces:
+            yield ["Removed", "Namespace", namespace, namespace, "", "", ""]
+
+    old_workloads: dict = {(workload.kind, workload.namespace, workload.name): workload
+                           for workload in old.workloads()}
+    new_workloads: dict = {(workload.kind, workload.namespace, workload.name): workload
+                           for workload in new.workloads()}
+    for key in sorted(old_workloads.keys() | new_workloads.keys()):
+        kind, namespace, name = key
+        before: records.WorkloadRecord = old_workloads.get(key)
+        after: records.WorkloadRecord = new_workloads.get(key)
+        if before is None:
+            yield ["Added", kind, namespace, name, "", "", ""]
+            continue
+        if after is None:
+            yield ["Removed", kind, namespace, name, "", "", ""]
+            continue
+
+        if before.replicas != after.replicas:
+            yield ["Changed", kind, namespace, name, "replicas", before.replicas, after.replicas]
+        old_containers: dict = {container.name: container for container in before.containers}
+        new_containers: dict = {container.name: container for container in after.containers}
+        for container_name in sorted(old_containers.keys() | new_containers.keys()):
+            old_container: records.ContainerRecord = old_containers.get(container_name)
+            new_container: records.ContainerRecord = new_containers.get(container_name)
+            if old_container is None:
+                yield ["Changed", kind, namespace, name, container_name, "", "added"]
+                continue
+            if new_container is None:
+                yield ["Changed", kind, namespace, name, container_name, "removed", ""]
+                continue
+            for field, old_value, new_value in (
+                    ('image', old_container.image, new_container.image),
+                    ('requests.cpu', old_container.requests.get('cpu'), new_container.requests.get('cpu')),
+                    ('requests.memory', old_container.requests.get('memory'), new_container.requests.get('memory')),
+                    ('limits.cpu', old_container.limits.get('cpu'), new_container.limits.get('cpu')),
+                    ('limits.memory', old_container.limits.get('memory'), new_container.limits.get('memory'))):
+                if old_value != new_value:
+                    yield ["Changed", kind, namespace, name, f'{container_name} {field}',
+                           old_value or "None", new_value or "None"]
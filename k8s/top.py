@@ -0,0 +1,168 @@
+import shutil
+import sys
+import warnings
+
+import numpy as np
+
+HISTORY_GROWTH: int = 256
+TREND_THRESHOLD: float = 0.1
+TOP_HEADERS: list = ["Namespace", "Pod", "CPU(Cores)", "CPU min/avg/p95", "Memory(Mi)", "Memory min/avg/p95", "Trend"]
+
+
+class MetricsHistory():
+    """
+    Fixed size ring buffers of CPU and memory samples. Every pod
+    owns a row of two float32 matrices and every sample is a
+    column, so all the pods are written and summarized with one
+    array operation per tick. Rows of pods that stopped reporting
+    for a whole window are reused, and the number of rows is capped
+    so memory stays bounded
+    """
+    def __init__(self, capacity: int, max_pods: int) -> None:
+        self._capacity = capacity
+        self._max_pods = max_pods
+        self._cpu = np.full((0, capacity), np.nan, dtype=np.float32)
+        self._memory = np.full((0, capacity), np.nan, dtype=np.float32)
+        self._rows: dict = {}
+        self._free: list = []
+        self._position: int = -1
+        self._samples: int = 0
+
+    def record(self, samples: dict) -> None:
+        """
+        Records one tick of samples
+
+        Args:
+            samples (dict): (namespace, pod) -> (cores, Mi) for every pod reporting in this tick
+        """
+        self._position = (self._position + 1) % self._capacity
+        self._samples += 1
+        self._cpu[:, self._position] = np.nan
+        self._memory[:, self._position] = np.nan
+
+        for key, (cpu, memory) in samples.items():
+            row: int = self._row(key)
+            if row is None:
+                continue
+            self._cpu[row, self._position] = cpu
+            self._memory[row, self._position] = memory
+
+        self._release_stale()
+
+    def summary(self) -> dict:
+        """
+        Summarizes the window of every pod that reported in the last tick
+
+        Returns:
+            dict: (namespace, pod) -> dict with the current, min, avg and p95 CPU and memory and their trends
+        """
+        if not self._rows:
+            return {}
+        rows = np.fromiter(self._rows.values(), dtype=np.intp, count=len(self._rows))
+        summaries: dict = {}
+        stats: dict = {}
+        for name, values in (('cpu', self._cpu[rows]), ('memory', self._memory[rows])):
+            current = values[:, self._position]
+            # Rows that only hold NaN have no samples yet, they are skipped below
+            with np.errstate(all='ignore'), warnings.catch_warnings():
+                warnings.simplefilter('ignore', category=RuntimeWarning)
+                average = np.nanmean(values, axis=1)
+                stats[name] = (current,
+                               np.nanmin(values, axis=1),
+                               average,
+                               np.nanpercentile(values, 95, axis=1),
+                               np.sign(np.where(np.abs(current - average) > TREND_THRESHOLD * average,
+                                                current - average, 0)))
+
+        for index, key in enumerate(self._rows):
+            if np.isnan(stats['cpu'][0][index]):
+                continue
+            summaries[key] = {name: tuple(float(column[index]) for column in columns)
+                              for name, columns in stats.items()}
+        return summaries
+
+    def _row(self, key: tuple) -> int:
+        row: int = self._rows.get(key)
+        if row is not None:
+            return row
+        if not self._free:
+            size: int = len(self._cpu)
+            if size >= self._max_pods:
+                return None
+            grow: int = min(HISTORY_GROWTH, self._max_pods - size)
+            self._cpu = np.vstack([self._cpu, np.full((grow, self._capacity), np.nan, dtype=np.float32)])
+            self._memory = np.vstack([self._memory, np.full((grow, self._capacity), np.nan, dtype=np.float32)])
+            self._free.extend(range(size + grow - 1, size - 1, -1))
+        row = self._free.pop()
+        self._rows[key] = row
+        return row
+
+    def _release_stale(self) -> None:
+        if self._samples < self._capacity or not self._rows:
+            return
+        stale = np.all(np.isnan(self._cpu), axis=1)
+        for key, row in list(self._rows.items()):
+            if stale[row]:
+                del self._rows[key]
+                self._free.append(row)
+
+
+class TopView():
+    """
+    Draws the top table and on every refresh rewrites only the
+    terminal lines that changed
+    """
+    def __init__(self, stream=None) -> None:
+        self._stream = stream or sys.stdout
+        self._lines: list = []
+        self._widths: list = [len(header) for header in TOP_HEADERS]
+
+    def render(self, summaries: dict, title: str) -> None:
+        """
+        Redraws the table from the history summaries
+
+        Args:
+            summaries (dict): Output of MetricsHistory.summary
+            title (str): First line of the screen
+        """
+        rows: list = [self._cells(key=key, summary=summaries[key]) for key in sorted(summaries)]
+        height: int = shutil.get_terminal_size().lines - 4
+        hidden: int = max(0, len(rows) - height)
+        if hidden:
+            rows = rows[:height]
+
+        widths: list = [max(width, *(len(row[i]) for row in rows)) if rows else width
+                        for i, width in enumerate(self._widths)]
+        full_redraw: bool = widths != self._widths
+        self._widths = widths
+
+        lines: list = [title, self._format(TOP_HEADERS), self._format(['-' * width for width in widths])]
+        lines += [self._format(row) for row in rows]
+        lines.append(f'... {hidden} more pods' if hidden else '')
+
+        if full_redraw or len(lines) != len(self._lines):
+            self._stream.write('\x1b[2J')
+            self._lines = []
+        for number, line in enumerate(lines):
+            if number >= len(self._lines) or self._lines[number] != line:
+                self._stream.write(f'\x1b[{number + 1};1H{line}\x1b[K')
+        self._stream.write(f'\x1b[{len(lines) + 1};1H')
+        self._stream.flush()
+        self._lines = lines
+
+    def _format(self, cells: list) -> str:
+        return '  '.join(cell.ljust(width) for cell, width in zip(cells, self._widths))
+
+    def _cells(self, key: tuple, summary: dict) -> list:
+        arrows: dict = {1.0: '↑', -1.0: '↓', 0.0: '→'}
+        cpu, cpu_min, cpu_avg, cpu_p95, cpu_trend = summary['cpu']
+        memory, memory_min, memory_avg, memory_p95, memory_trend = summary['memory']
+        return [
+            key[0],
+            key[1],
+            f'{cpu:.2f}C',
+            f'{cpu_min:.2f}/{cpu_avg:.2f}/{cpu_p95:.2f}',
+            f'{memory:.0f}Mi',
+            f'{memory_min:.0f}/{memory_avg:.0f}/{memory_p95:.0f}',
+            f'cpu {arrows.get(cpu_trend, "→")} mem {arrows.get(memory_trend, "→")}',
+        ]
@@ -0,0 +1,50 @@
+import pytest
+
+from k8s.images import image_id_digest, parse_image
+
+DIGEST: str = 'sha256:' + 'a' * 64
+
+
+@pytest.mark.parametrize('reference, registry, repository, tag, digest', [
+    # Implicit docker.io and library/
+    ('nginx', 'docker.io', 'library/nginx', 'latest', None),
+    ('nginx:1.27', 'docker.io', 'library/nginx', '1.27', None),
+    ('bitnami/redis:7.2', 'docker.io', 'bitnami/redis', '7.2', None),
+    ('docker.io/nginx', 'docker.io', 'library/nginx', 'latest', None),
+    ('index.docker.io/nginx:1', 'docker.io', 'library/nginx', '1', None),
+    # Registries
+    ('ghcr.io/org/app:1.2', 'ghcr.io', 'org/app', '1.2', None),
+    ('quay.io/org/team/app', 'quay.io', 'org/team/app', 'latest', None),
+    ('localhost/app:dev', 'localhost', 'app', 'dev', None),
+    # Registry ports aren't tags
+    ('registry.local:5000/app', 'registry.local:5000', 'app', 'latest', None),
+    ('registry.local:5000/org/app:2.0', 'registry.local:5000', 'org/app', '2.0', None),
+    ('localhost:5000/app', 'localhost:5000', 'app', 'latest', None),
+    # Digests
+    (f'nginx@{DIGEST}', 'docker.io', 'library/nginx', None, DIGEST),
+    (f'ghcr.io/org/app:1.2@{DIGEST}', 'ghcr.io', 'org/app', '1.2', DIGEST),
+    (f'registry.local:5000/app@{DIGEST}', 'registry.local:5000', 'app', None, DIGEST),
+])
+def test_parse_image(reference, registry, repository, tag, digest):
+    image = parse_image(reference)
+    assert (image.reference, image.registry, image.repository, image.tag, image.digest) == (
+        reference, registry, repository, tag, digest)
+
+
+def test_parse_image_without_default_tag():
+    assert parse_image('nginx', default_tag=None).tag is None
+
+
+def test_parse_image_is_memoized():
+    assert parse_image('ghcr.io/org/app:1.2') is parse_image('ghcr.io/org/app:1.2')
+
+
+@pytest.mark.parametrize('image_id, digest', [
+    (f'docker-pullable://nginx@{DIGEST}', DIGEST),
+    (f'docker.io/library/nginx@{DIGEST}', DIGEST),
+    ('sha256:' + 'b' * 64, None),
+    ('', None),
+    (None, None),
+])
+def test_image_id_digest(image_id, digest):
+    assert image_id_digest(image_id) == digest
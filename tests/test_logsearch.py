@@ -0,0 +1,75 @@
+import re
+
+import pytest
+
+from k8s.logsearch import GROUP_SEPARATOR, ContextScanner, grep_lines
+
+
+def _scan(lines: list, pattern: str, context_lines: int, batch_size: int) -> list:
+    scanner = ContextScanner(prefix='pod', context_lines=context_lines)
+    shown: list = []
+    for start in range(0, len(lines), batch_size):
+        batch: list = lines[start:start + batch_size]
+        shown += scanner.feed(batch, grep_lines(pattern, 0, batch))
+    return shown
+
+
+def _grep_context(lines: list, pattern: str, context_lines: int) -> list:
+    # Reference: what grep -C prints for the whole log at once
+    hits: list = [index for index, line in enumerate(lines) if re.search(pattern, line)]
+    shown: set = {number for hit in hits
+                  for number in range(max(0, hit - context_lines), min(len(lines), hit + context_lines + 1))}
+    output: list = []
+    last: int = None
+    for number in sorted(shown):
+        if context_lines and last is not None and number > last + 1:
+            output.append(GROUP_SEPARATOR)
+        output.append(f'pod{":" if number in hits else "-"}{lines[number]}')
+        last = number
+    return output
+
+
+def test_grep_lines():
+    assert grep_lines('err', re.IGNORECASE, ['ok', 'ERROR', 'fine', 'stderr']) == [1, 3]
+
+
+def test_no_context():
+    lines: list = ['a', 'hit 1', 'b', 'c', 'hit 2']
+    assert _scan(lines, 'hit', context_lines=0, batch_size=10) == ['pod:hit 1', 'pod:hit 2']
+
+
+def test_separated_groups():
+    lines: list = ['a', 'hit 1', 'b', 'c', 'd', 'e', 'hit 2', 'f']
+    assert _scan(lines, 'hit', context_lines=1, batch_size=10) == [
+        'pod-a', 'pod:hit 1', 'pod-b', GROUP_SEPARATOR, 'pod-e', 'pod:hit 2', 'pod-f']
+
+
+def test_overlapping_context_is_merged():
+    lines: list = ['a', 'hit 1', 'b', 'hit 2', 'c']
+    assert _scan(lines, 'hit', context_lines=2, batch_size=10) == [
+        'pod-a', 'pod:hit 1', 'pod-b', 'pod:hit 2', 'pod-c']
+
+
+def test_adjacent_groups_have_no_separator():
+    lines: list = ['hit 1', 'a', 'b', 'hit 2']
+    assert _scan(lines, 'hit', context_lines=1, batch_size=10) == ['pod:hit 1', 'pod-a', 'pod-b', 'pod:hit 2']
+
+
+def test_context_carries_over_batches():
+    lines: list = ['a', 'b', 'c', 'hit', 'd', 'e', 'f']
+    assert _scan(lines, 'hit', context_lines=2, batch_size=2) == ['pod-b', 'pod-c', 'pod:hit', 'pod-d', 'pod-e']
+
+
+def test_counts_matches():
+    scanner = ContextScanner(prefix='pod', context_lines=1)
+    scanner.feed(['hit', 'a', 'hit'], [0, 2])
+    scanner.feed(['hit'], [0])
+    assert scanner.matches == 3
+
+
+@pytest.mark.parametrize('context_lines', [0, 1, 2, 5])
+@pytest.mark.parametrize('batch_size', [1, 3, 7, 1000])
+def test_matches_grep(context_lines, batch_size):
+    lines: list = [f'line {number}{" hit" if number % 7 in (0, 2) or number % 23 == 5 else ""}'
+                   for number in range(200)]
+    assert _scan(lines, 'hit', context_lines, batch_size) == _grep_context(lines, 'hit', context_lines)
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from cli.picker import FUZZY_MIN_LENGTH, WORD_SEPARATORS, NameIndex
+
+NAMES: list = ['payments-api', 'payments-worker', 'api-gateway', 'auth', 'kube-system', 'kube-public',
+               'monitoring', 'logging', 'Ingress-Nginx', 'cert-manager', 'team_a.api', 'pay']
+
+
+def _brute_force(names: list, query: str) -> list:
+    # Reference: the ranking NameIndex promises, checked name by name
+    query = query.lower()
+    if not query:
+        return list(names)
+    lower: list = [name.lower() for name in names]
+    prefix: list = [i for i, name in enumerate(lower) if name.startswith(query)]
+    word_start: list = [i for i, name in enumerate(lower) if i not in prefix
+                        and any(separator + query in name for separator in WORD_SEPARATORS)]
+    substring: list = [i for i, name in enumerate(lower) if query in name and i not in prefix + word_start]
+    fuzzy: list = []
+    if len(query) >= FUZZY_MIN_LENGTH:
+        fuzzy = [i for i, name in enumerate(lower) if query not in name and _is_subsequence(query, name)]
+    return [names[i] for i in prefix + word_start + substring + fuzzy]
+
+
+def _is_subsequence(query: str, text: str) -> bool:
+    characters = iter(text)
+    return all(char in characters for char in query)
+
+
+@pytest.mark.parametrize('query', ['', 'p', 'pa', 'pay', 'api', 'API', 'kube', 'ube-', 'pyapi', 'ngi', 'xyz',
+                                   'a', 'man', 'cert-man', 'team_a.', '.api'])
+def test_search_matches_brute_force(query):
+    assert NameIndex(NAMES).search(query) == _brute_force(NAMES, query)
+
+
+def test_ranking():
+    index = NameIndex(NAMES)
+    assert index.search('api')[:3] == ['api-gateway', 'payments-api', 'team_a.api']
+    assert index.search('pyapi') == ['payments-api']
+
+
+def test_typing_narrows_the_last_matches():
+    # Every prefix of the query is searched in turn, as when typing it
+    index = NameIndex(NAMES)
+    for query in ['k', 'ku', 'kub', 'kube', 'kube-', 'kube-s', 'kube-sy']:
+        assert index.search(query) == _brute_force(NAMES, query)
+    # Deleting characters searches the whole index again
+    for query in ['kube', 'ku', '']:
+        assert index.search(query) == _brute_force(NAMES, query)
+
+
+def test_extend_resets_the_last_matches():
+    index = NameIndex(['payments-api'])
+    assert index.search('pay') == ['payments-api']
+    index.extend(['payroll'])
+    assert index.search('payr') == ['payroll']
+    assert len(index) == 2
+
+
+def test_random_names_match_brute_force():
+    rng = random.Random(7)
+    alphabet: str = 'abcde-_.'
+    names: list = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 12))) for _ in range(500)]
+    index = NameIndex(names)
+    for _ in range(200):
+        query: str = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))
+        # Typed one character at a time, so the narrowing path runs as well
+        for end in range(1, len(query) + 1):
+            assert index.search(query[:end]) == _brute_force(names, query[:end]), query[:end]
@@ -0,0 +1,63 @@
+import pytest
+
+from helpers.quantity import parse_quantities, parse_quantity, sum_by_group
+
+
+@pytest.mark.parametrize('quantity, expected', [
+    ('1', 1),
+    ('250m', 0.25),
+    ('100n', 100e-9),
+    ('5u', 5e-6),
+    ('2k', 2000),
+    ('1.5M', 1.5e6),
+    ('3G', 3e9),
+    ('1T', 1e12),
+    ('1Ki', 1024),
+    ('128Mi', 128 * 2 ** 20),
+    ('1.5Gi', 1.5 * 2 ** 30),
+    ('2Ti', 2 * 2 ** 40),
+    ('1Pi', 2 ** 50),
+    ('1Ei', 2 ** 60),
+    ('.5', 0.5),
+    ('+2', 2),
+    ('-1', -1),
+    (' 64Mi ', 64 * 2 ** 20),
+])
+def test_parse_quantity_suffixes(quantity, expected):
+    assert parse_quantity(quantity) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('quantity, expected', [
+    ('12e6', 12e6),
+    ('1E3', 1000),
+    ('5e-3', 0.005),
+    ('1.5e+2', 150),
+])
+def test_parse_quantity_exponents(quantity, expected):
+    assert parse_quantity(quantity) == pytest.approx(expected)
+
+
+def test_parse_quantity_exponent_is_not_the_exa_suffix():
+    # "1E" alone is the decimal exa suffix, with digits after it it's an exponent
+    assert parse_quantity('1E') == pytest.approx(1e18)
+    assert parse_quantity('1E2') == pytest.approx(100)
+
+
+@pytest.mark.parametrize('quantity', ['', 'abc', '1Zi', '1mi', '1.2.3', 'Mi', '1 Mi'])
+def test_parse_quantity_rejects_invalid(quantity):
+    with pytest.raises(ValueError):
+        parse_quantity(quantity)
+
+
+def test_parse_quantities_reads_none_as_zero():
+    values = parse_quantities(['100m', None, 'None', '1', '100m'])
+    assert values.tolist() == pytest.approx([0.1, 0, 0, 1, 0.1])
+
+
+def test_parse_quantities_empty():
+    assert parse_quantities([]).size == 0
+
+
+def test_sum_by_group():
+    totals = sum_by_group(parse_quantities(['1Mi', '1Mi', '2Mi']), [0, 0, 2], size=3)
+    assert totals.tolist() == [2 * 2 ** 20, 0, 2 * 2 ** 20]